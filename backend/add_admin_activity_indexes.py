@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Script to add the keyset pagination indexes to the admin_activities table
+"""
+
+from app import create_app
+from extensions import db
+from admin_models import AdminActivity
+
+def add_admin_activity_indexes():
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            for index in AdminActivity.__table__.indexes:
+                index.create(db.engine, checkfirst=True)
+                print(f"✅ Index {index.name} is in place")
+            print("Database migration completed successfully!")
+        except Exception as e:
+            print(f"❌ Error during migration: {str(e)}")
+
+if __name__ == '__main__':
+    add_admin_activity_indexes()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Script to add the delinquency bucket column, the job checkpoints table and
+the member rollups' defaulted loan count
+"""
+
+from sqlalchemy import text
+from app import create_app
+from extensions import db
+from models import JobCheckpoint
+from services.member_rollups import rebuild_rollups
+
+def add_delinquency_columns():
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            columns = [column['name'] for column in db.inspect(db.engine).get_columns('loans')]
+            if 'delinquency_bucket' not in columns:
+                with db.engine.connect() as conn:
+                    conn.execute(text("ALTER TABLE loans ADD COLUMN delinquency_bucket VARCHAR(10)"))
+                    conn.commit()
+                print("✅ Added delinquency_bucket column to loans table")
+            
+            JobCheckpoint.__table__.create(db.engine, checkfirst=True)
+            print("✅ job_checkpoints table is in place")
+            
+            inspector = db.inspect(db.engine)
+            if inspector.has_table('member_rollups'):
+                columns = [column['name'] for column in inspector.get_columns('member_rollups')]
+                if 'defaulted_loans' not in columns:
+                    with db.engine.connect() as conn:
+                        conn.execute(text("ALTER TABLE member_rollups ADD COLUMN defaulted_loans INTEGER NOT NULL DEFAULT 0"))
+                        conn.commit()
+                    count = rebuild_rollups()
+                    db.session.commit()
+                    print(f"✅ Added defaulted_loans to member_rollups and recomputed {count} members")
+            print("Database migration completed successfully!")
+        except Exception as e:
+            print(f"❌ Error during migration: {str(e)}")
+
+if __name__ == '__main__':
+    add_delinquency_columns()
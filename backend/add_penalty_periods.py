@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Script to add the accrual period column and indexes used by `flask penalties accrue`
+"""
+
+from sqlalchemy import text
+from app import create_app
+from extensions import db
+from models import Loan, Penalty
+
+def add_penalty_periods():
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            columns = [column['name'] for column in db.inspect(db.engine).get_columns('penalties')]
+            if 'period' not in columns:
+                with db.engine.connect() as conn:
+                    conn.execute(text("ALTER TABLE penalties ADD COLUMN period INTEGER"))
+                    conn.commit()
+                print("✅ Added period column to penalties table")
+            
+            # Penalties created before accrual have no period and never conflict
+            for index in list(Penalty.__table__.indexes) + list(Loan.__table__.indexes):
+                index.create(db.engine, checkfirst=True)
+                print(f"✅ Index {index.name} is in place")
+            print("Database migration completed successfully!")
+        except Exception as e:
+            print(f"❌ Error during migration: {str(e)}")
+
+if __name__ == '__main__':
+    add_penalty_periods()
@@ -48,6 +48,11 @@ class Admin(db.Model):
 
 class AdminActivity(db.Model):
     __tablename__ = 'admin_activities'
+    __table_args__ = (
+        # Keyset pagination and date filtering walk (created_at, id); action filters use the second index
+        db.Index('ix_admin_activities_created_at_id', 'created_at', 'id'),
+        db.Index('ix_admin_activities_action_created_at_id', 'action', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     admin_id = db.Column(db.Integer, db.ForeignKey('admins.id'), nullable=False)
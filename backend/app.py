@@ -31,11 +31,53 @@ def create_app():
     app.config['UPLOAD_FOLDER'] = 'static'
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
+    # Dashboard aggregate cache: 'lru' (per worker) or 'redis' (shared by all workers)
+    app.config['AGGREGATE_CACHE_BACKEND'] = os.getenv('AGGREGATE_CACHE_BACKEND', 'lru')
+    app.config['AGGREGATE_CACHE_REDIS_URL'] = os.getenv('AGGREGATE_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    # Members whose dashboard snapshot is kept in memory per worker
+    app.config['DASHBOARD_SNAPSHOT_CACHE_SIZE'] = int(os.getenv('DASHBOARD_SNAPSHOT_CACHE_SIZE', 1024))
+    # Seconds to keep a member's creating admin between requests (0 disables)
+    app.config['IDENTITY_CACHE_TTL'] = int(os.getenv('IDENTITY_CACHE_TTL', 0))
+    # How often each worker reloads the set of deactivated admins
+    app.config['ADMIN_REVOCATION_REFRESH_SECONDS'] = int(os.getenv('ADMIN_REVOCATION_REFRESH_SECONDS', 60))
+    # Days past due after which `flask delinquency run` moves a loan to DEFAULTED
+    app.config['DELINQUENCY_DEFAULT_DAYS'] = int(os.getenv('DELINQUENCY_DEFAULT_DAYS', 90))
+    # Capital share (PHP) needed to be a loan-eligible REGULAR MEMBER
+    app.config['MEMBERSHIP_REGULAR_THRESHOLD'] = float(os.getenv('MEMBERSHIP_REGULAR_THRESHOLD', 20000))
+    # Admin activity rows are queued and written in batches by a background thread
+    app.config['AUDIT_LOG_ASYNC'] = os.getenv('AUDIT_LOG_ASYNC', 'true').lower() == 'true'
+    app.config['AUDIT_BATCH_SIZE'] = int(os.getenv('AUDIT_BATCH_SIZE', 100))
+    app.config['AUDIT_FLUSH_INTERVAL'] = float(os.getenv('AUDIT_FLUSH_INTERVAL', 2.0))
+    app.config['AUDIT_MAX_PENDING'] = int(os.getenv('AUDIT_MAX_PENDING', 10000))
+    # Annual loan rates in percent: the default, per-type overrides ("business=7,emergency=3")
+    # and how many priced quote grids each worker keeps
+    app.config['LOAN_DEFAULT_RATE'] = float(os.getenv('LOAN_DEFAULT_RATE', 5.0))
+    app.config['LOAN_RATES'] = os.getenv('LOAN_RATES', '')
+    app.config['LOAN_QUOTE_CACHE_SIZE'] = int(os.getenv('LOAN_QUOTE_CACHE_SIZE', 256))
+
     # Init extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     bcrypt.init_app(app)
+
+    from services import (
+        aggregate_cache, dashboard_snapshots, current_member, admin_auth,
+        savings_accounts, portfolio_snapshots, member_rollups, penalties, delinquency,
+        audit_log, jobs, loan_quotes
+    )
+    aggregate_cache.init_app(app)
+    dashboard_snapshots.init_app(app)
+    current_member.init_app(app)
+    admin_auth.init_app(app)
+    savings_accounts.init_app(app)
+    portfolio_snapshots.init_app(app)
+    member_rollups.init_app(app)
+    penalties.init_app(app)
+    delinquency.init_app(app)
+    audit_log.init_app(app)
+    jobs.init_app(app)
+    loan_quotes.init_app(app)
     
     # Enhanced CORS configuration
     allowed_origins = [
@@ -0,0 +1,120 @@
+"""
+Shared pytest fixtures for the self-contained API tests.
+
+These tests run against an in-memory SQLite database through Flask's test
+client, so unlike the older test_*.py scripts they do not need a running
+backend server. Run them with e.g. ``python -m pytest -q test_admin_loan_queries.py``.
+"""
+
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+
+os.environ['DATABASE_URL'] = 'sqlite://'
+# Write admin activity at request teardown instead of from a background thread
+os.environ['AUDIT_LOG_ASYNC'] = 'false'
+
+from app import create_app
+from extensions import db
+from models import User, Loan, LoanStatus
+from admin_models import Admin
+from services.admin_auth import admin_claims
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+MEMBER_PASSWORD_HASH = generate_password_hash('password123')
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin(app):
+    admin = Admin(
+        username='testadmin',
+        email='testadmin@example.com',
+        password_hash=generate_password_hash('admin123'),
+        first_name='Test',
+        last_name='Admin',
+        role='ADMIN',
+        is_active=True
+    )
+    db.session.add(admin)
+    db.session.commit()
+    return admin
+
+
+@pytest.fixture
+def admin_headers(app, admin):
+    token = create_access_token(identity=str(admin.id), additional_claims=admin_claims(admin))
+    # Load the revocation set now so it is not counted in per-request query budgets
+    app.extensions['admin_revocations'].refresh()
+    return {'Authorization': f'Bearer {token}'}
+
+
+def auth_headers(user):
+    """Bearer headers for a member"""
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+
+def make_member(index, admin_id=None, capital_share=25000.0):
+    user = User(
+        first_name=f'Member{index}',
+        last_name='Test',
+        email=f'member{index}@example.com',
+        contact_number='09170000000',
+        password_hash=MEMBER_PASSWORD_HASH,
+        capital_share=capital_share,
+        created_by_admin=admin_id
+    )
+    user.update_membership_status()
+    db.session.add(user)
+    return user
+
+
+def make_loan(user, status=LoanStatus.APPROVED, principal=10000.0, due_date=None, **kwargs):
+    loan = Loan(
+        user_id=user.id,
+        principal_amount=principal,
+        interest_rate=5.0,
+        duration_months=kwargs.pop('duration_months', 12),
+        monthly_payment=kwargs.pop('monthly_payment', principal / 12),
+        remaining_balance=kwargs.pop('remaining_balance', principal),
+        status=status,
+        purpose='Test loan',
+        due_date=due_date,
+        **kwargs
+    )
+    db.session.add(loan)
+    return loan
+
+
+@contextmanager
+def count_queries():
+    """Count the SQL statements executed inside the block"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Create the loan_installments table and generate schedules for approved loans
+"""
+
+from app import create_app
+from extensions import db
+from models import Installment
+from services.installments import backfill_schedules
+
+def create_loan_installments_table():
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            Installment.__table__.create(db.engine, checkfirst=True)
+            print("✅ loan_installments table is in place")
+            
+            # Principal already repaid is allocated to the earliest installments
+            count = backfill_schedules()
+            db.session.commit()
+            print(f"✅ Generated installment schedules for {count} loans")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error creating installment schedules: {str(e)}")
+
+if __name__ == '__main__':
+    create_loan_installments_table()
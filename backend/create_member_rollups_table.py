@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Create the member_rollups table and compute every member's totals
+"""
+
+from app import create_app
+from extensions import db
+from models import MemberRollup
+from services.member_rollups import rebuild_rollups
+
+def create_member_rollups_table():
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            MemberRollup.__table__.create(db.engine, checkfirst=True)
+            print("✅ member_rollups table is in place")
+            
+            # Same as `flask rollups rebuild`
+            count = rebuild_rollups()
+            db.session.commit()
+            print(f"✅ Computed rollups for {count} members")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error creating member rollups: {str(e)}")
+
+if __name__ == '__main__':
+    create_member_rollups_table()
@@ -9,9 +9,24 @@ sys.path.append(os.getcwd())
 
 from app import create_app
 from extensions import db
-from models import User, Loan, LoanStatus
+from models import Loan, Penalty, LoanStatus
+from services.installments import OPEN, backfill_schedule, overdue_by_loan
+from services.penalties import accrue_penalties
 from datetime import datetime, timedelta
 
+def make_overdue(loan, overdue_days, current_date):
+    """Move the loan's open installments back so the oldest is `overdue_days` late"""
+    if not loan.installments:
+        backfill_schedule(loan)
+    open_installments = [installment for installment in loan.installments if installment.status == OPEN]
+    if not open_installments:
+        return False
+    shift = current_date - timedelta(days=overdue_days) - open_installments[0].due_date
+    for installment in open_installments:
+        installment.due_date += shift
+    loan.due_date = open_installments[0].due_date
+    return True
+
 def create_overdue_loans():
     app = create_app()
     
@@ -34,27 +49,31 @@ def create_overdue_loans():
             if i % 2 == 0:
                 # Some loans overdue by 35 days (1 penalty period + 5 days)
                 overdue_days = 35
-                loan.due_date = current_date - timedelta(days=overdue_days)
-                updated_loans += 1
-                print(f"✅ Made loan #{loan.id} overdue by {overdue_days} days")
             elif i % 3 == 0:
                 # Some loans overdue by 65 days (2 penalty periods + 5 days)
                 overdue_days = 65
-                loan.due_date = current_date - timedelta(days=overdue_days)
+            else:
+                continue
+            if make_overdue(loan, overdue_days, current_date):
                 updated_loans += 1
                 print(f"✅ Made loan #{loan.id} overdue by {overdue_days} days")
         
         db.session.commit()
         
         print(f"\n🎉 Updated {updated_loans} loans to be overdue")
+        
+        # Same as `flask penalties accrue`, so the dashboard shows the penalties
+        totals = accrue_penalties(current_date)
+        print(f"Accrued {totals['penalties']} penalties across {totals['loans']} overdue loans")
         print("Now you can test the penalty system in the dashboard!")
         
-        # Show penalty calculations
-        print("\nPenalty Calculations:")
+        # Show the accrued penalties
+        print("\nPenalties:")
+        overdue = overdue_by_loan(current_date)
         for loan in Loan.query.filter_by(status=LoanStatus.ACTIVE).all():
-            if loan.is_overdue():
-                penalty = loan.calculate_penalty()
-                days_overdue = loan.get_days_overdue()
+            if loan.id in overdue:
+                penalty = sum(p.amount for p in Penalty.query.filter_by(loan_id=loan.id, status='unpaid'))
+                days_overdue = overdue[loan.id]['days_past_due']
                 print(f"  Loan #{loan.id}: {days_overdue} days overdue = ₱{penalty:,.2f} penalty")
 
 if __name__ == "__main__":
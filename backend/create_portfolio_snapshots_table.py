@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Create the portfolio_snapshots table and store today's snapshot
+"""
+
+from app import create_app
+from extensions import db
+from models import PortfolioSnapshot
+from services.portfolio_snapshots import take_snapshot
+
+def create_portfolio_snapshots_table():
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            PortfolioSnapshot.__table__.create(db.engine, checkfirst=True)
+            print("✅ portfolio_snapshots table is in place")
+            
+            # Later days are stored nightly by `flask reports snapshot`
+            snapshot = take_snapshot()
+            db.session.commit()
+            print(f"✅ Stored portfolio snapshot for {snapshot.snapshot_date.isoformat()}")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error creating portfolio snapshots: {str(e)}")
+
+if __name__ == '__main__':
+    create_portfolio_snapshots_table()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Create the savings_accounts table and backfill it from the savings history
+"""
+
+from app import create_app
+from extensions import db
+from models import SavingsAccount
+from services.savings_accounts import verify_accounts
+
+def create_savings_accounts_table():
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            SavingsAccount.__table__.create(db.engine, checkfirst=True)
+            print("✅ savings_accounts table is in place")
+            
+            # Balances are rebuilt from SUM(amount) of each member's savings rows
+            repaired = verify_accounts(repair=True)
+            db.session.commit()
+            print(f"✅ Backfilled {len(repaired)} savings accounts")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error creating savings accounts: {str(e)}")
+
+if __name__ == '__main__':
+    create_savings_accounts_table()
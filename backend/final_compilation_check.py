@@ -7,6 +7,7 @@ from app import create_app
 from extensions import db
 from admin_models import Admin, AdminActivity
 from models import User, Loan, Transaction, Saving, Payment
+from services.membership import recompute_membership
 from datetime import datetime
 import os
 
@@ -65,13 +66,7 @@ def final_compilation_check():
                 return False
             
             # Step 4: Update membership status as per update_membership.py
-            users = User.query.all()
-            updated_count = 0
-            for user in users:
-                old_status = user.member_status
-                user.update_membership_status()
-                if old_status != user.member_status:
-                    updated_count += 1
+            updated_count = recompute_membership()['changed']
             
             if updated_count > 0:
                 db.session.commit()
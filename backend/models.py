@@ -52,7 +52,9 @@ class User(db.Model):
     
     def update_membership_status(self):
         """Update membership status and loan eligibility based on capital share"""
-        if self.capital_share >= 20000:
+        # Existing rows are recomputed with one UPDATE by services.membership.recompute_membership
+        from services.membership import regular_threshold
+        if self.capital_share >= regular_threshold():
             self.member_status = 'REGULAR MEMBER'
             self.loan_eligibility = True
         else:
@@ -60,17 +62,34 @@ class User(db.Model):
             self.loan_eligibility = False
         self.updated_at = datetime.utcnow()
     
-    def to_dict(self):
+    @staticmethod
+    def load_creators(users):
+        """Resolve the creating admins of many users with a single IN query"""
         from admin_models import Admin
-        created_by = None
-        if self.created_by_admin:
-            admin = Admin.query.get(self.created_by_admin)
-            if admin:
-                created_by = {
-                    'id': admin.id,
-                    'username': admin.username,
-                    'email': admin.email
-                }
+        admin_ids = {user.created_by_admin for user in users if user.created_by_admin}
+        if not admin_ids:
+            return {}
+        
+        admins = Admin.query.filter(Admin.id.in_(admin_ids)).all()
+        return {
+            admin.id: {
+                'id': admin.id,
+                'username': admin.username,
+                'email': admin.email
+            }
+            for admin in admins
+        }
+    
+    @staticmethod
+    def bulk_to_dict(users):
+        """Serialize a result set of users, sharing one admin lookup across rows"""
+        creators = User.load_creators(users)
+        return [user.to_dict(creators=creators) for user in users]
+    
+    def to_dict(self, creators=None):
+        if creators is None:
+            creators = User.load_creators([self])
+        created_by = creators.get(self.created_by_admin) if self.created_by_admin else None
         
         return {
             'id': self.id,
@@ -89,6 +108,10 @@ class User(db.Model):
 
 class Loan(db.Model):
     __tablename__ = 'loans'
+    __table_args__ = (
+        # Penalty accrual scans open loans by due date
+        db.Index('ix_loans_status_due_date', 'status', 'due_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     loan_id = db.Column(db.String(36), unique=True, default=lambda: str(uuid.uuid4()))
@@ -104,6 +127,8 @@ class Loan(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     approved_at = db.Column(db.DateTime)
     due_date = db.Column(db.DateTime)
+    # Set by the nightly delinquency run: current, 1-30, 31-60, 61-90 or 90+ days past due
+    delinquency_bucket = db.Column(db.String(10))
     
     def to_dict(self):
         return {
@@ -122,56 +147,48 @@ class Loan(db.Model):
             'approved_at': self.approved_at.isoformat() if self.approved_at else None,
             'due_date': self.due_date.isoformat() if self.due_date else None
         }
+
+class Installment(db.Model):
+    """One scheduled monthly installment of an approved loan"""
+    __tablename__ = 'loan_installments'
+    __table_args__ = (
+        db.UniqueConstraint('loan_id', 'number', name='uq_loan_installments_loan_number'),
+        # Next-due and overdue lookups read open installments in due-date order
+        db.Index('ix_loan_installments_loan_status_due_date', 'loan_id', 'status', 'due_date'),
+        db.Index('ix_loan_installments_user_status_due_date', 'user_id', 'status', 'due_date'),
+        db.Index('ix_loan_installments_status_due_date', 'status', 'due_date'),
+    )
     
-    def calculate_penalty(self, current_date=None):
-        """Calculate penalty for overdue payment"""
-        if current_date is None:
-            current_date = datetime.utcnow()
-        
-        if not self.due_date or current_date <= self.due_date:
-            return 0  # No penalty if not overdue
-        
-        days_overdue = (current_date - self.due_date).days
-        if days_overdue <= 0:
-            return 0
-        
-        # Calculate penalty: 5% of monthly payment for every 30 days overdue
-        penalty_rate = 0.05  # 5%
-        penalty_periods = (days_overdue // 30) + 1  # At least 1 period if overdue
-        penalty_amount = self.monthly_payment * penalty_rate * penalty_periods
-        
-        return penalty_amount
-    
-    def is_overdue(self, current_date=None):
-        """Check if loan payment is overdue"""
-        if current_date is None:
-            current_date = datetime.utcnow()
-        
-        return self.due_date and current_date > self.due_date
+    id = db.Column(db.Integer, primary_key=True)
+    loan_id = db.Column(db.Integer, db.ForeignKey('loans.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    number = db.Column(db.Integer, nullable=False)
+    due_date = db.Column(db.DateTime, nullable=False)
+    amount_due = db.Column(db.Float, nullable=False)
+    amount_paid = db.Column(db.Float, nullable=False, default=0.0)
+    status = db.Column(db.String(20), nullable=False, default='due')  # due, paid
+    paid_at = db.Column(db.DateTime)
     
-    def get_days_overdue(self, current_date=None):
-        """Get number of days overdue"""
-        if current_date is None:
-            current_date = datetime.utcnow()
-        
-        if not self.due_date or current_date <= self.due_date:
-            return 0
-        
-        return (current_date - self.due_date).days
+    loan = db.relationship('Loan', backref=db.backref(
+        'installments', order_by='Installment.number', cascade='all, delete-orphan', lazy=True
+    ))
     
-    def get_next_due_date(self):
-        """Calculate next payment due date (30 days from last due date)"""
-        if not self.due_date:
-            return None
-        
-        from datetime import timedelta
-        return self.due_date + timedelta(days=30)
+    @property
+    def amount_outstanding(self):
+        return max(0.0, round(self.amount_due - self.amount_paid, 2))
     
-    def update_due_date_after_payment(self):
-        """Update due date after payment is made"""
-        if self.due_date:
-            from datetime import timedelta
-            self.due_date = self.due_date + timedelta(days=30)
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'loan_id': self.loan_id,
+            'number': self.number,
+            'due_date': self.due_date.isoformat(),
+            'amount_due': self.amount_due,
+            'amount_paid': self.amount_paid,
+            'amount_outstanding': self.amount_outstanding,
+            'status': self.status,
+            'paid_at': self.paid_at.isoformat() if self.paid_at else None
+        }
 
 class Transaction(db.Model):
     __tablename__ = 'transactions'
@@ -215,6 +232,26 @@ class Saving(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
+class SavingsAccount(db.Model):
+    """Running savings balance per member, updated with every deposit and withdrawal"""
+    __tablename__ = 'savings_accounts'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    balance = db.Column(db.Float, nullable=False, default=0.0)
+    movement_count = db.Column(db.Integer, nullable=False, default=0)
+    last_movement_amount = db.Column(db.Float)
+    last_movement_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'balance': self.balance,
+            'movement_count': self.movement_count,
+            'last_movement_amount': self.last_movement_amount,
+            'last_movement_at': self.last_movement_at.isoformat() if self.last_movement_at else None
+        }
+
 class Payment(db.Model):
     __tablename__ = 'payments'
     
@@ -241,6 +278,10 @@ class Payment(db.Model):
 
 class Penalty(db.Model):
     __tablename__ = 'penalties'
+    __table_args__ = (
+        # One accrued penalty per loan, missed due date and 30-day period (see services/penalties.py)
+        db.Index('uq_penalties_loan_due_date_period', 'loan_id', 'due_date', 'period', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     penalty_id = db.Column(db.String(36), unique=True, default=lambda: str(uuid.uuid4()))
@@ -251,6 +292,7 @@ class Penalty(db.Model):
     due_date = db.Column(db.DateTime, nullable=False)  # The original due date that was missed
     days_overdue = db.Column(db.Integer, nullable=False)
     penalty_rate = db.Column(db.Float, default=0.05)  # 5% default penalty rate
+    period = db.Column(db.Integer)  # 1 for the first 30 days after due_date, 2 for the next...
     status = db.Column(db.String(20), default='unpaid')  # unpaid, paid
     description = db.Column(db.String(200))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -270,7 +312,113 @@ class Penalty(db.Model):
             'due_date': self.due_date.isoformat(),
             'days_overdue': self.days_overdue,
             'penalty_rate': self.penalty_rate,
+            'period': self.period,
             'status': self.status,
             'description': self.description,
             'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+class MemberDataVersion(db.Model):
+    """Per-member counter bumped on every write to that member's data (see services/member_versions.py)"""
+    __tablename__ = 'member_data_versions'
+    
+    # Not a foreign key: rows for deleted members are harmless, and user_id 0 holds the global epoch
+    user_id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class PortfolioSnapshot(db.Model):
+    """End-of-day portfolio totals written by `flask reports snapshot` (see services/portfolio_snapshots.py)"""
+    __tablename__ = 'portfolio_snapshots'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    snapshot_date = db.Column(db.Date, unique=True, nullable=False)
+    outstanding = db.Column(db.Float, nullable=False, default=0.0)
+    disbursed = db.Column(db.Float, nullable=False, default=0.0)
+    collected = db.Column(db.Float, nullable=False, default=0.0)
+    savings = db.Column(db.Float, nullable=False, default=0.0)
+    # Outstanding balance of open loans with an installment more than 30/60/90 days past due
+    par30 = db.Column(db.Float, nullable=False, default=0.0)
+    par60 = db.Column(db.Float, nullable=False, default=0.0)
+    par90 = db.Column(db.Float, nullable=False, default=0.0)
+    total_members = db.Column(db.Integer, nullable=False, default=0)
+    pending_loans = db.Column(db.Integer, nullable=False, default=0)
+    approved_loans = db.Column(db.Integer, nullable=False, default=0)
+    active_loans = db.Column(db.Integer, nullable=False, default=0)
+    completed_loans = db.Column(db.Integer, nullable=False, default=0)
+    rejected_loans = db.Column(db.Integer, nullable=False, default=0)
+    defaulted_loans = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def par_ratio(self, value):
+        return round(value / self.outstanding * 100, 2) if self.outstanding else 0
+    
+    def to_dict(self):
+        return {
+            'date': self.snapshot_date.isoformat(),
+            'outstanding': self.outstanding,
+            'disbursed': self.disbursed,
+            'collected': self.collected,
+            'savings': self.savings,
+            'par30': self.par30,
+            'par60': self.par60,
+            'par90': self.par90,
+            'par30_ratio': self.par_ratio(self.par30),
+            'par60_ratio': self.par_ratio(self.par60),
+            'par90_ratio': self.par_ratio(self.par90),
+            'total_members': self.total_members,
+            'loans_by_status': {
+                'pending': self.pending_loans,
+                'approved': self.approved_loans,
+                'active': self.active_loans,
+                'completed': self.completed_loans,
+                'rejected': self.rejected_loans,
+                'defaulted': self.defaulted_loans
+            }
+        }
+
+class MemberRollup(db.Model):
+    """Per-member totals kept in step with loans, payments, savings and penalties (see services/member_rollups.py)"""
+    __tablename__ = 'member_rollups'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    loan_count = db.Column(db.Integer, nullable=False, default=0)
+    active_loans = db.Column(db.Integer, nullable=False, default=0)
+    approved_loans = db.Column(db.Integer, nullable=False, default=0)
+    # Defaulted loans with a balance still owed; these block new loans
+    defaulted_loans = db.Column(db.Integer, nullable=False, default=0)
+    total_borrowed = db.Column(db.Float, nullable=False, default=0.0)
+    outstanding_balance = db.Column(db.Float, nullable=False, default=0.0)
+    # Lowest share of principal repaid across approved loans, None without any
+    least_repaid_percentage = db.Column(db.Float)
+    total_paid = db.Column(db.Float, nullable=False, default=0.0)
+    savings_balance = db.Column(db.Float, nullable=False, default=0.0)
+    unpaid_penalties = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'loan_count': self.loan_count,
+            'active_loans': self.active_loans,
+            'approved_loans': self.approved_loans,
+            'defaulted_loans': self.defaulted_loans,
+            'total_borrowed': self.total_borrowed,
+            'outstanding_balance': self.outstanding_balance,
+            'least_repaid_percentage': self.least_repaid_percentage,
+            'total_paid': self.total_paid,
+            'savings_balance': self.savings_balance,
+            'unpaid_penalties': self.unpaid_penalties
+        }
+
+class JobCheckpoint(db.Model):
+    """Progress of a chunked batch job, so an interrupted run resumes where it stopped"""
+    __tablename__ = 'job_checkpoints'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    as_of = db.Column(db.DateTime, nullable=False)
+    last_id = db.Column(db.Integer, nullable=False, default=0)
+    stats = db.Column(db.Text)  # JSON counters accumulated by the run
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
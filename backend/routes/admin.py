@@ -1,9 +1,23 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask import Blueprint, Response, request, jsonify
+from flask_jwt_extended import create_access_token, get_jwt_identity, get_jwt
 from werkzeug.security import generate_password_hash, check_password_hash
 from extensions import db
-from admin_models import Admin, AdminActivity
-from models import User, Loan, Transaction, Saving, Payment, LoanStatus
+from admin_models import Admin
+from models import User, Loan, Transaction, Saving, SavingsAccount, MemberRollup, Payment, LoanStatus
+from services.loaders import loans_with_borrowers, serialize_loans_with_borrowers
+from services.members import member_directory_query
+from services.savings_overview import savings_accounts_query, savings_summary
+from services.portfolio import get_portfolio_summary, DISBURSED_STATUSES, OPEN_STATUSES, COLLECTION_STATUSES
+from services.time_series import loan_payment_series, last_months
+from services.aggregate_cache import cached_aggregate, get_cache
+from services.admin_auth import admin_required, admin_claims, revocations
+from services.installments import generate_schedule, overdue_query
+from services.admin_activity_log import (
+    activity_date_range, activity_log_query, count_activities, get_activity_page, serialize_activity
+)
+from services.audit_log import record_activity, audit_log
+from services.membership import recompute_membership
+from services.amortization import schedules_csv
 from sqlalchemy import func, desc
 from datetime import datetime, timedelta
 
@@ -34,17 +48,17 @@ def admin_login():
             # Update last login
             admin.last_login = datetime.utcnow()
             
+            db.session.commit()
+            
             # Log activity
-            activity = AdminActivity(
+            record_activity(
                 admin_id=admin.id,
                 action='LOGIN',
                 description=f'Admin {admin.username} logged in',
                 ip_address=request.remote_addr
             )
-            db.session.add(activity)
-            db.session.commit()
             
-            access_token = create_access_token(identity=str(admin.id))
+            access_token = create_access_token(identity=str(admin.id), additional_claims=admin_claims(admin))
             return jsonify({
                 'message': 'Login successful',
                 'access_token': access_token,
@@ -58,75 +72,42 @@ def admin_login():
         return jsonify({'message': 'Login failed', 'error': str(e)}), 500
 
 @admin_bp.route('/dashboard/stats', methods=['GET'])
-@jwt_required()
+@admin_required()
 def get_dashboard_stats():
     try:
-        # Get current month and year
-        now = datetime.utcnow()
-        current_month_start = datetime(now.year, now.month, 1)
-        
-        # Active users
-        active_users = User.query.count()
-        
-        # Total borrowers (users with loans)
-        borrowers = User.query.join(Loan).distinct().count()
-        
-        # Cash disbursed (only approved/active loans that were actually disbursed)
-        cash_disbursed = db.session.query(func.sum(Loan.principal_amount)).filter(
-            Loan.status.in_([LoanStatus.APPROVED, LoanStatus.ACTIVE, LoanStatus.COMPLETED])
-        ).scalar() or 0
-        
-        # Cash received (total payments)
-        cash_received = db.session.query(func.sum(Payment.amount)).scalar() or 0
-        
-        # Total savings
-        total_savings = db.session.query(func.sum(Saving.balance)).scalar() or 0
-        
-        # Repaid loans count
-        repaid_loans = Loan.query.filter_by(status='COMPLETED').count()
-        
-        # Other accounts (users without loans)
-        other_accounts = User.query.filter(~User.id.in_(
-            db.session.query(Loan.user_id).distinct()
-        )).count()
-        
-        # Active loans count (only approved and active loans)
-        total_loans = Loan.query.filter(
-            Loan.status.in_([LoanStatus.APPROVED, LoanStatus.ACTIVE])
-        ).count()
-        
-        return jsonify({
-            'active_users': active_users,
-            'borrowers': borrowers,
-            'cash_disbursed': cash_disbursed,
-            'cash_received': cash_received,
-            'total_savings': total_savings,
-            'repaid_loans': repaid_loans,
-            'other_accounts': other_accounts,
-            'total_loans': total_loans
-        }), 200
+        return jsonify(cached_aggregate('dashboard-stats', dashboard_stats_payload)), 200
         
     except Exception as e:
         return jsonify({'message': 'Failed to get stats', 'error': str(e)}), 500
 
+def dashboard_stats_payload():
+    summary = get_portfolio_summary()
+    
+    return {
+        'active_users': summary.total_users,
+        'borrowers': summary.borrowers,
+        # Cash disbursed counts only loans that were actually paid out
+        'cash_disbursed': summary.principal(*DISBURSED_STATUSES),
+        'cash_received': summary.total_collected,
+        'total_savings': summary.total_savings,
+        'repaid_loans': summary.loan_count(LoanStatus.COMPLETED),
+        'other_accounts': summary.other_accounts,
+        # Active loans count (only approved and active loans)
+        'total_loans': summary.loan_count(*OPEN_STATUSES)
+    }
+
 @admin_bp.route('/dashboard/recent-loans', methods=['GET'])
-@jwt_required()
+@admin_required()
 def get_recent_loans():
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
-        loans = Loan.query.join(User).order_by(desc(Loan.created_at)).paginate(
+        loans = loans_with_borrowers().order_by(desc(Loan.created_at)).paginate(
             page=page, per_page=per_page, error_out=False
         )
         
-        recent_loans = []
-        for loan in loans.items:
-            loan_data = loan.to_dict()
-            user = User.query.get(loan.user_id)
-            loan_data['user_name'] = f"{user.first_name} {user.last_name}"
-            loan_data['user_email'] = user.email
-            recent_loans.append(loan_data)
+        recent_loans = serialize_loans_with_borrowers(loans.items, include_user=False)
         
         return jsonify({
             'loans': recent_loans,
@@ -139,49 +120,37 @@ def get_recent_loans():
         return jsonify({'message': 'Failed to get recent loans', 'error': str(e)}), 500
 
 @admin_bp.route('/dashboard/monthly-loans', methods=['GET'])
-@jwt_required()
+@admin_required()
 def get_monthly_loans_data():
     try:
-        # Get loans data for the last 12 months
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=365)
-        
-        # Group loans by month
-        monthly_data = db.session.query(
-            func.extract('month', Loan.created_at).label('month'),
-            func.count(Loan.id).label('count')
-        ).filter(
-            Loan.created_at >= start_date
-        ).group_by(
-            func.extract('month', Loan.created_at)
-        ).all()
-        
-        # Create data for chart (12 months)
-        months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
-                 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        
-        chart_data = []
-        for i in range(1, 13):
-            count = next((item.count for item in monthly_data if item.month == i), 0)
-            chart_data.append(count)
-        
-        return jsonify({
-            'months': months,
-            'data': chart_data
-        }), 200
+        # Loan applications per calendar month for the last 12 months, oldest first
+        start_date, end_date = last_months(12)
+        payload = cached_aggregate(
+            f'monthly-loans:{end_date.isoformat()}',
+            lambda: monthly_loans_payload(start_date, end_date)
+        )
+        return jsonify(payload), 200
         
     except Exception as e:
         return jsonify({'message': 'Failed to get monthly data', 'error': str(e)}), 500
 
+def monthly_loans_payload(start_date, end_date):
+    series = loan_payment_series(start_date, end_date, 'month')
+    
+    return {
+        'months': [bucket['label'] for bucket in series],
+        'data': [bucket['loans'] for bucket in series]
+    }
+
 @admin_bp.route('/loans', methods=['GET'])
-@jwt_required()
+@admin_required()
 def get_all_loans():
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
         status = request.args.get('status')
         
-        query = Loan.query.join(User)
+        query = loans_with_borrowers()
         
         if status:
             query = query.filter(Loan.status == status.upper())
@@ -190,12 +159,7 @@ def get_all_loans():
             page=page, per_page=per_page, error_out=False
         )
         
-        loans_data = []
-        for loan in loans.items:
-            loan_data = loan.to_dict()
-            user = User.query.get(loan.user_id)
-            loan_data['user'] = user.to_dict()
-            loans_data.append(loan_data)
+        loans_data = serialize_loans_with_borrowers(loans.items)
         
         return jsonify({
             'loans': loans_data,
@@ -207,8 +171,40 @@ def get_all_loans():
     except Exception as e:
         return jsonify({'message': 'Failed to get loans', 'error': str(e)}), 500
 
+@admin_bp.route('/loans/schedules', methods=['GET'])
+@admin_required()
+def export_loan_schedules():
+    try:
+        # Amortization schedules of the open (or ?status=) loans as one CSV download
+        status = request.args.get('status')
+        statuses = [LoanStatus[value.strip().upper()] for value in status.split(',')] if status else OPEN_STATUSES
+        
+        loans = db.session.query(
+            Loan.id, Loan.user_id, Loan.principal_amount, Loan.interest_rate,
+            Loan.duration_months, Loan.approved_at
+        ).filter(Loan.status.in_(statuses)).order_by(Loan.id).all()
+        
+        record_activity(
+            admin_id=int(get_jwt_identity()),
+            action='EXPORT_SCHEDULES',
+            target_type='loan',
+            description=f'Exported amortization schedules of {len(loans)} loans',
+            ip_address=request.remote_addr
+        )
+        
+        return Response(
+            schedules_csv(loans),
+            mimetype='text/csv',
+            headers={'Content-Disposition': 'attachment; filename=loan_schedules.csv'}
+        )
+        
+    except KeyError as e:
+        return jsonify({'message': f'Unknown loan status: {e.args[0]}'}), 400
+    except Exception as e:
+        return jsonify({'message': 'Failed to export loan schedules', 'error': str(e)}), 500
+
 @admin_bp.route('/loans/<int:loan_id>/approve', methods=['POST'])
-@jwt_required()
+@admin_required()
 def approve_loan(loan_id):
     try:
         print(f"[ADMIN APPROVE] Approving loan {loan_id}")
@@ -225,19 +221,13 @@ def approve_loan(loan_id):
         loan.status = 'APPROVED'
         loan.approved_at = datetime.utcnow()
         
-        # Calculate due date (approval date + duration months)
-        year = loan.approved_at.year
-        month = loan.approved_at.month + loan.duration_months
-        
-        # Handle month overflow
-        while month > 12:
-            month -= 12
-            year += 1
+        # Monthly installments from the month after approval; due_date tracks the next one
+        generate_schedule(loan)
         
-        loan.due_date = loan.approved_at.replace(year=year, month=month)
+        db.session.commit()
         
         # Log admin activity
-        activity = AdminActivity(
+        record_activity(
             admin_id=int(admin_id),
             action='APPROVE_LOAN',
             target_type='loan',
@@ -246,9 +236,6 @@ def approve_loan(loan_id):
             ip_address=request.remote_addr
         )
         
-        db.session.add(activity)
-        db.session.commit()
-        
         return jsonify({
             'message': 'Loan approved successfully',
             'loan': loan.to_dict()
@@ -259,7 +246,7 @@ def approve_loan(loan_id):
         return jsonify({'message': 'Failed to approve loan', 'error': str(e)}), 500
 
 @admin_bp.route('/loans/<int:loan_id>/reject', methods=['POST'])
-@jwt_required()
+@admin_required()
 def reject_loan(loan_id):
     try:
         print(f"[ADMIN REJECT] Rejecting loan {loan_id}")
@@ -275,8 +262,10 @@ def reject_loan(loan_id):
         
         loan.status = 'REJECTED'
         
+        db.session.commit()
+        
         # Log admin activity
-        activity = AdminActivity(
+        record_activity(
             admin_id=int(admin_id),
             action='REJECT_LOAN',
             target_type='loan',
@@ -285,9 +274,6 @@ def reject_loan(loan_id):
             ip_address=request.remote_addr
         )
         
-        db.session.add(activity)
-        db.session.commit()
-        
         return jsonify({
             'message': 'Loan rejected successfully',
             'loan': loan.to_dict()
@@ -298,26 +284,41 @@ def reject_loan(loan_id):
         return jsonify({'message': 'Failed to reject loan', 'error': str(e)}), 500
 
 @admin_bp.route('/users', methods=['GET'])
-@jwt_required()
+@admin_required()
 def get_all_users():
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
         
-        users = User.query.order_by(desc(User.created_at)).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        sort_by = request.args.get('sort_by', 'created_at')
+        order = request.args.get('order', 'desc')
+        
+        has_active_loans = request.args.get('has_active_loans')
+        filters = {
+            'search': request.args.get('search'),
+            'member_status': request.args.get('member_status'),
+            'min_borrowed': request.args.get('min_borrowed', type=float),
+            'max_borrowed': request.args.get('max_borrowed', type=float),
+            'min_loans': request.args.get('min_loans', type=int),
+            'has_active_loans': has_active_loans.lower() == 'true' if has_active_loans else None
+        }
         
-        users_data = []
-        for user in users.items:
-            user_data = user.to_dict()
-            # Add loan count and total borrowed
-            user_loans = Loan.query.filter_by(user_id=user.id).all()
-            active_loans = Loan.query.filter_by(user_id=user.id, status='ACTIVE').all()
-            user_data['loan_count'] = len(user_loans)
-            user_data['active_loans'] = len(active_loans)
-            user_data['total_borrowed'] = sum(loan.principal_amount for loan in user_loans)
-            users_data.append(user_data)
+        try:
+            query = member_directory_query(sort_by=sort_by, order=order, filters=filters)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        users = query.paginate(page=page, per_page=per_page, error_out=False)
+        
+        page_users = [row.User for row in users.items]
+        users_data = User.bulk_to_dict(page_users)
+        for row, user_data in zip(users.items, users_data):
+            user_data['loan_count'] = int(row.loan_count)
+            user_data['active_loans'] = int(row.active_loans)
+            user_data['total_borrowed'] = float(row.total_borrowed)
+            user_data['total_paid'] = float(row.total_paid)
+            user_data['savings_balance'] = float(row.savings_balance)
+            user_data['unpaid_penalties'] = float(row.unpaid_penalties)
         
         return jsonify({
             'users': users_data,
@@ -330,35 +331,47 @@ def get_all_users():
         return jsonify({'message': 'Failed to get users', 'error': str(e)}), 500
 
 @admin_bp.route('/recovery-rates', methods=['GET'])
-@jwt_required()
+@admin_required()
 def get_recovery_rates():
     try:
-        # Calculate recovery rates
-        total_loans = Loan.query.count()
-        
-        # Open, Fully Paid, Default Loans
-        completed_loans = Loan.query.filter_by(status='COMPLETED').count()
-        active_loans = Loan.query.filter_by(status='ACTIVE').count()
-        default_loans = Loan.query.filter_by(status='REJECTED').count()
-        
-        # Calculate percentages
-        open_fully_paid_rate = ((completed_loans + active_loans) / total_loans * 100) if total_loans > 0 else 0
-        open_loans_rate = (active_loans / total_loans * 100) if total_loans > 0 else 0
-        
-        return jsonify({
-            'open_fully_paid_default': round(open_fully_paid_rate, 1),
-            'open_loans': round(open_loans_rate, 1),
-            'total_loans': total_loans,
-            'completed_loans': completed_loans,
-            'active_loans': active_loans,
-            'default_loans': default_loans
-        }), 200
+        return jsonify(cached_aggregate('recovery-rates', recovery_rates_payload)), 200
         
     except Exception as e:
         return jsonify({'message': 'Failed to get recovery rates', 'error': str(e)}), 500
 
+def recovery_rates_payload():
+    summary = get_portfolio_summary()
+    
+    # Open, Fully Paid, Default Loans
+    total_loans = summary.total_loans
+    completed_loans = summary.loan_count(LoanStatus.COMPLETED)
+    active_loans = summary.loan_count(LoanStatus.ACTIVE)
+    default_loans = summary.loan_count(LoanStatus.REJECTED)
+    
+    # Calculate percentages
+    open_fully_paid_rate = ((completed_loans + active_loans) / total_loans * 100) if total_loans > 0 else 0
+    open_loans_rate = (active_loans / total_loans * 100) if total_loans > 0 else 0
+    
+    return {
+        'open_fully_paid_default': round(open_fully_paid_rate, 1),
+        'open_loans': round(open_loans_rate, 1),
+        'total_loans': total_loans,
+        'completed_loans': completed_loans,
+        'active_loans': active_loans,
+        'default_loans': default_loans
+    }
+
+@admin_bp.route('/cache/stats', methods=['GET'])
+@admin_required()
+def get_cache_stats():
+    try:
+        return jsonify(get_cache().stats()), 200
+        
+    except Exception as e:
+        return jsonify({'message': 'Failed to get cache stats', 'error': str(e)}), 500
+
 @admin_bp.route('/users', methods=['POST'])
-@jwt_required()
+@admin_required()
 def create_user():
     try:
         data = request.get_json()
@@ -393,17 +406,16 @@ def create_user():
         user.update_membership_status()
         
         db.session.add(user)
+        db.session.commit()
         
         # Log activity
         admin_id = get_jwt_identity()
-        activity = AdminActivity(
+        record_activity(
             admin_id=int(admin_id),
             action='CREATE_USER',
             description=f'Created user: {user.first_name} {user.last_name}',
             ip_address=request.remote_addr
         )
-        db.session.add(activity)
-        db.session.commit()
         
         return jsonify({
             'message': 'User created successfully',
@@ -415,7 +427,7 @@ def create_user():
         return jsonify({'message': 'Failed to create user', 'error': str(e)}), 500
 
 @admin_bp.route('/users/<int:user_id>', methods=['PUT'])
-@jwt_required()
+@admin_required()
 def update_user(user_id):
     try:
         user = User.query.get(user_id)
@@ -443,7 +455,9 @@ def update_user(user_id):
         if 'capital_share' in data:
             user.capital_share = float(data['capital_share'])
             # Update membership status and loan eligibility based on capital share
-            user.update_membership_status()
+            db.session.flush()
+            recompute_membership([user.id])
+            db.session.expire(user, ['member_status', 'loan_eligibility'])
         # Allow manual override for admin only if not updating capital_share
         elif 'member_status' in data:
             user.member_status = data['member_status']
@@ -452,16 +466,16 @@ def update_user(user_id):
         
         user.updated_at = datetime.utcnow()
         
+        db.session.commit()
+        
         # Log activity
         admin_id = get_jwt_identity()
-        activity = AdminActivity(
+        record_activity(
             admin_id=int(admin_id),
             action='UPDATE_USER',
             description=f'Updated user: {user.first_name} {user.last_name}',
             ip_address=request.remote_addr
         )
-        db.session.add(activity)
-        db.session.commit()
         
         return jsonify({
             'message': 'User updated successfully',
@@ -473,7 +487,7 @@ def update_user(user_id):
         return jsonify({'message': 'Failed to update user', 'error': str(e)}), 500
 
 @admin_bp.route('/users/<int:user_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required()
 def delete_user(user_id):
     try:
         # Temporarily disable foreign key constraints for this operation
@@ -534,6 +548,8 @@ def delete_user(user_id):
             
             # Delete savings
             Saving.query.filter_by(user_id=user_id).delete()
+            SavingsAccount.query.filter_by(user_id=user_id).delete()
+            MemberRollup.query.filter_by(user_id=user_id).delete()
             
             # We keep loan records for audit but update their status (already done above)
             
@@ -552,14 +568,14 @@ def delete_user(user_id):
         if active_loans:
             activity_description += f'. Had {len(active_loans)} active loans. Actions: {"; ".join(loans_action_taken)}'
         
-        activity = AdminActivity(
+        db.session.commit()
+        
+        record_activity(
             admin_id=int(admin_id),
             action='DELETE_USER_WITH_REASON',
             description=activity_description,
             ip_address=request.remote_addr
         )
-        db.session.add(activity)
-        db.session.commit()
         
         # Re-enable foreign key constraints
         db.session.execute(text('PRAGMA foreign_keys=ON'))
@@ -585,35 +601,26 @@ def delete_user(user_id):
         return jsonify({'message': 'Failed to delete user', 'error': str(e)}), 500
 
 @admin_bp.route('/loans/overdue', methods=['GET'])
-@jwt_required()
+@admin_required()
 def get_overdue_loans():
     try:
-        # Get all active loans that are past their due date
+        # Get all open or defaulted loans with installments past their due date
         today = datetime.utcnow()
+        overdue = overdue_query(today).subquery()
         
-        overdue_loans = Loan.query.filter(
-            Loan.status == 'ACTIVE',
-            Loan.due_date < today,
-            Loan.due_date.isnot(None)
-        ).join(User).all()
-        
-        loans_data = []
-        for loan in overdue_loans:
-            loan_data = loan.to_dict()
-            user = User.query.get(loan.user_id)
-            loan_data['user'] = user.to_dict()
-            
-            # Calculate days overdue
-            if loan.due_date:
-                days_overdue = (today - loan.due_date).days
-                loan_data['days_overdue'] = days_overdue
-            else:
-                loan_data['days_overdue'] = 0
-            
-            loans_data.append(loan_data)
+        rows = loans_with_borrowers(
+            db.session.query(Loan, overdue.c.amount_overdue, overdue.c.oldest_due_date)
+            .join(overdue, overdue.c.loan_id == Loan.id)
+        ).filter(
+            Loan.status.in_(COLLECTION_STATUSES)
+        ).order_by(overdue.c.oldest_due_date, Loan.id).all()
         
-        # Sort by days overdue (most overdue first)
-        loans_data.sort(key=lambda x: x['days_overdue'], reverse=True)
+        # Most overdue first, since the oldest missed installment sorts first
+        loans_data = serialize_loans_with_borrowers([loan for loan, _, _ in rows])
+        for (loan, amount_overdue, oldest_due_date), loan_data in zip(rows, loans_data):
+            loan_data['days_overdue'] = (today - oldest_due_date).days
+            loan_data['amount_overdue'] = round(float(amount_overdue), 2)
+            loan_data['delinquency_bucket'] = loan.delinquency_bucket
         
         return jsonify({
             'overdue_loans': loans_data,
@@ -624,138 +631,108 @@ def get_overdue_loans():
         return jsonify({'message': 'Failed to get overdue loans', 'error': str(e)}), 500
 
 @admin_bp.route('/activities', methods=['GET'])
-@jwt_required()
+@admin_required()
 def get_admin_activities():
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        action_filter = request.args.get('action')
-        date_filter = request.args.get('date_filter')
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        
-        # Build query
-        query = AdminActivity.query.join(Admin)
+        # Write queued entries first so the log includes the admin's latest actions;
+        # a failed write leaves them queued and the read goes ahead
+        audit_log().try_flush()
         
-        # Filter by action
-        if action_filter:
-            query = query.filter(AdminActivity.action == action_filter)
-        
-        # Filter by date
-        if date_filter:
-            today = datetime.utcnow()
-            
-            if date_filter == 'today':
-                start_of_day = today.replace(hour=0, minute=0, second=0, microsecond=0)
-                query = query.filter(AdminActivity.created_at >= start_of_day)
-            
-            elif date_filter == 'week':
-                start_of_week = today - timedelta(days=today.weekday())
-                start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-                query = query.filter(AdminActivity.created_at >= start_of_week)
-            
-            elif date_filter == 'month':
-                start_of_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                query = query.filter(AdminActivity.created_at >= start_of_month)
-            
-            elif date_filter == 'year':
-                start_of_year = today.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-                query = query.filter(AdminActivity.created_at >= start_of_year)
-        
-        # Custom date range
-        if start_date:
-            try:
-                start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-                query = query.filter(AdminActivity.created_at >= start_dt)
-            except ValueError:
-                pass
-        
-        if end_date:
-            try:
-                end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-                end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                query = query.filter(AdminActivity.created_at <= end_dt)
-            except ValueError:
-                pass
-        
-        # Paginate and order by most recent first
-        activities = query.order_by(desc(AdminActivity.created_at)).paginate(
-            page=page, per_page=per_page, error_out=False
+        per_page = max(1, min(request.args.get('per_page', 20, type=int), 100))
+        cursor = request.args.get('cursor')
+        page = request.args.get('page', type=int)
+        action_filter = request.args.get('action')
+        since, until = activity_date_range(
+            request.args.get('date_filter'),
+            request.args.get('start_date'),
+            request.args.get('end_date')
         )
         
-        activities_data = []
-        for activity in activities.items:
-            admin = Admin.query.get(activity.admin_id)
-            activity_data = activity.to_dict()
-            activity_data['admin_name'] = f"{admin.first_name} {admin.last_name}" if admin else "Unknown Admin"
-            activities_data.append(activity_data)
+        if page and not cursor:
+            # Legacy page-number access; deep pages cost an OFFSET scan
+            activities = activity_log_query(action_filter, since, until).paginate(
+                page=page, per_page=per_page, error_out=False
+            )
+            return jsonify({
+                'activities': [serialize_activity(row) for row in activities.items],
+                'total': activities.total,
+                'pages': activities.pages,
+                'current_page': page
+            }), 200
         
-        return jsonify({
+        try:
+            activities_data, next_cursor = get_activity_page(
+                limit=per_page, cursor=cursor, action=action_filter, since=since, until=until
+            )
+        except ValueError:
+            return jsonify({'message': 'Invalid cursor'}), 400
+        
+        response = {
             'activities': activities_data,
-            'total': activities.total,
-            'pages': activities.pages,
-            'current_page': page
-        }), 200
+            'next_cursor': next_cursor
+        }
+        if request.args.get('include_total', '').lower() in ('1', 'true'):
+            response['total'] = count_activities(action_filter, since, until)
+        
+        return jsonify(response), 200
         
     except Exception as e:
         return jsonify({'message': 'Failed to get admin activities', 'error': str(e)}), 500
 
 @admin_bp.route('/savings', methods=['GET'])
-@jwt_required()
+@admin_required()
 def get_all_savings():
     """Get all user savings accounts with summary data"""
     try:
         admin_id = get_jwt_identity()
         
         # Log activity
-        activity = AdminActivity(
-            admin_id=admin_id,
+        record_activity(
+            admin_id=int(admin_id),
             action='VIEW_SAVINGS',
             description='Admin viewed savings accounts',
             ip_address=request.remote_addr
         )
-        db.session.add(activity)
-        db.session.commit()
         
-        # Get all users with their savings data
-        users_query = db.session.query(
-            User.id,
-            User.user_id,
-            func.concat(User.first_name, ' ', User.last_name).label('user_name'),
-            User.email,
-            func.coalesce(func.sum(Saving.balance), 0).label('total_balance'),
-            func.max(Saving.created_at).label('last_deposit_date')
-        ).outerjoin(Saving, User.id == Saving.user_id)\
-         .group_by(User.id, User.user_id, User.first_name, User.last_name, User.email)
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 50, type=int)
+        sort_by = request.args.get('sort_by', 'balance')
+        order = request.args.get('order', 'desc')
         
-        savings_accounts = []
+        try:
+            query = savings_accounts_query(sort_by=sort_by, order=order)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
         
-        for user in users_query.all():
-            # Get last deposit amount
-            last_deposit = Saving.query.filter_by(user_id=user.id)\
-                                     .order_by(desc(Saving.created_at))\
-                                     .first()
-            
-            last_deposit_amount = last_deposit.amount if last_deposit else 0
-            
+        accounts = query.paginate(page=page, per_page=per_page, error_out=False)
+        
+        now = datetime.utcnow()
+        savings_accounts = []
+        for account in accounts.items:
+            last_deposit_date = account.last_deposit_date
             savings_accounts.append({
-                'user_id': user.id,
-                'user_name': user.user_name,
-                'email': user.email,
-                'total_balance': float(user.total_balance),
-                'last_deposit_amount': float(last_deposit_amount),
-                'last_deposit_date': user.last_deposit_date.isoformat() if user.last_deposit_date else None
+                'user_id': account.id,
+                'user_name': f"{account.first_name} {account.last_name}",
+                'email': account.email,
+                'total_balance': float(account.total_balance),
+                'last_deposit_amount': float(account.last_deposit_amount),
+                'last_deposit_date': last_deposit_date.isoformat() if last_deposit_date else None,
+                'days_since_last_deposit': (now - last_deposit_date).days if last_deposit_date else None
             })
         
         return jsonify({
-            'savings_accounts': savings_accounts
+            'savings_accounts': savings_accounts,
+            'summary': savings_summary(now),
+            'total': accounts.total,
+            'pages': accounts.pages,
+            'current_page': page
         }), 200
         
     except Exception as e:
         return jsonify({'message': 'Failed to get savings data', 'error': str(e)}), 500
 
 @admin_bp.route('/savings/<int:user_id>/transactions', methods=['GET'])
-@jwt_required()
+@admin_required()
 def get_user_savings_transactions(user_id):
     """Get all savings transactions for a specific user"""
     try:
@@ -766,14 +743,12 @@ def get_user_savings_transactions(user_id):
         if not user:
             return jsonify({'message': 'User not found'}), 404
         
-        activity = AdminActivity(
-            admin_id=admin_id,
+        record_activity(
+            admin_id=int(admin_id),
             action='VIEW_USER_SAVINGS',
             description=f'Admin viewed savings transactions for user {user.first_name} {user.last_name}',
             ip_address=request.remote_addr
         )
-        db.session.add(activity)
-        db.session.commit()
         
         # Get all savings-related transactions for this user
         transactions = Transaction.query.filter(
@@ -805,23 +780,23 @@ def get_user_savings_transactions(user_id):
 
 # Reports Routes - MOVED TO routes/reports.py
 # @admin_bp.route('/reports/stats', methods=['GET'])
-# @jwt_required()
+# @admin_required()
 # def get_reports_stats():
 #     (old code commented out - now using routes/reports.py)
 
 # @admin_bp.route('/reports/activities', methods=['GET'])
-# @jwt_required()
+# @admin_required()
 # def get_reports_activities():
 #     (old code commented out - now using routes/reports.py)
 
 # @admin_bp.route('/reports/charts', methods=['GET'])
-# @jwt_required()
+# @admin_required()
 # def get_reports_charts():
 #     (old code commented out - now using routes/reports.py)
 
 # Settings endpoints
 @admin_bp.route('/settings/profile', methods=['PUT'])
-@jwt_required()
+@admin_required()
 def update_admin_profile():
     try:
         admin_id = get_jwt_identity()
@@ -879,15 +854,15 @@ def update_admin_profile():
         
         admin.updated_at = datetime.utcnow()
         
+        db.session.commit()
+        
         # Log activity
-        activity = AdminActivity(
+        record_activity(
             admin_id=admin.id,
             action='PROFILE_UPDATE',
             description=f'Admin {admin.username} updated their profile',
             ip_address=request.remote_addr
         )
-        db.session.add(activity)
-        db.session.commit()
         
         return jsonify({
             'message': 'Profile updated successfully',
@@ -899,7 +874,7 @@ def update_admin_profile():
         return jsonify({'message': 'Failed to update profile', 'error': str(e)}), 500
 
 @admin_bp.route('/settings/admins', methods=['GET'])
-@jwt_required()
+@admin_required()
 def get_admin_list():
     try:
         admins = Admin.query.filter(Admin.is_active == True).all()
@@ -911,14 +886,11 @@ def get_admin_list():
         return jsonify({'message': 'Failed to get admin list', 'error': str(e)}), 500
 
 @admin_bp.route('/settings/create-admin', methods=['POST'])
-@jwt_required()
+@admin_required(role='admin')
 def create_admin():
     try:
-        current_admin_id = get_jwt_identity()
-        current_admin = Admin.query.get(current_admin_id)
-        
-        if not current_admin:
-            return jsonify({'message': 'Admin not found'}), 404
+        current_admin_id = int(get_jwt_identity())
+        current_admin_username = get_jwt()['username']
         
         data = request.get_json()
         
@@ -955,20 +927,19 @@ def create_admin():
             email=data['email'],
             password_hash=bcrypt.generate_password_hash(data['password']).decode('utf-8'),
             is_active=True,
-            created_by=current_admin.id
+            created_by=current_admin_id
         )
         
         db.session.add(new_admin)
+        db.session.commit()
         
         # Log activity
-        activity = AdminActivity(
-            admin_id=current_admin.id,
+        record_activity(
+            admin_id=current_admin_id,
             action='CREATE_ADMIN',
-            description=f'Admin {current_admin.username} created new admin account: {data["username"]}',
+            description=f'Admin {current_admin_username} created new admin account: {data["username"]}',
             ip_address=request.remote_addr
         )
-        db.session.add(activity)
-        db.session.commit()
         
         return jsonify({
             'message': 'Admin account created successfully',
@@ -980,17 +951,14 @@ def create_admin():
         return jsonify({'message': 'Failed to create admin account', 'error': str(e)}), 500
 
 @admin_bp.route('/settings/admin/<int:admin_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required(role='admin')
 def delete_admin(admin_id):
     try:
-        current_admin_id = get_jwt_identity()
-        current_admin = Admin.query.get(current_admin_id)
-        
-        if not current_admin:
-            return jsonify({'message': 'Admin not found'}), 404
+        current_admin_id = int(get_jwt_identity())
+        current_admin_username = get_jwt()['username']
         
         # Prevent self-deletion
-        if str(admin_id) == str(current_admin_id):
+        if admin_id == current_admin_id:
             return jsonify({'message': 'Cannot delete your own account'}), 400
         
         admin_to_delete = Admin.query.get(admin_id)
@@ -1001,15 +969,18 @@ def delete_admin(admin_id):
         admin_to_delete.is_active = False
         admin_to_delete.updated_at = datetime.utcnow()
         
+        db.session.commit()
+        
         # Log activity
-        activity = AdminActivity(
-            admin_id=current_admin.id,
+        record_activity(
+            admin_id=current_admin_id,
             action='DELETE_ADMIN',
-            description=f'Admin {current_admin.username} deleted admin account: {admin_to_delete.username}',
+            description=f'Admin {current_admin_username} deleted admin account: {admin_to_delete.username}',
             ip_address=request.remote_addr
         )
-        db.session.add(activity)
-        db.session.commit()
+        
+        # Reject the deleted admin's outstanding tokens without waiting for the next refresh
+        revocations().revoke(admin_to_delete.id)
         
         return jsonify({'message': 'Admin account deleted successfully'}), 200
         
@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required
 from werkzeug.security import generate_password_hash, check_password_hash
 from models import User
 from extensions import db
+from services.current_member import current_member, member_dict
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -79,14 +80,12 @@ def login():
 @jwt_required()
 def get_profile():
     try:
-        user_id = get_jwt_identity()
-        # get_jwt_identity returns a string (we stored str(id)), cast to int for primary key lookup
-        user = User.query.get(int(user_id))
+        user = current_member()
         
         if not user:
             return jsonify({'message': 'User not found'}), 404
             
-        return jsonify({'user': user.to_dict()}), 200
+        return jsonify({'user': member_dict(user)}), 200
         
     except Exception as e:
         return jsonify({'message': 'Failed to get profile', 'error': str(e)}), 500
\ No newline at end of file
@@ -2,6 +2,13 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import Loan, LoanStatus, LoanType
 from extensions import db
+from services.member_versions import member_etag
+from services.current_member import current_member
+from services.installments import generate_schedule
+from services.member_rollups import get_rollup
+from services.amortization import monthly_payment as level_payment, loan_schedule
+from services.loan_quotes import quote_grid, loan_rate, member_verdict, DEFAULTED_REASON
+from datetime import datetime
 import uuid
 
 loans_bp = Blueprint('loans', __name__)
@@ -13,34 +20,40 @@ def check_loan_eligibility():
     try:
         user_id = int(get_jwt_identity())
         
-        # Check for active (approved) loans
-        active_loans = Loan.query.filter_by(
-            user_id=user_id, 
-            status=LoanStatus.APPROVED
-        ).all()
+        # Defaulted and approved loan counts and the lowest repayment share come from the member's rollup
+        rollup = get_rollup(user_id)
+        if rollup and rollup.defaulted_loans:
+            return jsonify({
+                'eligible': False,
+                'message': DEFAULTED_REASON
+            }), 200
         
-        if not active_loans:
+        if not rollup or not rollup.approved_loans:
             # No active loans, user can apply
             return jsonify({
                 'eligible': True,
                 'message': 'No active loans found. You can apply for a loan.'
             }), 200
         
-        # Check if user has paid over 50% of any active loan
-        for loan in active_loans:
+        # Check if user has paid over 50% of every active loan
+        if rollup.least_repaid_percentage < 50:
+            loan = Loan.query.filter(
+                Loan.user_id == user_id,
+                Loan.status == LoanStatus.APPROVED,
+                Loan.principal_amount > 0
+            ).order_by((Loan.principal_amount - Loan.remaining_balance) / Loan.principal_amount).first()
             paid_amount = loan.principal_amount - loan.remaining_balance
             payment_percentage = (paid_amount / loan.principal_amount) * 100
             
-            if payment_percentage < 50:
-                return jsonify({
-                    'eligible': False,
-                    'message': f'You must pay at least 50% of your active loan before applying for a new one. Current payment: {payment_percentage:.1f}%',
-                    'payment_percentage': round(payment_percentage, 2),
-                    'remaining_to_50': round(50 - payment_percentage, 2),
-                    'loan_id': loan.loan_id,
-                    'principal_amount': loan.principal_amount,
-                    'remaining_balance': loan.remaining_balance
-                }), 200
+            return jsonify({
+                'eligible': False,
+                'message': f'You must pay at least 50% of your active loan before applying for a new one. Current payment: {payment_percentage:.1f}%',
+                'payment_percentage': round(payment_percentage, 2),
+                'remaining_to_50': round(50 - payment_percentage, 2),
+                'loan_id': loan.loan_id,
+                'principal_amount': loan.principal_amount,
+                'remaining_balance': loan.remaining_balance
+            }), 200
         
         # All active loans have > 50% paid
         return jsonify({
@@ -53,6 +66,7 @@ def check_loan_eligibility():
 
 @loans_bp.route('/', methods=['GET'])
 @jwt_required()
+@member_etag()
 def get_user_loans():
     try:
         print(f"[LOANS] JWT authentication successful")
@@ -73,6 +87,33 @@ def get_user_loans():
     except Exception as e:
         return jsonify({'message': 'Failed to get loans', 'error': str(e)}), 500
 
+@loans_bp.route('/quote', methods=['POST'])
+@jwt_required()
+def quote_loans():
+    """Monthly payment, totals and eligibility for every principal x duration x loan type"""
+    try:
+        user = current_member()
+        if not user:
+            return jsonify({'message': 'User not found'}), 404
+        
+        data = request.get_json() or {}
+        try:
+            principals = [float(value) for value in data.get('principals', [])]
+            durations = [int(value) for value in data.get('durations', [])]
+            loan_types = [LoanType(value) for value in data.get('loan_types') or [LoanType.PERSONAL.value]]
+        except (TypeError, ValueError) as e:
+            return jsonify({'message': 'Invalid quote request', 'error': str(e)}), 400
+        if any(principal <= 0 for principal in principals) or any(duration < 1 for duration in durations):
+            return jsonify({'message': 'Principals must be positive and durations at least 1 month'}), 400
+        
+        try:
+            return jsonify(quote_grid(user, principals, durations, loan_types)), 200
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        
+    except Exception as e:
+        return jsonify({'message': 'Failed to quote loans', 'error': str(e)}), 500
+
 @loans_bp.route('/apply', methods=['POST'])
 @jwt_required()
 def apply_for_loan():
@@ -91,40 +132,18 @@ def apply_for_loan():
                 return jsonify({'message': f'{field} is required'}), 400
         
         # Check user eligibility
-        from models import User
-        user = User.query.get(user_id)
+        user = current_member()
+        if not user:
+            return jsonify({'message': 'User not found'}), 404
         print(f"Found user: {user.first_name} {user.last_name}")
         print(f"Capital share: ₱{user.capital_share:,.2f}")
         print(f"Loan eligibility: {user.loan_eligibility}")
         
-        if not user.loan_eligibility:
-            print("❌ User not eligible for loan")
-            return jsonify({'message': 'User not eligible for loan. Minimum capital share of 20,000 PHP required.'}), 400
-        
-        # Check if user has paid over 50% of active loans
-        active_loans = Loan.query.filter_by(
-            user_id=user_id, 
-            status=LoanStatus.APPROVED
-        ).all()
-        
-        for loan in active_loans:
-            paid_amount = loan.principal_amount - loan.remaining_balance
-            payment_percentage = (paid_amount / loan.principal_amount) * 100
-            
-            if payment_percentage < 50:
-                print(f"❌ User has not paid 50% of active loan. Current: {payment_percentage:.1f}%")
-                return jsonify({
-                    'message': f'You must pay at least 50% of your active loan before applying for a new one. Current payment: {payment_percentage:.1f}%'
-                }), 400
-        
-        # Calculate monthly payment (simplified calculation)
-        principal = float(data['principal_amount'])
-        duration = int(data['duration_months'])
-        interest_rate = 0.05  # 5% default interest rate
-        
-        # Simple interest calculation
-        monthly_interest_rate = interest_rate / 12
-        monthly_payment = (principal * monthly_interest_rate * (1 + monthly_interest_rate)**duration) / ((1 + monthly_interest_rate)**duration - 1)
+        # Same capital share and repayment checks as the quote endpoint
+        eligible, reason = member_verdict(user)
+        if not eligible:
+            print(f"❌ {reason}")
+            return jsonify({'message': reason}), 400
         
         # Create loan application
         loan_type = LoanType.PERSONAL  # default
@@ -134,10 +153,18 @@ def apply_for_loan():
             except ValueError:
                 loan_type = LoanType.PERSONAL
         
+        # Level payment of a loan amortized monthly at its type's rate (see services/loan_quotes.py)
+        principal = float(data['principal_amount'])
+        duration = int(data['duration_months'])
+        if duration < 1:
+            return jsonify({'message': 'duration_months must be at least 1'}), 400
+        interest_rate = loan_rate(loan_type)
+        monthly_payment = level_payment(principal, interest_rate, duration)
+        
         loan = Loan(
             user_id=user_id,
             principal_amount=principal,
-            interest_rate=interest_rate * 100,  # Store as percentage
+            interest_rate=interest_rate,  # Stored as percentage
             duration_months=duration,
             monthly_payment=monthly_payment,
             remaining_balance=principal,
@@ -176,6 +203,8 @@ def approve_loan(loan_id):
             return jsonify({'message': 'Loan not found'}), 404
             
         loan.status = LoanStatus.APPROVED
+        loan.approved_at = loan.approved_at or datetime.utcnow()
+        generate_schedule(loan)
         db.session.commit()
         
         return jsonify({
@@ -200,4 +229,19 @@ def get_loan_details(loan_id):
         return jsonify({'loan': loan.to_dict()}), 200
         
     except Exception as e:
-        return jsonify({'message': 'Failed to get loan details', 'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'message': 'Failed to get loan details', 'error': str(e)}), 500
+
+@loans_bp.route('/<int:loan_id>/schedule', methods=['GET'])
+@jwt_required()
+def get_loan_schedule(loan_id):
+    try:
+        user_id = get_jwt_identity()
+        loan = Loan.query.filter_by(id=loan_id, user_id=user_id).first()
+        
+        if not loan:
+            return jsonify({'message': 'Loan not found'}), 404
+            
+        return jsonify(loan_schedule(loan)), 200
+        
+    except Exception as e:
+        return jsonify({'message': 'Failed to get loan schedule', 'error': str(e)}), 500
@@ -2,6 +2,8 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import Payment, Loan
 from extensions import db
+from services.member_versions import member_etag
+from services.installments import allocate_payment, close_schedule
 from datetime import datetime
 import uuid
 
@@ -9,6 +11,7 @@ payments_bp = Blueprint('payments', __name__)
 
 @payments_bp.route('/', methods=['GET'])
 @jwt_required()
+@member_etag()
 def get_user_payments():
     try:
         user_id = get_jwt_identity()
@@ -52,13 +55,14 @@ def make_payment():
         # Update loan balance
         loan.remaining_balance = max(0, loan.remaining_balance - amount)
         
+        # Settle installments oldest first; due_date moves to the next open one
+        allocate_payment(loan, amount)
+
         # Mark loan as completed if balance is zero
         if loan.remaining_balance == 0:
             from models import LoanStatus
             loan.status = LoanStatus.COMPLETED
-        else:
-            # Update due date for next payment (advance by 30 days)
-            loan.update_due_date_after_payment()
+            close_schedule(loan)
         
         db.session.add(payment)
         db.session.commit()
@@ -75,6 +79,7 @@ def make_payment():
 
 @payments_bp.route('/history', methods=['GET'])
 @jwt_required()
+@member_etag()
 def get_payment_history():
     try:
         user_id = get_jwt_identity()
@@ -1,99 +1,60 @@
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import User, Loan, Payment, Saving, Transaction, LoanStatus
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import get_jwt_identity
+from models import User, Loan, Payment, Saving, Transaction, LoanStatus, PortfolioSnapshot
 from admin_models import Admin, AdminActivity
 from extensions import db
 from datetime import datetime, timedelta
 from sqlalchemy import func, extract
+from services.activity_feed import get_activity_feed
+from services.portfolio import get_portfolio_summary, DISBURSED_STATUSES, OPEN_STATUSES, COLLECTION_STATUSES
+from services.time_series import loan_payment_series, last_months
+from services.admin_auth import admin_required
+from services.portfolio_snapshots import snapshots_between
 
 reports_bp = Blueprint('reports', __name__)
 
+TREND_METRICS = (
+    'outstanding', 'disbursed', 'collected', 'savings',
+    'par30', 'par60', 'par90', 'par30_ratio', 'par60_ratio', 'par90_ratio',
+    'total_members', 'loans_by_status'
+)
+
 @reports_bp.route('/stats', methods=['GET'])
-@jwt_required()
+@admin_required()
 def get_stats():
     try:
         # Get overall statistics
-        total_users = User.query.count()
-        total_loans = Loan.query.count()
-        active_loans = Loan.query.filter(Loan.status.in_([LoanStatus.APPROVED, LoanStatus.ACTIVE])).count()
-        
-        total_disbursed = db.session.query(func.sum(Loan.principal_amount)).filter(
-            Loan.status.in_([LoanStatus.APPROVED, LoanStatus.ACTIVE, LoanStatus.COMPLETED])
-        ).scalar() or 0
-        
-        total_collected = db.session.query(func.sum(Payment.amount)).scalar() or 0
-        total_savings = db.session.query(func.sum(Saving.balance)).scalar() or 0
-        
-        pending_loans = Loan.query.filter_by(status=LoanStatus.PENDING).count()
+        summary = get_portfolio_summary()
         
         return jsonify({
-            'total_users': total_users,
-            'total_loans': total_loans,
-            'active_loans': active_loans,
-            'total_disbursed': float(total_disbursed),
-            'total_collected': float(total_collected),
-            'total_savings': float(total_savings),
-            'pending_loans': pending_loans
+            'total_users': summary.total_users,
+            'total_loans': summary.total_loans,
+            'active_loans': summary.loan_count(*OPEN_STATUSES),
+            'total_disbursed': summary.principal(*DISBURSED_STATUSES),
+            'total_collected': summary.total_collected,
+            'total_savings': summary.total_savings,
+            'pending_loans': summary.loan_count(LoanStatus.PENDING)
         })
     except Exception as e:
         print(f"Error fetching stats: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 @reports_bp.route('/activities', methods=['GET'])
-@jwt_required()
+@admin_required()
 def get_activities():
     try:
-        # Get recent customer activities (loans, payments, savings)
-        activities = []
-        
-        # Get recent loan applications
-        recent_loans = Loan.query.order_by(Loan.created_at.desc()).limit(20).all()
-        for loan in recent_loans:
-            user = User.query.get(loan.user_id)
-            if user:
-                activities.append({
-                    'id': f'loan_{loan.id}',
-                    'type': 'loan',
-                    'description': f'Applied for {loan.loan_type.value} loan of ₱{loan.principal_amount:,.2f}',
-                    'user': f'{user.first_name} {user.last_name}',
-                    'timestamp': loan.created_at.isoformat(),
-                    'status': loan.status.value
-                })
-        
-        # Get recent payments
-        recent_payments = Payment.query.order_by(Payment.payment_date.desc()).limit(20).all()
-        for payment in recent_payments:
-            user = User.query.get(payment.user_id)
-            if user:
-                activities.append({
-                    'id': f'payment_{payment.id}',
-                    'type': 'payment',
-                    'description': f'Made a payment of ₱{payment.amount:,.2f}',
-                    'user': f'{user.first_name} {user.last_name}',
-                    'timestamp': payment.payment_date.isoformat(),
-                    'status': payment.status
-                })
-        
-        # Get recent savings transactions
-        recent_savings = Saving.query.order_by(Saving.created_at.desc()).limit(20).all()
-        for saving in recent_savings:
-            user = User.query.get(saving.user_id)
-            if user:
-                transaction_type = 'deposit' if saving.amount > 0 else 'withdrawal'
-                activities.append({
-                    'id': f'saving_{saving.id}',
-                    'type': 'savings',
-                    'description': f'Made a savings {transaction_type} of ₱{abs(saving.amount):,.2f}',
-                    'user': f'{user.first_name} {user.last_name}',
-                    'timestamp': saving.created_at.isoformat(),
-                    'status': 'completed'
-                })
-        
-        # Sort all activities by timestamp (most recent first)
-        activities.sort(key=lambda x: x['timestamp'], reverse=True)
-        
-        # Return top 50 activities
-        return jsonify({'activities': activities[:50]})
+        # Recent customer activities (loans, payments, savings), merged in SQL
+        limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+        cursor = request.args.get('cursor')
+        types = request.args.get('type')
+        types = types.split(',') if types else None
+        
+        try:
+            activities, next_cursor = get_activity_feed(limit=limit, cursor=cursor, types=types)
+        except ValueError:
+            return jsonify({'message': 'Invalid cursor'}), 400
+        
+        return jsonify({'activities': activities, 'next_cursor': next_cursor})
     except Exception as e:
         print(f"Error fetching activities: {str(e)}")
         import traceback
@@ -101,38 +62,30 @@ def get_activities():
         return jsonify({'activities': []})
 
 @reports_bp.route('/charts', methods=['GET'])
-@jwt_required()
+@admin_required()
 def get_charts_data():
     try:
         print("=== FETCHING CHARTS DATA ===")
         
-        # 1. LOAN STATUS DISTRIBUTION (Doughnut/Pie Chart)
-        pending_loans = Loan.query.filter_by(status=LoanStatus.PENDING).count()
-        approved_loans = Loan.query.filter(Loan.status.in_([LoanStatus.APPROVED, LoanStatus.ACTIVE])).count()
-        completed_loans = Loan.query.filter_by(status=LoanStatus.COMPLETED).count()
-        rejected_loans = Loan.query.filter_by(status=LoanStatus.REJECTED).count()
+        summary = get_portfolio_summary()
         
-        print(f"Loan Status: Pending={pending_loans}, Active={approved_loans}, Completed={completed_loans}, Rejected={rejected_loans}")
+        # 1. LOAN STATUS DISTRIBUTION (Doughnut/Pie Chart)
+        pending_loans = summary.loan_count(LoanStatus.PENDING)
+        approved_loans = summary.loan_count(*OPEN_STATUSES)
+        completed_loans = summary.loan_count(LoanStatus.COMPLETED)
+        rejected_loans = summary.loan_count(LoanStatus.REJECTED)
         
         # 2. FINANCIAL OVERVIEW (Bar Chart)
-        total_savings = db.session.query(func.sum(Saving.balance)).scalar() or 0
-        total_loans_disbursed = db.session.query(func.sum(Loan.principal_amount)).filter(
-            Loan.status.in_([LoanStatus.APPROVED, LoanStatus.ACTIVE, LoanStatus.COMPLETED])
-        ).scalar() or 0
-        total_payments = db.session.query(func.sum(Payment.amount)).scalar() or 0
-        outstanding_balance = db.session.query(func.sum(Loan.remaining_balance)).filter(
-            Loan.status.in_([LoanStatus.APPROVED, LoanStatus.ACTIVE])
-        ).scalar() or 0
-        
-        print(f"Financial: Savings={total_savings}, Disbursed={total_loans_disbursed}, Payments={total_payments}, Outstanding={outstanding_balance}")
+        total_savings = summary.total_savings
+        total_loans_disbursed = summary.principal(*DISBURSED_STATUSES)
+        total_payments = summary.total_collected
+        outstanding_balance = summary.outstanding(*COLLECTION_STATUSES)
         
         # 3. USER ENGAGEMENT (Doughnut Chart)
-        total_users = User.query.count()
-        users_with_loans = db.session.query(Loan.user_id).distinct().count()
-        users_with_savings = db.session.query(Saving.user_id).distinct().count()
-        users_with_payments = db.session.query(Payment.user_id).distinct().count()
-        
-        print(f"Engagement: Total={total_users}, Loans={users_with_loans}, Savings={users_with_savings}, Payments={users_with_payments}")
+        total_users = summary.total_users
+        users_with_loans = summary.borrowers
+        users_with_savings = summary.users_with_savings
+        users_with_payments = summary.users_with_payments
         
         result = {
             'loan_status': {
@@ -149,7 +102,6 @@ def get_charts_data():
             }
         }
         
-        print(f"Returning result: {result}")
         return jsonify(result)
         
     except Exception as e:
@@ -161,5 +113,82 @@ def get_charts_data():
             'message': 'Failed to get chart data'
         }), 500
 
+@reports_bp.route('/series', methods=['GET'])
+@admin_required()
+def get_series():
+    """Loan applications, disbursements and collections bucketed over a date range"""
+    try:
+        granularity = request.args.get('granularity', 'month')
+        default_start, default_end = last_months(12)
+        try:
+            start = request.args.get('start')
+            start = datetime.strptime(start, '%Y-%m-%d').date() if start else default_start
+            end = request.args.get('end')
+            end = datetime.strptime(end, '%Y-%m-%d').date() if end else default_end
+        except ValueError:
+            return jsonify({'message': 'Dates must be in YYYY-MM-DD format'}), 400
+        
+        if end < start:
+            return jsonify({'message': 'end must not be before start'}), 400
+        
+        try:
+            series = loan_payment_series(start, end, granularity)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        return jsonify({
+            'granularity': granularity,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'series': series
+        })
+        
+    except Exception as e:
+        print(f"Error fetching series: {str(e)}")
+        return jsonify({'message': 'Failed to get series data', 'error': str(e)}), 500
 
+@reports_bp.route('/trends', methods=['GET'])
+@admin_required()
+def get_trends():
+    """Historical portfolio trends read from the daily snapshot table"""
+    try:
+        try:
+            end = request.args.get('end')
+            end = datetime.strptime(end, '%Y-%m-%d').date() if end else datetime.utcnow().date()
+            start = request.args.get('start')
+            start = datetime.strptime(start, '%Y-%m-%d').date() if start else end - timedelta(days=90)
+        except ValueError:
+            return jsonify({'message': 'Dates must be in YYYY-MM-DD format'}), 400
+        
+        metrics = request.args.get('metrics', 'outstanding,par30_ratio').split(',')
+        invalid = [metric for metric in metrics if metric not in TREND_METRICS]
+        if invalid:
+            return jsonify({'message': f'Invalid metrics: {", ".join(invalid)}'}), 400
+        
+        snapshots = [snapshot.to_dict() for snapshot in snapshots_between(start, end)]
+        
+        return jsonify({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'dates': [snapshot['date'] for snapshot in snapshots],
+            'series': {metric: [snapshot[metric] for snapshot in snapshots] for metric in metrics}
+        })
+        
+    except Exception as e:
+        print(f"Error fetching trends: {str(e)}")
+        return jsonify({'message': 'Failed to get trend data', 'error': str(e)}), 500
 
+@reports_bp.route('/snapshots/latest', methods=['GET'])
+@admin_required()
+def get_latest_snapshot():
+    """The most recent daily portfolio snapshot"""
+    try:
+        snapshot = PortfolioSnapshot.query.order_by(PortfolioSnapshot.snapshot_date.desc()).first()
+        if not snapshot:
+            return jsonify({'message': 'No portfolio snapshots have been taken yet'}), 404
+        
+        return jsonify({'snapshot': snapshot.to_dict()})
+        
+    except Exception as e:
+        print(f"Error fetching snapshot: {str(e)}")
+        return jsonify({'message': 'Failed to get portfolio snapshot', 'error': str(e)}), 500
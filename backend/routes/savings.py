@@ -1,21 +1,22 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import Saving
+from models import Saving, SavingsAccount
 from extensions import db
+from services.member_versions import member_etag
+from services.savings_accounts import record_movement, get_balance, InsufficientFunds
 
 savings_bp = Blueprint('savings', __name__)
 
 @savings_bp.route('/', methods=['GET'])
 @jwt_required()
+@member_etag()
 def get_user_savings():
     try:
         user_id = get_jwt_identity()
         savings = Saving.query.filter_by(user_id=user_id).order_by(Saving.created_at.desc()).all()
         
-        # Calculate total savings (sum of all amounts, deposits are positive, withdrawals are negative)
-        total_savings = sum(saving.amount for saving in savings)
-        # Ensure total doesn't go negative
-        total_savings = max(0, total_savings)
+        # Maintained running balance (deposits minus withdrawals, never negative)
+        total_savings = get_balance(user_id)
         
         return jsonify({
             'savings': [saving.to_dict() for saving in savings],
@@ -37,15 +38,11 @@ def deposit_savings():
         
         amount = float(data['amount'])
         
-        # Create new savings record
-        saving = Saving(
-            user_id=user_id,
-            amount=amount,
-            balance=amount,
-            interest_rate=2.0  # 2% default interest rate
-        )
+        if amount <= 0:
+            return jsonify({'message': 'Amount must be greater than zero'}), 400
         
-        db.session.add(saving)
+        # Create new savings record and update the member's balance
+        saving, account = record_movement(user_id, amount)
         
         # Create corresponding transaction
         from models import Transaction, TransactionType
@@ -86,22 +83,12 @@ def withdraw_savings():
         if amount <= 0:
             return jsonify({'message': 'Amount must be greater than zero'}), 400
         
-        # Calculate total savings balance
-        savings = Saving.query.filter_by(user_id=user_id).all()
-        total_balance = sum(saving.balance for saving in savings)
-        
-        if amount > total_balance:
-            return jsonify({'message': f'Insufficient funds. Available balance: ₱{total_balance:,.2f}'}), 400
-        
-        # Create withdrawal record (negative amount to track withdrawal)
-        withdrawal = Saving(
-            user_id=user_id,
-            amount=-amount,  # Negative to indicate withdrawal
-            balance=total_balance - amount,  # New balance after withdrawal
-            interest_rate=2.0
-        )
-        
-        db.session.add(withdrawal)
+        # Create withdrawal record (negative amount to track withdrawal) against the locked balance
+        try:
+            withdrawal, account = record_movement(user_id, -amount)
+        except InsufficientFunds as e:
+            db.session.rollback()
+            return jsonify({'message': str(e)}), 400
         
         # Create corresponding transaction
         from models import Transaction, TransactionType
@@ -121,7 +108,7 @@ def withdraw_savings():
         return jsonify({
             'message': 'Withdrawal successful',
             'withdrawal': withdrawal.to_dict(),
-            'new_balance': total_balance - amount
+            'new_balance': account.balance
         }), 201
         
     except Exception as e:
@@ -134,10 +121,10 @@ def get_savings_summary():
     try:
         user_id = get_jwt_identity()
         
-        # Calculate total savings
-        savings = Saving.query.filter_by(user_id=user_id).all()
-        total_balance = sum(saving.balance for saving in savings)
-        total_deposits = len(savings)
+        # Calculate total savings from the member's account row
+        account = db.session.get(SavingsAccount, int(user_id))
+        total_balance = account.balance if account else 0.0
+        total_deposits = account.movement_count if account else 0
         
         # Calculate potential interest (simplified)
         annual_interest = total_balance * 0.02  # 2% annual interest
@@ -0,0 +1,131 @@
+"""
+Customer activity feed for the admin reports page.
+
+Loans, payments and savings are merged with a single UNION ALL query that
+joins the member, orders and limits in the database. Pages are fetched with
+a keyset cursor on (timestamp, type, source id), so scrolling deep into the
+history costs the same as reading the first page.
+"""
+
+from datetime import datetime
+from sqlalchemy import select, literal, cast, and_, or_, String
+from extensions import db
+from models import User, Loan, Payment, Saving, LoanStatus, LoanType
+
+ACTIVITY_TYPES = ('loan', 'payment', 'savings')
+ID_PREFIXES = {'loan': 'loan', 'payment': 'payment', 'savings': 'saving'}
+
+
+def _loan_activities():
+    return select(
+        literal('loan').label('type'),
+        Loan.id.label('source_id'),
+        Loan.created_at.label('timestamp'),
+        Loan.principal_amount.label('amount'),
+        cast(Loan.status, String).label('status'),
+        cast(Loan.loan_type, String).label('detail'),
+        User.first_name,
+        User.last_name
+    ).join(User, User.id == Loan.user_id)
+
+
+def _payment_activities():
+    return select(
+        literal('payment').label('type'),
+        Payment.id.label('source_id'),
+        Payment.payment_date.label('timestamp'),
+        Payment.amount.label('amount'),
+        Payment.status.label('status'),
+        Payment.payment_method.label('detail'),
+        User.first_name,
+        User.last_name
+    ).join(User, User.id == Payment.user_id)
+
+
+def _saving_activities():
+    return select(
+        literal('savings').label('type'),
+        Saving.id.label('source_id'),
+        Saving.created_at.label('timestamp'),
+        Saving.amount.label('amount'),
+        cast(literal('completed'), String).label('status'),
+        cast(literal(None), String).label('detail'),
+        User.first_name,
+        User.last_name
+    ).join(User, User.id == Saving.user_id)
+
+
+BRANCHES = {
+    'loan': _loan_activities,
+    'payment': _payment_activities,
+    'savings': _saving_activities
+}
+
+
+def encode_cursor(row):
+    return f"{row.timestamp.isoformat()}|{row.type}|{row.source_id}"
+
+
+def decode_cursor(cursor):
+    """Parse a cursor produced by encode_cursor(); raises ValueError if malformed"""
+    timestamp, activity_type, source_id = cursor.split('|')
+    if activity_type not in ACTIVITY_TYPES:
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return datetime.fromisoformat(timestamp), activity_type, int(source_id)
+
+
+def _describe(row):
+    if row.type == 'loan':
+        loan_type = LoanType[row.detail].value if row.detail else LoanType.PERSONAL.value
+        return f'Applied for {loan_type} loan of ₱{row.amount:,.2f}'
+    if row.type == 'payment':
+        return f'Made a payment of ₱{row.amount:,.2f}'
+    transaction_type = 'deposit' if row.amount > 0 else 'withdrawal'
+    return f'Made a savings {transaction_type} of ₱{abs(row.amount):,.2f}'
+
+
+def _serialize(row):
+    status = LoanStatus[row.status].value if row.type == 'loan' else row.status
+    return {
+        'id': f'{ID_PREFIXES[row.type]}_{row.source_id}',
+        'type': row.type,
+        'description': _describe(row),
+        'user': f'{row.first_name} {row.last_name}',
+        'timestamp': row.timestamp.isoformat(),
+        'status': status
+    }
+
+
+def get_activity_feed(limit=50, cursor=None, types=None):
+    """
+    Return (activities, next_cursor) newest first.
+
+    `types` restricts the feed to a subset of ACTIVITY_TYPES; `cursor` is the
+    next_cursor of the previous page.
+    """
+    types = [t for t in (types or ACTIVITY_TYPES) if t in BRANCHES]
+    if not types:
+        return [], None
+
+    feed = BRANCHES[types[0]]()
+    if len(types) > 1:
+        feed = feed.union_all(*[BRANCHES[t]() for t in types[1:]])
+    feed = feed.subquery('activity_feed')
+
+    query = select(feed)
+    if cursor:
+        timestamp, activity_type, source_id = decode_cursor(cursor)
+        query = query.where(or_(
+            feed.c.timestamp < timestamp,
+            and_(feed.c.timestamp == timestamp, feed.c.type < activity_type),
+            and_(feed.c.timestamp == timestamp, feed.c.type == activity_type,
+                 feed.c.source_id < source_id)
+        ))
+
+    query = query.order_by(
+        feed.c.timestamp.desc(), feed.c.type.desc(), feed.c.source_id.desc()
+    ).limit(limit + 1)
+
+    rows = db.session.execute(query).all()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return [_serialize(row) for row in rows[:limit]], next_cursor
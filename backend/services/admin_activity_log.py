@@ -0,0 +1,105 @@
+"""
+Admin activity (audit) log browsing.
+
+The log is append-only and grows with every admin action, so pages are
+read with a keyset cursor on (created_at, id) instead of OFFSET. Date and
+action filters are range/equality conditions on the indexed columns, and
+the admin's name is selected in the same statement.
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, func
+from extensions import db
+from admin_models import Admin, AdminActivity
+
+
+def activity_date_range(date_filter=None, start_date=None, end_date=None, now=None):
+    """
+    Translate the page's date filters into (since, until) datetimes.
+
+    date_filter is one of today/week/month/year; start_date and end_date are
+    YYYY-MM-DD strings. Invalid custom dates are ignored.
+    """
+    now = now or datetime.utcnow()
+    start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    since = {
+        'today': start_of_day,
+        'week': start_of_day - timedelta(days=now.weekday()),
+        'month': start_of_day.replace(day=1),
+        'year': start_of_day.replace(month=1, day=1)
+    }.get(date_filter)
+    until = None
+
+    if start_date:
+        try:
+            custom_since = datetime.strptime(start_date, '%Y-%m-%d')
+            since = max(since, custom_since) if since else custom_since
+        except ValueError:
+            pass
+
+    if end_date:
+        try:
+            until = datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
+        except ValueError:
+            pass
+
+    return since, until
+
+
+def encode_cursor(activity):
+    return f"{activity.created_at.isoformat()}|{activity.id}"
+
+
+def decode_cursor(cursor):
+    """Parse a cursor produced by encode_cursor(); raises ValueError if malformed"""
+    created_at, activity_id = cursor.split('|')
+    return datetime.fromisoformat(created_at), int(activity_id)
+
+
+def activity_log_query(action=None, since=None, until=None):
+    """Rows of (AdminActivity, first_name, last_name), newest first"""
+    query = db.session.query(
+        AdminActivity, Admin.first_name, Admin.last_name
+    ).outerjoin(Admin, Admin.id == AdminActivity.admin_id)
+
+    if action:
+        query = query.filter(AdminActivity.action == action)
+    if since:
+        query = query.filter(AdminActivity.created_at >= since)
+    if until:
+        query = query.filter(AdminActivity.created_at <= until)
+
+    return query.order_by(AdminActivity.created_at.desc(), AdminActivity.id.desc())
+
+
+def count_activities(action=None, since=None, until=None):
+    query = db.session.query(func.count(AdminActivity.id))
+    if action:
+        query = query.filter(AdminActivity.action == action)
+    if since:
+        query = query.filter(AdminActivity.created_at >= since)
+    if until:
+        query = query.filter(AdminActivity.created_at <= until)
+    return query.scalar()
+
+
+def serialize_activity(row):
+    activity, first_name, last_name = row
+    activity_data = activity.to_dict()
+    activity_data['admin_name'] = f"{first_name} {last_name}" if first_name else "Unknown Admin"
+    return activity_data
+
+
+def get_activity_page(limit=20, cursor=None, action=None, since=None, until=None):
+    """Return (activities, next_cursor) for one keyset page"""
+    query = activity_log_query(action, since, until)
+    if cursor:
+        created_at, activity_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            AdminActivity.created_at < created_at,
+            and_(AdminActivity.created_at == created_at, AdminActivity.id < activity_id)
+        ))
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+    return [serialize_activity(row) for row in rows[:limit]], next_cursor
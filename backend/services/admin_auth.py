@@ -0,0 +1,99 @@
+"""
+Claims-based authorization for admin routes.
+
+Admin tokens carry signed `type`, `role`, `active` and `username` claims
+set at login, so @admin_required authorizes from the token alone. Admins
+deactivated after their token was issued are caught by a revocation set
+kept in memory: it is reloaded from the admins table at most once every
+ADMIN_REVOCATION_REFRESH_SECONDS, and admins deactivated by this process
+are added to it immediately.
+"""
+
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify
+from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from extensions import db
+from admin_models import Admin, AdminRole
+
+# Higher ranks include the permissions of lower ones
+ROLE_RANKS = {
+    AdminRole.MANAGER.value: 1,
+    AdminRole.ADMIN.value: 2,
+    AdminRole.SUPER_ADMIN.value: 3
+}
+
+
+def admin_claims(admin):
+    """Additional JWT claims for an admin's access token"""
+    role = admin.role or AdminRole.ADMIN
+    return {
+        'type': 'admin',
+        'role': role.value,
+        'active': bool(admin.is_active),
+        'username': admin.username
+    }
+
+
+class RevocationList:
+    """Ids of deactivated admins, refreshed from the database on an interval"""
+
+    def __init__(self, refresh_interval=60):
+        self.refresh_interval = refresh_interval
+        self._revoked = set()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        revoked = {admin_id for (admin_id,) in db.session.query(Admin.id).filter(Admin.is_active == False)}
+        with self._lock:
+            self._revoked = revoked
+            self._loaded_at = time.monotonic()
+
+    def is_revoked(self, admin_id):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_interval:
+            self.refresh()
+        return admin_id in self._revoked
+
+    def revoke(self, admin_id):
+        with self._lock:
+            self._revoked.add(admin_id)
+
+
+def init_app(app):
+    app.extensions['admin_revocations'] = RevocationList(
+        refresh_interval=app.config.get('ADMIN_REVOCATION_REFRESH_SECONDS', 60)
+    )
+
+
+def revocations():
+    return current_app.extensions['admin_revocations']
+
+
+def has_role(claims, role):
+    return ROLE_RANKS.get(claims.get('role'), 0) >= ROLE_RANKS[role]
+
+
+def admin_required(role=None):
+    """
+    Require an active admin's token, optionally with at least `role`
+    ('manager', 'admin' or 'super_admin'). Replaces @jwt_required() on
+    admin routes.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            claims = get_jwt()
+
+            if claims.get('type') != 'admin':
+                return jsonify({'message': 'Admin access required'}), 403
+            if not claims.get('active') or revocations().is_revoked(int(claims['sub'])):
+                return jsonify({'message': 'Admin account is inactive'}), 401
+            if role and not has_role(claims, role):
+                return jsonify({'message': 'Insufficient admin role'}), 403
+
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,219 @@
+"""
+Cache for the admin dashboard aggregates.
+
+Dashboard stats, monthly loan counts and recovery rates only change when a
+loan, payment, saving or member is written, so their JSON payloads are
+cached and the whole cache is invalidated from an SQLAlchemy after_commit
+hook whenever a committed transaction touched one of those tables.
+
+Two backends are available, selected with AGGREGATE_CACHE_BACKEND:
+
+    'lru'   - in-process LRU (default). Each gunicorn worker has its own copy
+              and only sees invalidations from commits made in that worker.
+    'redis' - shared Redis cache (AGGREGATE_CACHE_REDIS_URL), so every worker
+              sees the same entries and the same invalidations. Requires the
+              `redis` package.
+
+Hit/miss/invalidation counters are kept per process and reported by
+/api/admin/cache/stats.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Writes to these tables change the dashboard aggregates
+TRACKED_TABLES = {'users', 'loans', 'payments', 'savings'}
+
+DIRTY_FLAG = 'aggregate_cache_dirty'
+
+
+class LRUBackend:
+    """In-process least-recently-used cache"""
+
+    name = 'lru'
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def current_generation(self):
+        return self.generation
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key, value, generation=None):
+        """Store `value`, unless the cache was cleared since `generation` was read"""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Cache shared by all workers through Redis.
+
+    Keys carry a generation number; invalidating bumps the generation so
+    every worker stops reading the old entries at once, and the old entries
+    expire on their own after `ttl` seconds.
+    """
+
+    name = 'redis'
+
+    def __init__(self, client, prefix='aggregates', ttl=3600):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("AGGREGATE_CACHE_BACKEND='redis' requires the redis package")
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def current_generation(self):
+        return int(self.client.get(f'{self.prefix}:generation') or 0)
+
+    def _key(self, key, generation=None):
+        generation = self.current_generation() if generation is None else generation
+        return f'{self.prefix}:{generation}:{key}'
+
+    def get(self, key):
+        value = self.client.get(self._key(key))
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, generation=None):
+        # Written under the generation it was computed in: after a clear it is never read
+        self.client.set(self._key(key, generation), json.dumps(value), ex=self.ttl)
+
+    def clear(self):
+        self.client.incr(f'{self.prefix}:generation')
+
+
+class AggregateCache:
+    """Cache front-end that counts hits, misses and invalidations"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for `key`, calling `compute()` to fill it on a miss"""
+        value = self.backend.get(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+        # A write committed while computing clears the cache; the value
+        # computed from the older snapshot must not be stored after that
+        generation = self.backend.current_generation()
+        value = compute()
+        self.backend.set(key, value, generation)
+        return value
+
+    def invalidate(self):
+        self.backend.clear()
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0
+        }
+
+
+def create_backend(config):
+    backend = config.get('AGGREGATE_CACHE_BACKEND', 'lru')
+    if backend == 'lru':
+        return LRUBackend(maxsize=config.get('AGGREGATE_CACHE_SIZE', 128))
+    if backend == 'redis':
+        return RedisBackend.from_url(
+            config.get('AGGREGATE_CACHE_REDIS_URL', 'redis://localhost:6379/0'),
+            ttl=config.get('AGGREGATE_CACHE_TTL', 3600)
+        )
+    raise ValueError(f'Unknown AGGREGATE_CACHE_BACKEND: {backend}')
+
+
+def init_app(app):
+    app.extensions['aggregate_cache'] = AggregateCache(create_backend(app.config))
+
+
+def get_cache():
+    return current_app.extensions['aggregate_cache']
+
+
+def cached_aggregate(key, compute):
+    """Return the dashboard aggregate `key`, computing and caching it on a miss"""
+    return get_cache().get_or_compute(key, compute)
+
+
+def _touches_tracked_table(objects):
+    return any(getattr(obj, '__tablename__', None) in TRACKED_TABLES for obj in objects)
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_dirty_on_flush(session, flush_context):
+    if _touches_tracked_table(session.new) or _touches_tracked_table(session.dirty) \
+            or _touches_tracked_table(session.deleted):
+        session.info[DIRTY_FLAG] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_dirty_on_bulk_write(orm_execute_state):
+    # query.update()/query.delete() and update()/delete() statements skip the flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.local_table.name in TRACKED_TABLES:
+            orm_execute_state.session.info[DIRTY_FLAG] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    if session.info.pop(DIRTY_FLAG, False) and has_app_context():
+        cache = current_app.extensions.get('aggregate_cache')
+        if cache is not None:
+            cache.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop(DIRTY_FLAG, None)
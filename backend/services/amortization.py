@@ -0,0 +1,253 @@
+"""
+Amortization schedules for level-payment loans.
+
+amortize() computes the month-by-month payment, interest, principal and
+remaining balance of many loans at once. Loans are stored with an annual
+interest_rate in percent and a term in months; interest accrues monthly on
+the remaining balance (rate / 12) and every month's payment is the same, so
+the balance after k payments has a closed form:
+
+    B_k = P (1 + r)^k - A ((1 + r)^k - 1) / r
+
+That formula is evaluated with NumPy (in requirements.txt) for every loan
+and month as a handful of (loans x months) array operations - 50k loans x
+60 months take about 0.15s. If NumPy cannot be imported the same
+schedules come from a plain Python loop, which is fine for one loan or a
+few thousand but takes several seconds for a whole loan book.
+Amounts are kept unrounded; callers round when presenting them.
+
+schedules_csv() streams the schedules of a whole loan book as CSV for the
+admin export, amortizing EXPORT_CHUNK loans at a time to bound memory.
+"""
+
+import csv
+import io
+from datetime import datetime
+from services.installments import add_months
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+HAVE_NUMPY = numpy is not None
+
+EXPORT_CHUNK = 5000
+EXPORT_COLUMNS = ('loan_id', 'user_id', 'number', 'due_date', 'payment', 'principal', 'interest', 'balance')
+
+
+def monthly_payment(principal, annual_rate, months):
+    """Level monthly payment repaying `principal` at `annual_rate` percent over `months`"""
+    if months < 1:
+        raise ValueError('duration_months must be at least 1')
+    rate = annual_rate / 1200
+    if rate == 0:
+        return principal / months
+    growth = (1 + rate) ** months
+    return principal * rate * growth / (growth - 1)
+
+
+class Schedules:
+    """
+    Schedules of several loans. interest, principal, payment and balance
+    are (loans x months) grids: entry [i][k] is month k + 1 of loan i, and
+    months past a loan's term are zero. `monthly_payment` is each loan's
+    level payment.
+    """
+
+    def __init__(self, months, monthly_payment, payment, interest, principal, balance):
+        self.months = months
+        self.monthly_payment = monthly_payment
+        self.payment = payment
+        self.interest = interest
+        self.principal = principal
+        self.balance = balance
+
+    def __len__(self):
+        return len(self.months)
+
+    def rows(self, index):
+        """(number, payment, principal, interest, balance) for each month of loan `index`"""
+        term = int(self.months[index])
+        columns = [grid[index][:term] for grid in (self.payment, self.principal, self.interest, self.balance)]
+        if HAVE_NUMPY and isinstance(columns[0], numpy.ndarray):
+            columns = [column.tolist() for column in columns]
+        return [(number,) + values for number, values in enumerate(zip(*columns), start=1)]
+
+    def totals(self, index):
+        """{'total_payment', 'total_interest'} over the life of loan `index`"""
+        return {
+            'total_payment': float(sum(self.payment[index])),
+            'total_interest': float(sum(self.interest[index]))
+        }
+
+
+def _check(principals, annual_rates, months):
+    if not len(principals) == len(annual_rates) == len(months):
+        raise ValueError('principals, annual_rates and months must have the same length')
+    if any(term < 1 for term in months):
+        raise ValueError('duration_months must be at least 1')
+
+
+def _use_numpy(requested):
+    if requested and not HAVE_NUMPY:
+        raise RuntimeError('use_numpy=True requires the numpy package')
+    return HAVE_NUMPY if requested is None else requested
+
+
+def _level_payments_numpy(principal, rate, term):
+    interest_free = rate == 0
+    safe_rate = numpy.where(interest_free, 1.0, rate)
+    payment = principal * safe_rate / -numpy.expm1(-term * numpy.log1p(safe_rate))
+    payment[interest_free] = principal[interest_free] / term[interest_free]
+    return payment
+
+
+def _amortize_numpy(principals, annual_rates, months):
+    principal = numpy.asarray(principals, dtype=float)
+    rate = numpy.asarray(annual_rates, dtype=float) / 1200
+    term = numpy.asarray(months, dtype=int)
+    width = int(term.max()) if len(term) else 0
+
+    interest_free = rate == 0
+    safe_rate = numpy.where(interest_free, 1.0, rate)
+    payment = _level_payments_numpy(principal, rate, term)
+
+    # Balance after k = 0..width payments: (P - A/r)(1 + r)^k + A/r, computed in place
+    k = numpy.arange(width + 1)
+    level = payment / safe_rate
+    balance = numpy.power((1 + rate)[:, None], k)
+    balance *= (principal - level)[:, None]
+    balance += level[:, None]
+    if interest_free.any():
+        balance[interest_free] = principal[interest_free, None] - payment[interest_free, None] * k
+    # Paid off at the end of the term (and zero after it)
+    balance[k >= term[:, None]] = 0.0
+    numpy.maximum(balance, 0.0, out=balance)
+
+    interest = balance[:, :-1] * rate[:, None]
+    principal_paid = balance[:, :-1] - balance[:, 1:]
+    return Schedules(term, payment, principal_paid + interest, interest, principal_paid, balance[:, 1:])
+
+
+def _amortize_python(principals, annual_rates, months):
+    width = max(months, default=0)
+    payments, grid_payment, grid_interest, grid_principal, grid_balance = [], [], [], [], []
+    for principal, annual_rate, term in zip(principals, annual_rates, months):
+        rate = annual_rate / 1200
+        level = monthly_payment(principal, annual_rate, term)
+        balance = principal
+        row_payment, row_interest, row_principal, row_balance = [], [], [], []
+        for number in range(1, term + 1):
+            interest = balance * rate
+            # The last payment clears whatever floating point error is left
+            paid = balance if number == term else min(level - interest, balance)
+            balance -= paid
+            row_payment.append(paid + interest)
+            row_interest.append(interest)
+            row_principal.append(paid)
+            row_balance.append(balance if number < term else 0.0)
+        padding = [0.0] * (width - term)
+        payments.append(level)
+        grid_payment.append(row_payment + padding)
+        grid_interest.append(row_interest + padding)
+        grid_principal.append(row_principal + padding)
+        grid_balance.append(row_balance + padding)
+    return Schedules(list(months), payments, grid_payment, grid_interest, grid_principal, grid_balance)
+
+
+def amortize(principals, annual_rates, months, use_numpy=None):
+    """
+    Schedules for loans given as parallel sequences of principal, annual
+    rate (percent) and term (months). Uses NumPy when it is installed
+    unless `use_numpy` is False.
+    """
+    months = [int(term) for term in months]
+    _check(principals, annual_rates, months)
+    if _use_numpy(use_numpy):
+        return _amortize_numpy(principals, annual_rates, months)
+    return _amortize_python(principals, annual_rates, months)
+
+
+def monthly_payments(principals, annual_rates, months, use_numpy=None):
+    """Level monthly payment of each loan, for the same parallel sequences as amortize()"""
+    months = [int(term) for term in months]
+    _check(principals, annual_rates, months)
+    if _use_numpy(use_numpy):
+        return _level_payments_numpy(
+            numpy.asarray(principals, dtype=float),
+            numpy.asarray(annual_rates, dtype=float) / 1200,
+            numpy.asarray(months, dtype=int)
+        ).tolist()
+    return [monthly_payment(*loan) for loan in zip(principals, annual_rates, months)]
+
+
+def schedule_start(loan):
+    """Date the schedule counts from: approval, or today for a loan not yet approved"""
+    return loan.approved_at or datetime.utcnow()
+
+
+def serialize_rows(rows, start):
+    """Schedule rows as JSON-ready dicts with due dates a month apart from `start`"""
+    return [{
+        'number': number,
+        'due_date': add_months(start, number).isoformat(),
+        'payment': round(payment, 2),
+        'principal': round(principal, 2),
+        'interest': round(interest, 2),
+        'balance': round(balance, 2)
+    } for number, payment, principal, interest, balance in rows]
+
+
+def loan_schedule(loan):
+    """One loan's full schedule with its totals, as returned by the API"""
+    schedules = amortize([loan.principal_amount], [loan.interest_rate], [loan.duration_months])
+    rows = serialize_rows(schedules.rows(0), schedule_start(loan))
+    # Show how far an approved loan's installments have been paid
+    statuses = {installment.number: installment.status for installment in loan.installments}
+    if statuses:
+        for row in rows:
+            row['status'] = statuses.get(row['number'])
+
+    totals = schedules.totals(0)
+    return {
+        'loan_id': loan.id,
+        'principal_amount': loan.principal_amount,
+        'interest_rate': loan.interest_rate,
+        'duration_months': loan.duration_months,
+        'monthly_payment': round(float(schedules.monthly_payment[0]), 2),
+        'total_payment': round(totals['total_payment'], 2),
+        'total_interest': round(totals['total_interest'], 2),
+        'schedule': rows
+    }
+
+
+def schedules_csv(loans, chunk_size=EXPORT_CHUNK):
+    """
+    Yield the CSV export of `loans` - rows with id, user_id, principal_amount,
+    interest_rate, duration_months and approved_at - one month per line.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+
+    for start in range(0, len(loans), chunk_size):
+        chunk = loans[start:start + chunk_size]
+        schedules = amortize(
+            [loan.principal_amount for loan in chunk],
+            [loan.interest_rate for loan in chunk],
+            [loan.duration_months for loan in chunk]
+        )
+        for index, loan in enumerate(chunk):
+            begins = schedule_start(loan)
+            writer.writerows(
+                (loan.id, loan.user_id, number, add_months(begins, number).date().isoformat(),
+                 round(payment, 2), round(principal, 2), round(interest, 2), round(balance, 2))
+                for number, payment, principal, interest, balance in schedules.rows(index)
+            )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, when there are no loans
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,186 @@
+"""
+Buffered admin activity (audit) writer.
+
+Routes call record_activity() instead of adding an AdminActivity to their
+own transaction and committing it. Records are queued in memory and written
+by a background thread with one multi-row INSERT per batch, whenever
+AUDIT_BATCH_SIZE records are waiting, every AUDIT_FLUSH_INTERVAL seconds,
+or when a request that queued records is torn down. Admin page views no
+longer pay for an audit write before their read.
+
+At most AUDIT_MAX_PENDING records are held. When the queue is full the
+recording request writes the pending batches itself before queueing
+(back-pressure), so memory stays bounded. The queue is flushed when the
+worker exits. With AUDIT_LOG_ASYNC off (tests, one-off scripts) the
+batches are written synchronously at request teardown.
+
+Audit records are written after the route's own commit, so a failed audit
+write never fails the request: it is logged, the rows stay queued in
+order, and the next flush retries them. If the queue is still full after
+a failed back-pressure write, the new record is dropped and counted in
+`dropped` rather than growing the queue past AUDIT_MAX_PENDING.
+"""
+
+import atexit
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from flask import current_app, g
+from sqlalchemy import insert
+from extensions import db
+from admin_models import AdminActivity
+
+FIELDS = ('admin_id', 'action', 'target_type', 'target_id', 'description', 'ip_address', 'created_at')
+
+
+class AuditBuffer:
+    """Bounded in-process queue of activity rows, written in batches"""
+
+    def __init__(self, app, batch_size=100, flush_interval=2.0, max_pending=10000, background=True):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.background = background
+        self.written = 0
+        self.backpressure_flushes = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = None
+        self._pid = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, **fields):
+        """
+        Queue one activity row; blocks to write pending batches if the queue
+        is full, and drops the row if they cannot be written
+        """
+        fields.setdefault('created_at', datetime.utcnow())
+        row = {field: fields.get(field) for field in FIELDS}
+
+        if len(self._pending) >= self.max_pending:
+            self.backpressure_flushes += 1
+            self.try_flush()
+        with self._lock:
+            full = len(self._pending) >= self.max_pending
+            if full:
+                self.dropped += 1
+            else:
+                self._pending.append(row)
+            pending = len(self._pending)
+        if full:
+            print(f"[AUDIT] Queue full with the database unavailable; dropped {row['action']} ({self.dropped} dropped)")
+            return
+
+        if self._closed:
+            self.try_flush()
+        elif self.background:
+            self._ensure_thread()
+            if pending >= self.batch_size:
+                self._wake.set()
+
+    def flush(self):
+        """Write every queued row now, in batches; returns the number written"""
+        written = 0
+        with self._write_lock:
+            while True:
+                with self._lock:
+                    batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                if not batch:
+                    return written
+                try:
+                    self._write(batch)
+                except Exception:
+                    # Keep the rows, in order, for the next attempt
+                    with self._lock:
+                        self._pending.extendleft(reversed(batch))
+                    raise
+                written += len(batch)
+                self.written += len(batch)
+
+    def wake(self):
+        """Ask the background writer to flush now without waiting for it"""
+        if self.background and self._thread is not None:
+            self._wake.set()
+        else:
+            self.try_flush()
+
+    def close(self):
+        """Stop the background writer and write whatever is left"""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=max(self.flush_interval, 1) * 5)
+        self.try_flush()
+
+    def try_flush(self):
+        """flush(), logging a failed write instead of raising it; the rows stay queued"""
+        try:
+            return self.flush()
+        except Exception as e:
+            self.failed_flushes += 1
+            print(f"[AUDIT] Failed to write {len(self)} queued admin activities: {e}")
+            return 0
+
+    def _write(self, batch):
+        with self.app.app_context():
+            with db.engine.begin() as connection:
+                connection.execute(insert(AdminActivity.__table__).values(batch))
+
+    def _ensure_thread(self):
+        # Threads do not survive a fork, so each worker process starts its own
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.try_flush()
+
+
+def init_app(app):
+    buffer = AuditBuffer(
+        app,
+        batch_size=app.config.get('AUDIT_BATCH_SIZE', 100),
+        flush_interval=app.config.get('AUDIT_FLUSH_INTERVAL', 2.0),
+        max_pending=app.config.get('AUDIT_MAX_PENDING', 10000),
+        background=app.config.get('AUDIT_LOG_ASYNC', True)
+    )
+    app.extensions['audit_log'] = buffer
+    atexit.register(buffer.close)
+
+    @app.teardown_request
+    def _flush_audit_log(exc):
+        if g.pop('audit_recorded', False):
+            buffer.wake()
+
+
+def audit_log():
+    return current_app.extensions['audit_log']
+
+
+def record_activity(admin_id, action, description=None, target_type=None, target_id=None, ip_address=None):
+    """Queue an AdminActivity row for the buffered writer"""
+    audit_log().record(
+        admin_id=int(admin_id),
+        action=action,
+        description=description,
+        target_type=target_type,
+        target_id=target_id,
+        ip_address=ip_address
+    )
+    g.audit_recorded = True
@@ -0,0 +1,112 @@
+"""
+Authenticated member for the current request.
+
+A flask_jwt_extended user_lookup_loader attaches a RequestIdentity to every
+verified token. The identity is created without touching the database;
+the member row and the admin who created them are each loaded at most once,
+the first time a route asks for them, and reused for the rest of the
+request.
+
+The creating admin never changes for a member, so it can also be kept
+across requests in a short-lived cache by setting IDENTITY_CACHE_TTL
+(seconds, default 0 = disabled).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from flask_jwt_extended import get_current_user
+from extensions import db, jwt
+from models import User
+
+_UNLOADED = object()
+
+
+class TTLCache:
+    """Small thread-safe cache whose entries expire `ttl` seconds after being set"""
+
+    def __init__(self, ttl, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RequestIdentity:
+    """The token's member, loaded lazily and at most once per request"""
+
+    def __init__(self, identity):
+        self.id = int(identity)
+        self._user = _UNLOADED
+        self._creators = None
+
+    @property
+    def user(self):
+        """The member row, or None if the member no longer exists"""
+        if self._user is _UNLOADED:
+            self._user = db.session.get(User, self.id)
+        return self._user
+
+    @property
+    def creators(self):
+        """{admin_id: admin info} for the member's creating admin, as used by User.to_dict()"""
+        if self._creators is None:
+            cache = current_app.extensions.get('identity_cache')
+            creators = cache.get(self.id) if cache is not None else None
+            if creators is None:
+                creators = User.load_creators([self.user]) if self.user else {}
+                if cache is not None:
+                    cache.set(self.id, creators)
+            self._creators = creators
+        return self._creators
+
+
+@jwt.user_lookup_loader
+def _load_identity(jwt_header, jwt_data):
+    return RequestIdentity(jwt_data['sub'])
+
+
+def init_app(app):
+    ttl = app.config.get('IDENTITY_CACHE_TTL', 0)
+    app.extensions['identity_cache'] = TTLCache(ttl) if ttl else None
+
+
+def current_identity():
+    return get_current_user()
+
+
+def current_member():
+    """The authenticated member, or None if they no longer exist"""
+    return current_identity().user
+
+
+def member_dict(user=None):
+    """Serialize the authenticated member, reusing the request's admin lookup"""
+    user = user or current_member()
+    return user.to_dict(creators=current_identity().creators)
@@ -0,0 +1,59 @@
+"""
+Per-member snapshot cache for the member dashboard.
+
+Snapshots are keyed on the member's data ETag (see member_versions.py), so
+a write committed in any of the member's tables - payments, savings
+deposits and withdrawals, loan approvals - makes the old snapshot
+unreachable in the same transaction that bumps the version. After the
+commit the member's stale entry is also evicted to free its slot. The
+cache is an in-process LRU capped at DASHBOARD_SNAPSHOT_CACHE_SIZE members.
+"""
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from services.aggregate_cache import LRUBackend
+from services.member_versions import BUMPED_MEMBERS, BUMPED_ALL
+
+
+def init_app(app):
+    app.extensions['dashboard_snapshots'] = LRUBackend(
+        maxsize=app.config.get('DASHBOARD_SNAPSHOT_CACHE_SIZE', 1024)
+    )
+
+
+def _snapshots():
+    return current_app.extensions['dashboard_snapshots']
+
+
+def get_snapshot(user_id, etag):
+    """The cached dashboard payload for this member version, or None"""
+    entry = _snapshots().get(user_id)
+    if entry is None or entry[0] != etag:
+        return None
+    return entry[1]
+
+
+def store_snapshot(user_id, etag, payload):
+    _snapshots().set(user_id, (etag, payload))
+
+
+@event.listens_for(Session, 'after_commit')
+def _evict_committed_members(session):
+    user_ids = session.info.pop(BUMPED_MEMBERS, set())
+    bumped_all = session.info.pop(BUMPED_ALL, False)
+    if not has_app_context() or 'dashboard_snapshots' not in current_app.extensions:
+        return
+
+    snapshots = _snapshots()
+    if bumped_all:
+        snapshots.clear()
+    else:
+        for user_id in user_ids:
+            snapshots.discard(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back(session):
+    session.info.pop(BUMPED_MEMBERS, None)
+    session.info.pop(BUMPED_ALL, None)
@@ -0,0 +1,193 @@
+"""
+Nightly delinquency classification.
+
+Every approved or active loan is put in a delinquency bucket by how many
+days its due_date (the oldest open installment) is past, and loans more
+than DELINQUENCY_DEFAULT_DAYS past due are moved to DEFAULTED.
+
+Loans are processed in id ranges of `chunk_size` with two bulk UPDATEs
+per range (bucket, then default). The range's last id is written to the
+job_checkpoints row in the same transaction, so an interrupted run picks
+up after the last committed range - with the original as-of date and
+counters - the next time it is started. Each completed run logs one
+aggregated AdminActivity entry. Run it with `flask delinquency run`.
+
+Defaulted loans keep their 90+ bucket. A loan that leaves the open and
+defaulted statuses (paid off, rejected) has its bucket cleared when its
+status is set, and every completed run also clears any bucket left on
+such loans by bulk writes.
+"""
+
+import json
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import event, select, update, func, case
+from extensions import db
+from admin_models import Admin, AdminActivity, AdminRole
+from models import Loan, JobCheckpoint, LoanStatus
+from services.portfolio import OPEN_STATUSES, COLLECTION_STATUSES
+from services.member_versions import bump_versions, BUMPED_MEMBERS
+from services.member_rollups import refresh_rollups
+from services.aggregate_cache import DIRTY_FLAG
+
+JOB_NAME = 'delinquency'
+CHUNK_SIZE = 1000
+
+# (bucket, most days past due it covers); the last bucket is open-ended
+BUCKETS = (('current', 0), ('1-30', 30), ('31-60', 60), ('61-90', 90), ('90+', None))
+
+loans = Loan.__table__
+
+
+def bucket_case(as_of):
+    """CASE expression naming the bucket of loans.due_date as of `as_of`"""
+    whens = [(loans.c.due_date.is_(None), BUCKETS[0][0])]
+    for name, max_days in BUCKETS[:-1]:
+        # At most `max_days` whole days past due
+        whens.append((loans.c.due_date > as_of - timedelta(days=max_days + 1), name))
+    return case(*whens, else_=BUCKETS[-1][0])
+
+
+@event.listens_for(Loan.status, 'set')
+def _clear_bucket_when_settled(loan, value, oldvalue, initiator):
+    # Some routes assign the status by name
+    status = LoanStatus[value] if isinstance(value, str) else value
+    if status not in COLLECTION_STATUSES:
+        loan.delinquency_bucket = None
+
+
+def clear_settled_buckets(connection):
+    """Clear the buckets of loans no longer open or defaulted; returns how many"""
+    return connection.execute(
+        update(loans)
+        .where(loans.c.status.not_in(COLLECTION_STATUSES), loans.c.delinquency_bucket.is_not(None))
+        .values(delinquency_bucket=None)
+    ).rowcount
+
+
+def _start_or_resume(as_of, default_after_days):
+    checkpoint = db.session.get(JobCheckpoint, JOB_NAME)
+    if checkpoint is not None and checkpoint.completed_at is None:
+        print(f"Resuming delinquency run as of {checkpoint.as_of.date()} after loan #{checkpoint.last_id}")
+        return checkpoint, json.loads(checkpoint.stats)
+
+    stats = {'loans': 0, 'defaulted': 0, 'default_after_days': default_after_days}
+    stats.update({name: 0 for name, _ in BUCKETS})
+    checkpoint = checkpoint or JobCheckpoint(name=JOB_NAME)
+    checkpoint.as_of = as_of
+    checkpoint.last_id = 0
+    checkpoint.stats = json.dumps(stats)
+    checkpoint.started_at = datetime.utcnow()
+    checkpoint.completed_at = None
+    db.session.add(checkpoint)
+    db.session.commit()
+    return checkpoint, stats
+
+
+def _process_chunk(connection, last_id, upper_id, as_of, default_after_days):
+    """Bucket and default the open loans with ids in (last_id, upper_id]"""
+    in_chunk = (loans.c.id > last_id, loans.c.id <= upper_id, loans.c.status.in_(OPEN_STATUSES))
+
+    connection.execute(update(loans).where(*in_chunk).values(delinquency_bucket=bucket_case(as_of)))
+    counts = dict(connection.execute(
+        select(loans.c.delinquency_bucket, func.count()).where(*in_chunk).group_by(loans.c.delinquency_bucket)
+    ).all())
+
+    defaulted_users = connection.execute(
+        update(loans)
+        .where(*in_chunk, loans.c.due_date <= as_of - timedelta(days=default_after_days + 1))
+        .values(status=LoanStatus.DEFAULTED)
+        .returning(loans.c.user_id)
+    ).scalars().all()
+    return counts, defaulted_users
+
+
+def _job_admin(username=None):
+    """Admin the run is logged under: `username`, else the first active super admin or admin"""
+    query = Admin.query.filter(Admin.is_active == True)
+    if username:
+        return query.filter(Admin.username == username).first()
+    return query.order_by((Admin.role == AdminRole.SUPER_ADMIN).desc(), Admin.id).first()
+
+
+def run_delinquency(as_of=None, default_after_days=None, chunk_size=CHUNK_SIZE, admin_username=None):
+    """
+    Classify every open loan and default those past the threshold,
+    committing after each chunk. Resumes an unfinished run if there is one.
+    Returns the run's counters.
+    """
+    if default_after_days is None:
+        default_after_days = current_app.config.get('DELINQUENCY_DEFAULT_DAYS', 90)
+    checkpoint, stats = _start_or_resume(as_of or datetime.utcnow(), default_after_days)
+
+    while True:
+        ids = db.session.execute(
+            select(Loan.id)
+            .where(Loan.status.in_(OPEN_STATUSES), Loan.id > checkpoint.last_id)
+            .order_by(Loan.id)
+            .limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            break
+
+        connection = db.session.connection()
+        counts, defaulted_users = _process_chunk(
+            connection, checkpoint.last_id, ids[-1], checkpoint.as_of, stats['default_after_days']
+        )
+        if defaulted_users:
+            # Core updates skip the flush hooks, so bump versions, rollups and caches here
+            user_ids = set(defaulted_users)
+            bump_versions(connection, user_ids)
+            refresh_rollups(connection, user_ids)
+            db.session.info.setdefault(BUMPED_MEMBERS, set()).update(user_ids)
+            db.session.info[DIRTY_FLAG] = True
+
+        stats['loans'] += len(ids)
+        stats['defaulted'] += len(defaulted_users)
+        for name, count in counts.items():
+            stats[name] += count
+        checkpoint.last_id = ids[-1]
+        checkpoint.stats = json.dumps(stats)
+        db.session.commit()
+
+    cleared = clear_settled_buckets(db.session.connection())
+    if cleared:
+        print(f"Cleared the delinquency bucket of {cleared} settled loans")
+    checkpoint.completed_at = datetime.utcnow()
+    admin = _job_admin(admin_username)
+    if admin:
+        db.session.add(AdminActivity(
+            admin_id=admin.id,
+            action='DELINQUENCY_RUN',
+            target_type='loan',
+            description=(
+                f"Classified {stats['loans']} open loans as of {checkpoint.as_of.date()} ("
+                + ', '.join(f"{name}: {stats[name]}" for name, _ in BUCKETS)
+                + f"); moved {stats['defaulted']} loans over {stats['default_after_days']} days past due to defaulted"
+            )
+        ))
+    else:
+        print("⚠️ No active admin to log the delinquency run under")
+    db.session.commit()
+    return stats
+
+
+delinquency_cli = AppGroup('delinquency', help='Loan delinquency jobs.')
+
+
+@delinquency_cli.command('run')
+@click.option('--as-of', type=click.DateTime(formats=['%Y-%m-%d']), help='Classify as of this date (default now).')
+@click.option('--default-after', 'default_after_days', type=int,
+              help='Days past due before a loan defaults (default DELINQUENCY_DEFAULT_DAYS).')
+@click.option('--chunk-size', default=CHUNK_SIZE, show_default=True, help='Loans per transaction.')
+@click.option('--admin', 'admin_username', help='Admin username to log the run under.')
+def run_command(as_of, default_after_days, chunk_size, admin_username):
+    """Bucket open loans by days past due and default the oldest."""
+    stats = run_delinquency(as_of, default_after_days, chunk_size, admin_username)
+    print(f"✅ Classified {stats['loans']} loans, {stats['defaulted']} moved to defaulted")
+
+
+def init_app(app):
+    app.cli.add_command(delinquency_cli)
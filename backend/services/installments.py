@@ -0,0 +1,151 @@
+"""
+Loan installment schedules.
+
+When a loan is approved its schedule of `duration_months` monthly
+installments of `monthly_payment` is written to loan_installments.
+Payments are allocated to the oldest open installments first, and
+loan.due_date is kept equal to the earliest open installment's due date.
+
+"Amount overdue" and "days past due" are grouped queries over open
+installments (status 'due'), served by the (loan_id|user_id|status,
+due_date) indexes instead of Python loops over loans.
+"""
+
+import calendar
+from datetime import datetime
+from sqlalchemy import func
+from extensions import db
+from models import Installment, Loan
+
+OPEN = 'due'
+PAID = 'paid'
+CLOSED = 'closed'  # Left open when the loan was paid off early
+
+
+def add_months(value, months):
+    """`value` moved `months` calendar months ahead, clamped to the end of shorter months"""
+    month = value.month - 1 + months
+    year = value.year + month // 12
+    month = month % 12 + 1
+    return value.replace(year=year, month=month, day=min(value.day, calendar.monthrange(year, month)[1]))
+
+
+def generate_schedule(loan, paid_amount=0.0):
+    """
+    Create the loan's installments, one month apart starting a month after
+    approval, and allocate `paid_amount` already paid. Does nothing if the
+    loan already has a schedule.
+    """
+    if loan.installments:
+        return loan.installments
+
+    start = loan.approved_at or datetime.utcnow()
+    count = loan.duration_months
+    amount = round(loan.monthly_payment, 2)
+    total = round(loan.monthly_payment * count, 2)
+
+    for number in range(1, count + 1):
+        loan.installments.append(Installment(
+            user_id=loan.user_id,
+            number=number,
+            due_date=add_months(start, number),
+            # The last installment absorbs the rounding difference
+            amount_due=amount if number < count else round(total - amount * (count - 1), 2),
+            amount_paid=0.0,
+            status=OPEN
+        ))
+
+    if paid_amount:
+        _apply(loan.installments, paid_amount, start)
+    loan.due_date = _next_due_date(loan.installments)
+    return loan.installments
+
+
+def _apply(installments, amount, paid_at):
+    remaining = round(amount, 2)
+    for installment in installments:
+        if remaining <= 0:
+            break
+        if installment.status != OPEN:
+            continue
+        applied = min(remaining, installment.amount_outstanding)
+        installment.amount_paid = round(installment.amount_paid + applied, 2)
+        remaining = round(remaining - applied, 2)
+        if installment.amount_outstanding <= 0:
+            installment.status = PAID
+            installment.paid_at = paid_at
+    return remaining
+
+
+def _next_due_date(installments):
+    return next((i.due_date for i in installments if i.status == OPEN), None)
+
+
+def allocate_payment(loan, amount, paid_at=None):
+    """
+    Apply a payment to the loan's open installments, oldest first, and move
+    loan.due_date to the next open installment. Returns any overpayment.
+    """
+    open_installments = Installment.query.filter_by(
+        loan_id=loan.id, status=OPEN
+    ).order_by(Installment.number).with_for_update().all()
+
+    remaining = _apply(open_installments, amount, paid_at or datetime.utcnow())
+    if open_installments:
+        loan.due_date = _next_due_date(open_installments)
+    return remaining
+
+
+def close_schedule(loan, closed_at=None):
+    """Close every open installment of a loan that has been paid off"""
+    Installment.query.filter_by(loan_id=loan.id, status=OPEN).update(
+        {Installment.status: CLOSED, Installment.paid_at: closed_at or datetime.utcnow()},
+        synchronize_session='fetch'
+    )
+    loan.due_date = None
+
+
+def overdue_query(as_of, user_id=None):
+    """
+    Rows of (loan_id, amount_overdue, oldest_due_date, installments_overdue)
+    for loans with open installments due before `as_of`.
+    """
+    query = db.session.query(
+        Installment.loan_id.label('loan_id'),
+        func.sum(Installment.amount_due - Installment.amount_paid).label('amount_overdue'),
+        func.min(Installment.due_date).label('oldest_due_date'),
+        func.count(Installment.id).label('installments_overdue')
+    ).filter(Installment.status == OPEN, Installment.due_date < as_of)
+    if user_id is not None:
+        query = query.filter(Installment.user_id == user_id)
+    return query.group_by(Installment.loan_id)
+
+
+def overdue_by_loan(as_of, user_id=None):
+    """{loan_id: {'amount_overdue', 'oldest_due_date', 'days_past_due', 'installments_overdue'}}"""
+    return {
+        row.loan_id: {
+            'amount_overdue': round(float(row.amount_overdue), 2),
+            'oldest_due_date': row.oldest_due_date,
+            'days_past_due': (as_of - row.oldest_due_date).days,
+            'installments_overdue': row.installments_overdue
+        }
+        for row in overdue_query(as_of, user_id)
+    }
+
+
+def backfill_schedule(loan):
+    """Generate the schedule of an approved loan that predates the installments table"""
+    generate_schedule(loan, paid_amount=max(0.0, loan.principal_amount - loan.remaining_balance))
+    if loan.remaining_balance <= 0:
+        close_schedule(loan, loan.approved_at)
+
+
+def backfill_schedules():
+    """Generate schedules for every approved loan without one"""
+    loans = Loan.query.filter(
+        Loan.approved_at.isnot(None), ~Loan.installments.any()
+    ).all()
+    for loan in loans:
+        backfill_schedule(loan)
+    return len(loans)
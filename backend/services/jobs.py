@@ -0,0 +1,190 @@
+"""
+Chunked, resumable batch jobs: `flask jobs list` / `flask jobs run NAME`.
+
+A job names a model, an optional filter and a function that processes one
+chunk of primary keys. The runner walks the matching rows in primary-key
+order, `chunk_size` ids at a time, and commits each chunk together with
+the job's job_checkpoints row, so an interrupted run resumes after the
+last committed chunk instead of starting over. Progress (rows, rows
+changed, rows/sec) is printed after every chunk.
+
+Chunks are read with a keyset query (id > last id) rather than one
+streaming cursor: committing closes the cursor, and on SQLite an open
+read cursor would block the chunk commits.
+
+With --workers N the chunks are processed by a local process pool. Each
+worker commits its own chunks and the checkpoint only moves past a chunk
+once every earlier chunk has finished, so chunk functions must be safe to
+run twice (all jobs here recompute values rather than increment them).
+Use workers with PostgreSQL; SQLite serializes the writers anyway.
+"""
+
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select, inspect
+from extensions import db
+from models import JobCheckpoint
+
+CHUNK_SIZE = 500
+
+JOBS = {}
+
+
+class Job:
+    def __init__(self, name, model, process, where=None, help=None):
+        self.name = name
+        self.model = model
+        self.process = process
+        self.where = where
+        self.help = help or (process.__doc__ or '').strip()
+
+    @property
+    def checkpoint_name(self):
+        return f'job:{self.name}'
+
+    def next_ids(self, after_id, limit):
+        """The next `limit` primary keys after `after_id` that the job applies to"""
+        pk = inspect(self.model).primary_key[0]
+        query = select(pk).where(pk > after_id).order_by(pk).limit(limit)
+        if self.where is not None:
+            query = query.where(*self.where())
+        return db.session.execute(query).scalars().all()
+
+
+def batch_job(name, model, where=None, help=None):
+    """
+    Register `process(ids) -> rows changed` as job `name` over `model`.
+    `where` returns extra filter conditions for the rows to visit.
+    """
+    def decorator(process):
+        JOBS[name] = Job(name, model, process, where, help)
+        return process
+    return decorator
+
+
+def _start_or_resume(job, restart):
+    checkpoint = db.session.get(JobCheckpoint, job.checkpoint_name)
+    if checkpoint is not None and checkpoint.completed_at is None and not restart:
+        print(f"[JOBS] Resuming {job.name} after id {checkpoint.last_id}")
+        return checkpoint, json.loads(checkpoint.stats)
+
+    stats = {'rows': 0, 'changed': 0}
+    checkpoint = checkpoint or JobCheckpoint(name=job.checkpoint_name)
+    checkpoint.as_of = checkpoint.started_at = datetime.utcnow()
+    checkpoint.last_id = 0
+    checkpoint.stats = json.dumps(stats)
+    checkpoint.completed_at = None
+    db.session.add(checkpoint)
+    db.session.commit()
+    return checkpoint, stats
+
+
+def _chunks(job, after_id, chunk_size):
+    while True:
+        ids = job.next_ids(after_id, chunk_size)
+        if not ids:
+            return
+        after_id = ids[-1]
+        yield ids
+
+
+def _process_serially(job, chunks):
+    for ids in chunks:
+        # Committed by the runner together with the checkpoint
+        yield ids, job.process(ids)
+
+
+_worker_app = None
+
+
+def _init_worker():
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app()
+
+
+def _process_in_worker(name, ids):
+    with _worker_app.app_context():
+        changed = JOBS[name].process(ids)
+        db.session.commit()
+        return changed
+
+
+def _process_in_pool(job, chunks, workers):
+    """Yield (ids, changed) in chunk order, keeping at most 2 chunks per worker in flight"""
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        in_flight = deque()
+        for ids in chunks:
+            in_flight.append((ids, pool.submit(_process_in_worker, job.name, ids)))
+            if len(in_flight) >= workers * 2:
+                ids, future = in_flight.popleft()
+                yield ids, future.result()
+        while in_flight:
+            ids, future = in_flight.popleft()
+            yield ids, future.result()
+
+
+def run_job(name, chunk_size=CHUNK_SIZE, workers=1, restart=False):
+    """Run (or resume) job `name`; returns its {'rows', 'changed'} counters"""
+    job = JOBS[name]
+    checkpoint, stats = _start_or_resume(job, restart)
+    chunks = _chunks(job, checkpoint.last_id, chunk_size)
+    processed = _process_in_pool(job, chunks, workers) if workers > 1 else _process_serially(job, chunks)
+
+    started = time.monotonic()
+    rows_this_run = 0
+    for ids, changed in processed:
+        stats['rows'] += len(ids)
+        stats['changed'] += changed
+        checkpoint.last_id = ids[-1]
+        checkpoint.stats = json.dumps(stats)
+        db.session.commit()
+
+        rows_this_run += len(ids)
+        rate = rows_this_run / max(time.monotonic() - started, 1e-6)
+        print(f"[JOBS] {name}: {stats['rows']} rows, {stats['changed']} changed, {rate:,.0f} rows/sec")
+
+    checkpoint.completed_at = datetime.utcnow()
+    db.session.commit()
+    return stats
+
+
+jobs_cli = AppGroup('jobs', help='Chunked, resumable maintenance jobs.')
+
+
+@jobs_cli.command('list')
+def list_command():
+    """Show the registered jobs and their last run."""
+    for name, job in sorted(JOBS.items()):
+        checkpoint = db.session.get(JobCheckpoint, job.checkpoint_name)
+        if checkpoint is None:
+            state = 'never run'
+        elif checkpoint.completed_at is None:
+            state = f'interrupted after id {checkpoint.last_id}'
+        else:
+            state = f'completed {checkpoint.completed_at.isoformat()}'
+        print(f"{name:<16} {job.help} [{state}]")
+
+
+@jobs_cli.command('run')
+@click.argument('name')
+@click.option('--chunk-size', default=CHUNK_SIZE, show_default=True, help='Rows per committed chunk.')
+@click.option('--workers', default=1, show_default=True, help='Processes to fan chunks out to.')
+@click.option('--restart', is_flag=True, help='Start over instead of resuming an interrupted run.')
+def run_command(name, chunk_size, workers, restart):
+    """Run a job, resuming its last interrupted run."""
+    if name not in JOBS:
+        raise click.BadParameter(f"Unknown job. Choose from: {', '.join(sorted(JOBS))}", param_hint='NAME')
+    stats = run_job(name, chunk_size=chunk_size, workers=workers, restart=restart)
+    print(f"✅ {name}: processed {stats['rows']} rows, changed {stats['changed']}")
+
+
+def init_app(app):
+    # Importing the job modules registers their jobs
+    import services.maintenance_jobs
+    app.cli.add_command(jobs_cli)
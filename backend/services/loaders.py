@@ -0,0 +1,35 @@
+"""
+Eager-loading helpers for admin listings.
+
+Every listing built here costs a fixed number of queries no matter how many
+rows are on the page: one for the rows (with the borrower joined in), one
+IN query for the admins that created those borrowers, and one count query
+when the listing is paginated.
+"""
+
+from sqlalchemy.orm import contains_eager
+from models import User, Loan
+
+
+def loans_with_borrowers(query=None):
+    """Join each loan's borrower into the query"""
+    if query is None:
+        query = Loan.query
+    return query.join(Loan.borrower).options(contains_eager(Loan.borrower))
+
+
+def serialize_loans_with_borrowers(loans, include_user=True):
+    """Serialize loans loaded through loans_with_borrowers()"""
+    creators = User.load_creators([loan.borrower for loan in loans]) if include_user else {}
+
+    loans_data = []
+    for loan in loans:
+        loan_data = loan.to_dict()
+        user = loan.borrower
+        if include_user:
+            loan_data['user'] = user.to_dict(creators=creators)
+        else:
+            loan_data['user_name'] = f"{user.first_name} {user.last_name}"
+            loan_data['user_email'] = user.email
+        loans_data.append(loan_data)
+    return loans_data
@@ -0,0 +1,123 @@
+"""
+Loan quotes for the apply page.
+
+Members compare many principal / term / loan type combinations before
+applying. quote_grid() prices every combination of a grid with one
+vectorized monthly_payments() call (see amortization.py) and returns each
+cell's monthly payment, total payment and total interest, plus the
+member's eligibility verdict - the same checks apply_for_loan makes. A
+member with an unpaid defaulted loan is refused outright.
+
+Rates come from the rate table: LOAN_DEFAULT_RATE percent a year, with
+per-type overrides in LOAN_RATES ("business=7,emergency=3"). Priced grids
+are memoized in an in-process LRU (LOAN_QUOTE_CACHE_SIZE grids) keyed on
+the rate table version, a hash of the table's contents, so a repeated
+grid costs one dictionary lookup and a changed rate table never serves
+old prices. Eligibility is member data and is checked on every request.
+"""
+
+import hashlib
+from itertools import product
+from flask import current_app
+from models import LoanType
+from services.aggregate_cache import LRUBackend
+from services.amortization import monthly_payments
+from services.member_rollups import get_rollup
+from services.membership import regular_threshold
+
+DEFAULT_RATE = 5.0
+MIN_REPAID_PERCENTAGE = 50
+MAX_CELLS = 1000
+DEFAULTED_REASON = 'You have a defaulted loan with an unpaid balance. Settle it before applying for a new one.'
+
+
+def init_app(app):
+    app.extensions['loan_quotes'] = LRUBackend(maxsize=app.config.get('LOAN_QUOTE_CACHE_SIZE', 256))
+
+
+def _quotes():
+    return current_app.extensions['loan_quotes']
+
+
+def rate_table():
+    """{LoanType: annual rate in percent} from LOAN_DEFAULT_RATE and LOAN_RATES"""
+    default = float(current_app.config.get('LOAN_DEFAULT_RATE', DEFAULT_RATE))
+    table = {loan_type: default for loan_type in LoanType}
+    for entry in filter(None, (part.strip() for part in current_app.config.get('LOAN_RATES', '').split(','))):
+        name, _, rate = entry.partition('=')
+        table[LoanType(name.strip().lower())] = float(rate)
+    return table
+
+
+def rate_table_version(table=None):
+    """Short hash identifying the current rates"""
+    table = table or rate_table()
+    contents = ','.join(f'{loan_type.value}={table[loan_type]!r}' for loan_type in LoanType)
+    return hashlib.sha1(contents.encode()).hexdigest()[:12]
+
+
+def loan_rate(loan_type):
+    """Annual rate in percent charged on a new loan of `loan_type`"""
+    return rate_table()[loan_type]
+
+
+def member_verdict(user):
+    """(eligible, reason) for a new loan, by capital share, defaults and repayment of active loans"""
+    if not user.loan_eligibility:
+        return False, f'User not eligible for loan. Minimum capital share of {regular_threshold():,.0f} PHP required.'
+    rollup = get_rollup(user.id)
+    if rollup and rollup.defaulted_loans:
+        return False, DEFAULTED_REASON
+    if rollup and rollup.approved_loans and rollup.least_repaid_percentage < MIN_REPAID_PERCENTAGE:
+        return False, (
+            f'You must pay at least {MIN_REPAID_PERCENTAGE}% of your active loan before applying for a new one. '
+            f'Current payment: {rollup.least_repaid_percentage:.1f}%'
+        )
+    return True, None
+
+
+def _price(principals, durations, loan_types, table):
+    cells = list(product(principals, durations, loan_types))
+    payments = monthly_payments(
+        [principal for principal, _, _ in cells],
+        [table[loan_type] for _, _, loan_type in cells],
+        [duration for _, duration, _ in cells]
+    )
+    return [{
+        'principal_amount': principal,
+        'duration_months': duration,
+        'loan_type': loan_type.value,
+        'interest_rate': table[loan_type],
+        'monthly_payment': round(payment, 2),
+        'total_payment': round(payment * duration, 2),
+        'total_interest': round(payment * duration - principal, 2)
+    } for (principal, duration, loan_type), payment in zip(cells, payments)]
+
+
+def quote_grid(user, principals, durations, loan_types):
+    """
+    Quote every (principal, duration, loan type) combination for `user`.
+    Returns {'rate_table_version', 'cached', 'quotes'}; raises ValueError
+    for an empty or oversized grid.
+    """
+    cell_count = len(principals) * len(durations) * len(loan_types)
+    if not cell_count:
+        raise ValueError('principals, durations and loan_types must not be empty')
+    if cell_count > MAX_CELLS:
+        raise ValueError(f'A quote grid has at most {MAX_CELLS} combinations')
+
+    table = rate_table()
+    version = rate_table_version(table)
+    key = (version, tuple(principals), tuple(durations), tuple(loan_types))
+    priced = _quotes().get(key)
+    cached = priced is not None
+    if not cached:
+        priced = _price(principals, durations, loan_types, table)
+        _quotes().set(key, priced)
+
+    eligible, reason = member_verdict(user)
+    return {
+        'rate_table_version': version,
+        'cached': cached,
+        'quotes': [dict(cell, eligible=eligible, reason=reason) for cell in priced]
+    }
@@ -0,0 +1,35 @@
+"""
+Maintenance jobs run with `flask jobs run NAME` (see jobs.py).
+
+These replace the one-off scripts that loaded whole tables with .all()
+and committed once at the end; the scripts now call run_job().
+"""
+
+from extensions import db
+from models import User, Loan
+from services.jobs import batch_job
+from services.installments import backfill_schedule
+from services.member_rollups import refresh_rollups
+from services.membership import recompute_membership
+
+
+@batch_job('membership', User)
+def recompute_membership_chunk(ids):
+    """Recompute member status and loan eligibility from capital share"""
+    return recompute_membership(ids)['changed']
+
+
+@batch_job('loan-schedules', Loan, where=lambda: [Loan.approved_at.isnot(None), ~Loan.installments.any()])
+def backfill_loan_schedules(ids):
+    """Generate installment schedules (and due dates) for approved loans without one"""
+    loans = Loan.query.filter(Loan.id.in_(ids)).all()
+    for loan in loans:
+        backfill_schedule(loan)
+    return len(loans)
+
+
+@batch_job('member-rollups', User)
+def rebuild_member_rollups(ids):
+    """Recompute the member_rollups rows"""
+    refresh_rollups(db.session.connection(), ids)
+    return len(ids)
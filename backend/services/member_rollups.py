@@ -0,0 +1,179 @@
+"""
+Denormalized per-member totals.
+
+member_rollups holds one row per member with their loan counts, total
+borrowed, outstanding balance, total paid, savings balance and unpaid
+penalties. Every flush that writes a member's loans, payments, savings or
+penalties recomputes that member's row with one INSERT ... SELECT upsert
+in the same transaction, so the admin member list and eligibility checks
+read a single precomputed row instead of scanning the child tables.
+
+ORM bulk UPDATE/DELETE statements on those tables skip the flush, so the
+members they touch are looked up with the statement's own WHERE clause
+before it runs, and just those members' rows are recomputed before the
+commit. Core statements run on the connection (penalty accrual, the
+delinquency job) call refresh_rollups() with the ids they wrote.
+`flask rollups rebuild` recomputes everything for backfills or after
+manual SQL.
+"""
+
+from datetime import datetime
+from flask.cli import AppGroup
+from sqlalchemy import event, select, func, case, literal, true
+from sqlalchemy.sql.elements import BindParameter
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from extensions import db
+from models import User, Loan, Payment, SavingsAccount, Penalty, MemberRollup, LoanStatus
+from services.member_versions import owners
+from services.portfolio import COLLECTION_STATUSES
+
+# savings_accounts is included so that `flask savings verify --repair` reaches the rollups
+ROLLUP_TABLES = {'loans', 'payments', 'savings', 'savings_accounts', 'penalties'}
+
+# session.info key holding the members whose rollups bulk writes made stale,
+# or True when a bulk write could not be attributed to members
+ROLLUPS_STALE = 'member_rollups_stale'
+
+rollups = MemberRollup.__table__
+
+
+def _rollup_select():
+    """One row of totals per member, as correlated subqueries over users"""
+    def total(column, *conditions):
+        return select(func.coalesce(func.sum(column), 0)).where(*conditions).scalar_subquery()
+
+    def loans(*conditions):
+        return select(func.count(Loan.id)).where(Loan.user_id == User.id, *conditions).scalar_subquery()
+
+    return select(
+        User.id,
+        loans(),
+        loans(Loan.status == LoanStatus.ACTIVE),
+        loans(Loan.status == LoanStatus.APPROVED),
+        loans(Loan.status == LoanStatus.DEFAULTED, Loan.remaining_balance > 0),
+        total(Loan.principal_amount, Loan.user_id == User.id),
+        total(Loan.remaining_balance, Loan.user_id == User.id, Loan.status.in_(COLLECTION_STATUSES)),
+        select(func.min(case(
+            (Loan.principal_amount > 0,
+             (Loan.principal_amount - Loan.remaining_balance) * 100.0 / Loan.principal_amount),
+            else_=100.0
+        ))).where(Loan.user_id == User.id, Loan.status == LoanStatus.APPROVED).scalar_subquery(),
+        total(Payment.amount, Payment.user_id == User.id),
+        total(SavingsAccount.balance, SavingsAccount.user_id == User.id),
+        total(Penalty.amount, Penalty.user_id == User.id, Penalty.status == 'unpaid'),
+        literal(datetime.utcnow(), db.DateTime)
+    )
+
+
+COLUMNS = [
+    'user_id', 'loan_count', 'active_loans', 'approved_loans', 'defaulted_loans', 'total_borrowed',
+    'outstanding_balance', 'least_repaid_percentage', 'total_paid', 'savings_balance',
+    'unpaid_penalties', 'updated_at'
+]
+
+
+def refresh_rollups(connection, user_ids=None):
+    """Recompute the rollup rows of `user_ids` (every member if None) with one upsert"""
+    if user_ids is not None and not user_ids:
+        return
+    source = _rollup_select()
+    # SQLite needs a WHERE clause to tell INSERT ... SELECT apart from ON CONFLICT
+    source = source.where(User.id.in_(sorted(user_ids)) if user_ids is not None else true())
+
+    insert = postgresql_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+    statement = insert(rollups).from_select(COLUMNS, source)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[rollups.c.user_id],
+        set_={name: statement.excluded[name] for name in COLUMNS[1:]}
+    ))
+
+
+def rebuild_rollups():
+    """Recompute every member's rollup and drop rows of deleted members; the caller commits"""
+    connection = db.session.connection()
+    connection.execute(rollups.delete().where(rollups.c.user_id.not_in(select(User.id))))
+    refresh_rollups(connection)
+    return db.session.query(func.count(MemberRollup.user_id)).scalar()
+
+
+def get_rollup(user_id):
+    """The member's rollup row, or None if they have never been rolled up"""
+    return db.session.get(MemberRollup, int(user_id))
+
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_flushed_members(session, flush_context):
+    user_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        user_ids |= owners(obj, ROLLUP_TABLES)
+    user_ids.discard(None)
+    refresh_rollups(session.connection(), user_ids)
+
+
+def _bulk_write_owners(session, statement, table):
+    """
+    Members a bulk UPDATE/DELETE on `table` touches, read with its WHERE
+    clause before it runs; None if an UPDATE moves rows to an owner that
+    is not a plain value.
+    """
+    owners_query = select(table.c.user_id).distinct()
+    if statement.whereclause is not None:
+        owners_query = owners_query.where(statement.whereclause)
+    user_ids = set(session.execute(owners_query).scalars())
+
+    for column, value in (getattr(statement, '_values', None) or {}).items():
+        if getattr(column, 'key', column) == 'user_id':
+            if not isinstance(value, BindParameter):
+                return None
+            user_ids.add(value.effective_value)
+    user_ids.discard(None)
+    return {int(user_id) for user_id in user_ids}
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_stale_on_bulk_write(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is None or mapper.local_table.name not in ROLLUP_TABLES:
+            return
+        session = orm_execute_state.session
+        if session.info.get(ROLLUPS_STALE) is True:
+            return
+        user_ids = _bulk_write_owners(session, orm_execute_state.statement, mapper.local_table)
+        if user_ids is None:
+            session.info[ROLLUPS_STALE] = True
+        else:
+            session.info.setdefault(ROLLUPS_STALE, set()).update(user_ids)
+
+
+@event.listens_for(Session, 'before_commit')
+def _rebuild_stale_rollups(session):
+    stale = session.info.pop(ROLLUPS_STALE, None)
+    if stale:
+        # Flush first so rows deleted in this transaction are not rolled up again
+        session.flush()
+        refresh_rollups(session.connection(), None if stale is True else stale)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_stale_flag(session):
+    session.info.pop(ROLLUPS_STALE, None)
+
+
+rollups_cli = AppGroup('rollups', help='Member rollup maintenance.')
+
+
+@rollups_cli.command('rebuild')
+def rebuild_command():
+    """Recompute every member's rollup row from the child tables."""
+    count = rebuild_rollups()
+    db.session.commit()
+    print(f"✅ Rebuilt {count} member rollups")
+
+
+def init_app(app):
+    app.cli.add_command(rollups_cli)
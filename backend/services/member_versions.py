@@ -0,0 +1,131 @@
+"""
+Per-member data versions for conditional GETs.
+
+Every flush that writes a member's profile, loans, payments, savings,
+penalties or transactions bumps that member's row in member_data_versions
+inside the same transaction. Bulk UPDATE/DELETE statements on those tables
+cannot be attributed to members cheaply, so they bump a global epoch
+(user_id 0) instead, which changes every member's ETag at once.
+
+Member read endpoints wrapped in @member_etag compare If-None-Match with
+the current version (one primary-key lookup) and answer 304 Not Modified
+before running their own queries.
+"""
+
+from datetime import datetime
+from functools import wraps
+from flask import request, make_response, g
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event, inspect, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from extensions import db
+from models import MemberDataVersion
+
+# Tables whose rows belong to one member through a user_id column
+MEMBER_TABLES = {'loans', 'payments', 'savings', 'penalties', 'transactions'}
+
+GLOBAL_EPOCH = 0
+
+# session.info keys recording what the current transaction bumped, for caches
+# keyed on member versions to evict after commit
+BUMPED_MEMBERS = 'bumped_member_ids'
+BUMPED_ALL = 'bumped_all_members'
+
+versions = MemberDataVersion.__table__
+
+
+def _upsert(connection, user_ids):
+    insert = postgresql_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+    statement = insert(versions).values([
+        {'user_id': user_id, 'version': 1, 'updated_at': datetime.utcnow()}
+        for user_id in sorted(user_ids)
+    ])
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[versions.c.user_id],
+        set_={'version': versions.c.version + 1, 'updated_at': statement.excluded.updated_at}
+    ))
+
+
+def bump_versions(connection, user_ids):
+    """Increment the data version of each member in `user_ids`"""
+    if user_ids:
+        _upsert(connection, user_ids)
+
+
+def bump_global_epoch(connection):
+    """Invalidate every member's version at once"""
+    _upsert(connection, [GLOBAL_EPOCH])
+
+
+def owners(obj, tables=MEMBER_TABLES):
+    """Member ids whose data `obj` belongs to, including a previous owner if user_id changed"""
+    table = getattr(obj, '__tablename__', None)
+    if table == 'users':
+        return {obj.id}
+    if table not in tables:
+        return set()
+    # Routes assign user_id straight from the JWT identity, which is a string
+    history = inspect(obj).attrs.user_id.history
+    return {int(user_id) for user_id in [obj.user_id, *history.deleted] if user_id is not None}
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_flushed_members(session, flush_context):
+    user_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        user_ids |= owners(obj)
+    user_ids.discard(None)
+    bump_versions(session.connection(), user_ids)
+    session.info.setdefault(BUMPED_MEMBERS, set()).update(user_ids)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_on_bulk_write(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.local_table.name in MEMBER_TABLES | {'users'}:
+            bump_global_epoch(orm_execute_state.session.connection())
+            orm_execute_state.session.info[BUMPED_ALL] = True
+
+
+def current_etag(user_id, *extra):
+    """ETag for a member's data: member id, global epoch and member version"""
+    found = dict(db.session.execute(
+        select(versions.c.user_id, versions.c.version)
+        .where(versions.c.user_id.in_([GLOBAL_EPOCH, user_id]))
+    ).all())
+    parts = [user_id, found.get(GLOBAL_EPOCH, 0), found.get(user_id, 0), *extra]
+    return '-'.join(str(part) for part in parts)
+
+
+def member_etag(daily=False):
+    """
+    Answer If-None-Match with 304 when the member's data has not changed.
+
+    Use below @jwt_required(). Set `daily` for responses that also depend on
+    today's date (overdue days, penalties, month buckets). The ETag is left in
+    g.member_etag for views that cache by version.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            extra = [datetime.utcnow().date().isoformat()] if daily else []
+            etag = g.member_etag = current_etag(int(get_jwt_identity()), *extra)
+
+            if request.if_none_match.contains(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            response.vary.add('Authorization')
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,77 @@
+"""
+Member directory queries for the admin users page.
+
+Per-member totals are read from each member's maintained member_rollups
+row (see member_rollups.py), outer-joined onto the users page, so sorting
+and filtering on those totals happens in the database without scanning
+loans, payments, savings or penalties.
+"""
+
+from sqlalchemy import func, or_, desc, asc
+from extensions import db
+from models import User, MemberRollup
+
+
+def member_directory_query(sort_by='created_at', order='desc', filters=None):
+    """
+    Build the member directory query.
+
+    Rows are (User, loan_count, active_loans, total_borrowed, total_paid,
+    savings_balance, unpaid_penalties). Raises ValueError for an unknown
+    sort field.
+    """
+    filters = filters or {}
+    loan_count = func.coalesce(MemberRollup.loan_count, 0)
+    active_loans = func.coalesce(MemberRollup.active_loans, 0)
+    total_borrowed = func.coalesce(MemberRollup.total_borrowed, 0)
+    total_paid = func.coalesce(MemberRollup.total_paid, 0)
+    savings_balance = func.coalesce(MemberRollup.savings_balance, 0)
+    unpaid_penalties = func.coalesce(MemberRollup.unpaid_penalties, 0)
+
+    sort_columns = {
+        'created_at': User.created_at,
+        'name': User.last_name,
+        'email': User.email,
+        'capital_share': User.capital_share,
+        'loan_count': loan_count,
+        'active_loans': active_loans,
+        'total_borrowed': total_borrowed,
+        'total_paid': total_paid,
+        'savings_balance': savings_balance,
+        'unpaid_penalties': unpaid_penalties
+    }
+    if sort_by not in sort_columns:
+        raise ValueError(f'Invalid sort field: {sort_by}')
+
+    query = db.session.query(
+        User,
+        loan_count.label('loan_count'),
+        active_loans.label('active_loans'),
+        total_borrowed.label('total_borrowed'),
+        total_paid.label('total_paid'),
+        savings_balance.label('savings_balance'),
+        unpaid_penalties.label('unpaid_penalties')
+    ).outerjoin(MemberRollup, MemberRollup.user_id == User.id)
+
+    if filters.get('search'):
+        pattern = f"%{filters['search']}%"
+        query = query.filter(or_(
+            User.first_name.ilike(pattern),
+            User.last_name.ilike(pattern),
+            User.email.ilike(pattern)
+        ))
+    if filters.get('member_status'):
+        query = query.filter(User.member_status == filters['member_status'])
+    if filters.get('min_borrowed') is not None:
+        query = query.filter(total_borrowed >= filters['min_borrowed'])
+    if filters.get('max_borrowed') is not None:
+        query = query.filter(total_borrowed <= filters['max_borrowed'])
+    if filters.get('min_loans') is not None:
+        query = query.filter(loan_count >= filters['min_loans'])
+    if filters.get('has_active_loans') is True:
+        query = query.filter(active_loans > 0)
+    elif filters.get('has_active_loans') is False:
+        query = query.filter(active_loans == 0)
+
+    direction = asc if order == 'asc' else desc
+    return query.order_by(direction(sort_columns[sort_by]), direction(User.id))
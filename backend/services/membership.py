@@ -0,0 +1,81 @@
+"""
+Membership status and loan eligibility from capital share.
+
+Members with a capital share of at least MEMBERSHIP_REGULAR_THRESHOLD
+(default 20,000 PHP) are REGULAR MEMBERs and may borrow; everyone else is
+a MEMBER. recompute_membership() applies the rule with one
+UPDATE ... SET member_status = CASE ... statement that only touches rows
+whose status actually changes, and reports how many did. It is used for a
+single member when an admin edits their capital share, and in keyed chunks
+by `flask jobs run membership` after the threshold changes.
+"""
+
+from collections import Counter
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import update, case, or_
+from extensions import db
+from models import User
+from services.member_versions import bump_versions, bump_global_epoch, BUMPED_MEMBERS, BUMPED_ALL
+from services.aggregate_cache import DIRTY_FLAG
+
+REGULAR_MEMBER = 'REGULAR MEMBER'
+MEMBER = 'MEMBER'
+DEFAULT_THRESHOLD = 20000.0
+
+users = User.__table__
+
+
+def regular_threshold():
+    """Capital share needed to be a regular, loan-eligible member"""
+    if has_app_context():
+        return current_app.config.get('MEMBERSHIP_REGULAR_THRESHOLD', DEFAULT_THRESHOLD)
+    return DEFAULT_THRESHOLD
+
+
+def recompute_membership(user_ids=None, threshold=None):
+    """
+    Reapply the membership rule to `user_ids` (every member if None).
+
+    Returns {'changed', 'regular_members', 'members'}: the number of rows
+    updated and how many of them became each status. The caller commits.
+    """
+    if user_ids is not None and not user_ids:
+        return {'changed': 0, 'regular_members': 0, 'members': 0}
+    threshold = regular_threshold() if threshold is None else threshold
+
+    regular = users.c.capital_share >= threshold
+    status = case((regular, REGULAR_MEMBER), else_=MEMBER)
+    eligible = case((regular, True), else_=False)
+
+    statement = update(users).where(or_(
+        users.c.member_status.is_distinct_from(status),
+        users.c.loan_eligibility.is_distinct_from(eligible)
+    ))
+    if user_ids is not None:
+        statement = statement.where(users.c.id.in_(user_ids))
+
+    connection = db.session.connection()
+    changed = connection.execute(
+        statement
+        .values(member_status=status, loan_eligibility=eligible, updated_at=datetime.utcnow())
+        .returning(users.c.id, users.c.member_status)
+    ).all()
+
+    if changed:
+        # Core updates skip the flush hooks, so bump versions and caches here
+        if user_ids is None:
+            bump_global_epoch(connection)
+            db.session.info[BUMPED_ALL] = True
+        else:
+            ids = {user_id for user_id, _ in changed}
+            bump_versions(connection, ids)
+            db.session.info.setdefault(BUMPED_MEMBERS, set()).update(ids)
+        db.session.info[DIRTY_FLAG] = True
+
+    statuses = Counter(member_status for _, member_status in changed)
+    return {
+        'changed': len(changed),
+        'regular_members': statuses[REGULAR_MEMBER],
+        'members': statuses[MEMBER]
+    }
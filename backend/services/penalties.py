@@ -0,0 +1,144 @@
+"""
+Scheduled penalty accrual.
+
+A loan is overdue once its due_date (the oldest open installment, see
+installments.py) has passed. Each 30-day period it stays overdue accrues
+one penalty of PENALTY_RATE x monthly_payment, written as penalties rows
+keyed on (loan_id, due_date, period), so re-running the accrual never
+charges a period twice. Defaulted loans are still owed and keep accruing
+until they are paid off.
+
+Overdue open and defaulted loans are read in keyset chunks of
+`chunk_size`; each chunk's penalties are written with INSERT ... ON
+CONFLICT DO NOTHING and committed on their own, so a run over 100k loans
+holds no long transaction and can be restarted at any point. Run it
+nightly with `flask penalties accrue`.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from extensions import db
+from models import Loan, Penalty
+from services.portfolio import COLLECTION_STATUSES
+from services.member_versions import bump_versions, BUMPED_MEMBERS
+from services.member_rollups import refresh_rollups
+
+PENALTY_RATE = 0.05
+PERIOD_DAYS = 30
+CHUNK_SIZE = 1000
+# Rows per INSERT statement, within SQLite's bound parameter limit
+INSERT_BATCH = 500
+
+penalties = Penalty.__table__
+
+
+def periods_due(due_date, as_of):
+    """Number of 30-day penalty periods a loan due on `due_date` has accrued by `as_of`"""
+    days = (as_of - due_date).days
+    return days // PERIOD_DAYS + 1 if days > 0 else 0
+
+
+def period_starts_after(period):
+    """Days past due at which `period` accrues: 1 day for the first, then every 30 days"""
+    return max(1, PERIOD_DAYS * (period - 1))
+
+
+def _penalty_rows(loans, as_of):
+    rows = []
+    for loan in loans:
+        amount = round(loan.monthly_payment * PENALTY_RATE, 2)
+        for period in range(1, periods_due(loan.due_date, as_of) + 1):
+            days_overdue = period_starts_after(period)
+            rows.append({
+                'penalty_id': str(uuid.uuid4()),
+                'user_id': loan.user_id,
+                'loan_id': loan.id,
+                'amount': amount,
+                'penalty_date': loan.due_date + timedelta(days=days_overdue),
+                'due_date': loan.due_date,
+                'days_overdue': days_overdue,
+                'penalty_rate': PENALTY_RATE,
+                'period': period,
+                'status': 'unpaid',
+                'description': f'Overdue penalty, period {period} ({days_overdue} days late)',
+                'created_at': as_of
+            })
+    return rows
+
+
+def _insert_penalties(connection, rows):
+    """Insert the rows that are not there yet; returns the owners of the inserted ones"""
+    insert = postgresql_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+    user_ids = []
+    for start in range(0, len(rows), INSERT_BATCH):
+        statement = insert(penalties).values(rows[start:start + INSERT_BATCH]).on_conflict_do_nothing(
+            index_elements=['loan_id', 'due_date', 'period']
+        ).returning(penalties.c.user_id)
+        user_ids.extend(connection.execute(statement).scalars())
+    return user_ids
+
+
+def accrue_penalties(as_of=None, chunk_size=CHUNK_SIZE):
+    """
+    Insert every missing penalty for overdue loans as of `as_of`, committing
+    after each chunk of loans. Returns {'loans': overdue loans seen,
+    'penalties': penalties inserted}.
+    """
+    as_of = as_of or datetime.utcnow()
+    totals = {'loans': 0, 'penalties': 0}
+    last_id = 0
+
+    while True:
+        loans = db.session.execute(
+            select(Loan.id, Loan.user_id, Loan.due_date, Loan.monthly_payment)
+            .where(Loan.status.in_(COLLECTION_STATUSES), Loan.due_date < as_of, Loan.id > last_id)
+            .order_by(Loan.id)
+            .limit(chunk_size)
+        ).all()
+        if not loans:
+            break
+        last_id = loans[-1].id
+
+        connection = db.session.connection()
+        inserted = _insert_penalties(connection, _penalty_rows(loans, as_of))
+        user_ids = set(inserted)
+        # Core inserts skip the flush hooks, so bump versions and rollups here
+        bump_versions(connection, user_ids)
+        refresh_rollups(connection, user_ids)
+        db.session.info.setdefault(BUMPED_MEMBERS, set()).update(user_ids)
+        db.session.commit()
+
+        totals['loans'] += len(loans)
+        totals['penalties'] += len(inserted)
+    return totals
+
+
+def unpaid_penalties_by_loan(user_id):
+    """{loan_id: unpaid penalty total} for a member's loans, in one query"""
+    rows = db.session.query(
+        Penalty.loan_id, func.sum(Penalty.amount)
+    ).filter(
+        Penalty.user_id == user_id, Penalty.status == 'unpaid'
+    ).group_by(Penalty.loan_id).all()
+    return {loan_id: round(float(amount), 2) for loan_id, amount in rows}
+
+
+penalties_cli = AppGroup('penalties', help='Penalty accrual.')
+
+
+@penalties_cli.command('accrue')
+@click.option('--as-of', type=click.DateTime(formats=['%Y-%m-%d']), help='Accrue as of this date (default now).')
+@click.option('--chunk-size', default=CHUNK_SIZE, show_default=True, help='Loans per transaction.')
+def accrue_command(as_of, chunk_size):
+    """Insert the penalties owed by overdue loans."""
+    totals = accrue_penalties(as_of=as_of, chunk_size=chunk_size)
+    print(f"✅ Accrued {totals['penalties']} penalties across {totals['loans']} overdue loans")
+
+
+def init_app(app):
+    app.cli.add_command(penalties_cli)
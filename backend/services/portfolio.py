@@ -0,0 +1,79 @@
+"""
+Portfolio summary shared by the admin dashboard and the reports pages.
+
+All loan counts and money totals come from one GROUP BY status query over
+loans plus one statement of scalar subqueries over users, payments and
+savings. The dashboard stats, recovery rates, report stats and report
+charts all build their payloads from the same summary.
+"""
+
+from sqlalchemy import select, func
+from extensions import db
+from models import User, Loan, Payment, Saving, SavingsAccount, LoanStatus
+
+DISBURSED_STATUSES = (LoanStatus.APPROVED, LoanStatus.ACTIVE, LoanStatus.COMPLETED)
+OPEN_STATUSES = (LoanStatus.APPROVED, LoanStatus.ACTIVE)
+# Loans still owed: open ones plus defaulted ones under collection
+COLLECTION_STATUSES = OPEN_STATUSES + (LoanStatus.DEFAULTED,)
+
+
+class PortfolioSummary:
+    """Loan totals per status plus member, payment and savings totals"""
+
+    def __init__(self, loans_by_status, totals):
+        self.loans_by_status = loans_by_status
+        self.total_users = totals['total_users']
+        self.borrowers = totals['borrowers']
+        self.users_with_payments = totals['users_with_payments']
+        self.users_with_savings = totals['users_with_savings']
+        self.total_collected = float(totals['total_collected'] or 0)
+        self.total_savings = float(totals['total_savings'] or 0)
+
+    def _total(self, field, statuses):
+        statuses = statuses or tuple(self.loans_by_status)
+        return sum(self.loans_by_status.get(status, {}).get(field, 0) for status in statuses)
+
+    def loan_count(self, *statuses):
+        """Number of loans in any of the given statuses (all loans if none given)"""
+        return self._total('count', statuses)
+
+    def principal(self, *statuses):
+        return float(self._total('principal', statuses))
+
+    def outstanding(self, *statuses):
+        return float(self._total('outstanding', statuses))
+
+    @property
+    def total_loans(self):
+        return self.loan_count()
+
+    @property
+    def other_accounts(self):
+        """Members who have never had a loan"""
+        return self.total_users - self.borrowers
+
+
+def get_portfolio_summary():
+    """Compute the portfolio summary with two queries"""
+    rows = db.session.query(
+        Loan.status,
+        func.count(Loan.id),
+        func.coalesce(func.sum(Loan.principal_amount), 0),
+        func.coalesce(func.sum(Loan.remaining_balance), 0)
+    ).group_by(Loan.status).all()
+
+    loans_by_status = {
+        status: {'count': count, 'principal': principal, 'outstanding': outstanding}
+        for status, count, principal, outstanding in rows
+    }
+
+    totals = db.session.execute(select(
+        select(func.count(User.id)).scalar_subquery().label('total_users'),
+        select(func.count(func.distinct(Loan.user_id))).scalar_subquery().label('borrowers'),
+        select(func.count(func.distinct(Payment.user_id))).scalar_subquery().label('users_with_payments'),
+        select(func.count(func.distinct(Saving.user_id))).scalar_subquery().label('users_with_savings'),
+        select(func.sum(Payment.amount)).scalar_subquery().label('total_collected'),
+        select(func.sum(SavingsAccount.balance)).scalar_subquery().label('total_savings')
+    )).mappings().one()
+
+    return PortfolioSummary(loans_by_status, totals)
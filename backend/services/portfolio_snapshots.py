@@ -0,0 +1,86 @@
+"""
+Daily portfolio snapshots for historical reporting.
+
+`flask reports snapshot` (run nightly from cron) stores one
+portfolio_snapshots row per day with the outstanding balance, disbursed
+principal, collections, savings, portfolio-at-risk (PAR30/60/90) and loan
+counts by status. Trend endpoints then read the stored rows instead of
+rescanning loans, payments and savings.
+"""
+
+from datetime import datetime, timedelta
+from flask.cli import AppGroup
+import click
+from sqlalchemy import func, case
+from extensions import db
+from models import Loan, PortfolioSnapshot, LoanStatus
+from services.portfolio import get_portfolio_summary, DISBURSED_STATUSES, COLLECTION_STATUSES
+from services.installments import overdue_query
+
+PAR_DAYS = (30, 60, 90)
+
+
+def portfolio_at_risk(as_of):
+    """{30: amount, 60: amount, 90: amount} of balances still owed with installments that many days late"""
+    overdue = overdue_query(as_of).subquery()
+    columns = [
+        func.coalesce(func.sum(case(
+            (overdue.c.oldest_due_date < as_of - timedelta(days=days), Loan.remaining_balance),
+            else_=0
+        )), 0)
+        for days in PAR_DAYS
+    ]
+    amounts = db.session.query(*columns).select_from(Loan).join(
+        overdue, overdue.c.loan_id == Loan.id
+    ).filter(Loan.status.in_(COLLECTION_STATUSES)).one()
+    return {days: float(amount) for days, amount in zip(PAR_DAYS, amounts)}
+
+
+def take_snapshot(as_of=None):
+    """Write (or overwrite) the snapshot row for `as_of`'s date; the caller commits"""
+    as_of = as_of or datetime.utcnow()
+    summary = get_portfolio_summary()
+    par = portfolio_at_risk(as_of)
+
+    snapshot = PortfolioSnapshot.query.filter_by(snapshot_date=as_of.date()).first()
+    if snapshot is None:
+        snapshot = PortfolioSnapshot(snapshot_date=as_of.date())
+        db.session.add(snapshot)
+
+    # Defaulted loans are still owed, and are most of PAR90
+    snapshot.outstanding = summary.outstanding(*COLLECTION_STATUSES)
+    snapshot.disbursed = summary.principal(*DISBURSED_STATUSES)
+    snapshot.collected = summary.total_collected
+    snapshot.savings = summary.total_savings
+    snapshot.par30, snapshot.par60, snapshot.par90 = par[30], par[60], par[90]
+    snapshot.total_members = summary.total_users
+    snapshot.pending_loans = summary.loan_count(LoanStatus.PENDING)
+    snapshot.approved_loans = summary.loan_count(LoanStatus.APPROVED)
+    snapshot.active_loans = summary.loan_count(LoanStatus.ACTIVE)
+    snapshot.completed_loans = summary.loan_count(LoanStatus.COMPLETED)
+    snapshot.rejected_loans = summary.loan_count(LoanStatus.REJECTED)
+    snapshot.defaulted_loans = summary.loan_count(LoanStatus.DEFAULTED)
+    return snapshot
+
+
+def snapshots_between(start, end):
+    """Stored snapshots from `start` to `end` (dates, inclusive), oldest first"""
+    return PortfolioSnapshot.query.filter(
+        PortfolioSnapshot.snapshot_date >= start,
+        PortfolioSnapshot.snapshot_date <= end
+    ).order_by(PortfolioSnapshot.snapshot_date).all()
+
+
+reports_cli = AppGroup('reports', help='Reporting jobs.')
+
+
+@reports_cli.command('snapshot')
+def snapshot_command():
+    """Store today's portfolio snapshot."""
+    snapshot = take_snapshot()
+    db.session.commit()
+    print(f"✅ Portfolio snapshot stored for {snapshot.snapshot_date.isoformat()}")
+
+
+def init_app(app):
+    app.cli.add_command(reports_cli)
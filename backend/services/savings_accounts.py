@@ -0,0 +1,163 @@
+"""
+Maintained per-member savings balances.
+
+Each deposit or withdrawal goes through record_movement(), which locks the
+member's savings_accounts row, checks and updates the running balance and
+appends the savings history row in the same transaction. The history row's
+`balance` is the running balance after that movement, so balance checks
+and summaries read one row instead of summing a member's whole history.
+
+The history stays the source of truth: verify_accounts() recomputes every
+balance as SUM(savings.amount) and reports (or repairs) accounts that have
+drifted. Run it from cron with `flask savings verify [--repair]`.
+"""
+
+from datetime import datetime
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from extensions import db
+from models import Saving, SavingsAccount
+
+# Balances are floats; smaller differences are rounding, not drift
+TOLERANCE = 0.005
+
+
+class InsufficientFunds(ValueError):
+    def __init__(self, balance):
+        super().__init__(f'Insufficient funds. Available balance: ₱{balance:,.2f}')
+        self.balance = balance
+
+
+def get_balance(user_id):
+    """A member's savings balance (0 if they have never saved)"""
+    account = db.session.get(SavingsAccount, int(user_id))
+    return account.balance if account else 0.0
+
+
+def _locked_account(user_id):
+    """The member's account row, created if missing and locked until commit"""
+    connection = db.session.connection()
+    insert = postgresql_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+    db.session.execute(
+        insert(SavingsAccount.__table__)
+        .values(user_id=user_id, balance=0.0, movement_count=0, updated_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=['user_id'])
+    )
+    return db.session.execute(
+        select(SavingsAccount)
+        .where(SavingsAccount.user_id == user_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).scalar_one()
+
+
+def record_movement(user_id, amount, created_at=None):
+    """
+    Record a deposit (amount > 0) or withdrawal (amount < 0).
+
+    Returns (saving, account). Raises InsufficientFunds if a withdrawal
+    exceeds the balance. The caller commits.
+    """
+    user_id = int(user_id)
+    account = _locked_account(user_id)
+    if amount < 0 and -amount > account.balance + TOLERANCE:
+        raise InsufficientFunds(account.balance)
+
+    created_at = created_at or datetime.utcnow()
+    account.balance = max(0.0, account.balance + amount)
+    account.movement_count += 1
+    if account.last_movement_at is None or created_at >= account.last_movement_at:
+        account.last_movement_amount = amount
+        account.last_movement_at = created_at
+
+    saving = Saving(
+        user_id=user_id,
+        amount=amount,
+        balance=account.balance,  # Running balance after this movement
+        interest_rate=2.0,
+        created_at=created_at
+    )
+    db.session.add(saving)
+    return saving, account
+
+
+def _history_totals():
+    ranked = select(
+        Saving.user_id,
+        Saving.amount,
+        Saving.created_at,
+        func.sum(Saving.amount).over(partition_by=Saving.user_id).label('balance'),
+        func.count().over(partition_by=Saving.user_id).label('movement_count'),
+        func.row_number().over(
+            partition_by=Saving.user_id,
+            order_by=(Saving.created_at.desc(), Saving.id.desc())
+        ).label('position')
+    ).subquery()
+    return db.session.execute(
+        select(ranked).where(ranked.c.position == 1)
+    ).all()
+
+
+def verify_accounts(repair=False):
+    """
+    Compare every account with the savings history.
+
+    Returns a list of {'user_id', 'expected', 'actual'} for accounts that
+    are missing or whose balance or movement count differs. With repair,
+    those accounts are rewritten from the history (the caller commits).
+    """
+    accounts = {account.user_id: account for account in SavingsAccount.query.all()}
+    mismatches = []
+
+    for row in _history_totals():
+        expected = max(0.0, float(row.balance))
+        account = accounts.pop(row.user_id, None)
+        if account and abs(account.balance - expected) <= TOLERANCE \
+                and account.movement_count == row.movement_count:
+            continue
+
+        mismatches.append({
+            'user_id': row.user_id,
+            'expected': expected,
+            'actual': account.balance if account else None
+        })
+        if repair:
+            account = account or SavingsAccount(user_id=row.user_id)
+            account.balance = expected
+            account.movement_count = row.movement_count
+            account.last_movement_amount = row.amount
+            account.last_movement_at = row.created_at
+            db.session.add(account)
+
+    # Accounts left over have no history at all
+    for account in accounts.values():
+        if account.balance or account.movement_count:
+            mismatches.append({'user_id': account.user_id, 'expected': 0.0, 'actual': account.balance})
+            if repair:
+                db.session.delete(account)
+
+    return mismatches
+
+
+savings_cli = AppGroup('savings', help='Savings account maintenance.')
+
+
+@savings_cli.command('verify')
+@click.option('--repair', is_flag=True, help='Rewrite drifted accounts from the savings history.')
+def verify_command(repair):
+    """Reconcile savings_accounts against the savings history."""
+    mismatches = verify_accounts(repair=repair)
+    for mismatch in mismatches:
+        print(f"User {mismatch['user_id']}: account {mismatch['actual']} != history {mismatch['expected']}")
+    if repair:
+        db.session.commit()
+        print(f"✅ Repaired {len(mismatches)} savings accounts")
+    else:
+        print(f"Found {len(mismatches)} drifted savings accounts")
+
+
+def init_app(app):
+    app.cli.add_command(savings_cli)
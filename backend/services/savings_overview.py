@@ -0,0 +1,65 @@
+"""
+Savings account overview for the admin savings page.
+
+Each member's balance and most recent savings movement are read from their
+maintained savings_accounts row (see savings_accounts.py), outer-joined to
+the users page. There is no follow-up query per member and no scan of the
+savings history.
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import func, case, asc, desc
+from extensions import db
+from models import User, SavingsAccount
+
+
+def savings_accounts_query(sort_by='balance', order='desc'):
+    """
+    Rows of (id, user_id, first_name, last_name, email, total_balance,
+    last_deposit_amount, last_deposit_date), one per member.
+
+    Raises ValueError for an unknown sort field.
+    """
+    total_balance = func.coalesce(SavingsAccount.balance, 0)
+
+    sort_columns = {
+        'balance': total_balance,
+        'name': User.last_name,
+        'last_deposit_date': SavingsAccount.last_movement_at
+    }
+    if sort_by not in sort_columns:
+        raise ValueError(f'Invalid sort field: {sort_by}')
+
+    direction = asc if order == 'asc' else desc
+    return db.session.query(
+        User.id,
+        User.user_id,
+        User.first_name,
+        User.last_name,
+        User.email,
+        total_balance.label('total_balance'),
+        func.coalesce(SavingsAccount.last_movement_amount, 0).label('last_deposit_amount'),
+        SavingsAccount.last_movement_at.label('last_deposit_date')
+    ).outerjoin(
+        SavingsAccount, SavingsAccount.user_id == User.id
+    ).order_by(direction(sort_columns[sort_by]), direction(User.id))
+
+
+def savings_summary(now=None):
+    """Totals across all savings accounts for the overview header"""
+    now = now or datetime.utcnow()
+    last_deposit_date = SavingsAccount.last_movement_at
+
+    total_accounts, total_amount, active_accounts, recent_deposits = db.session.query(
+        func.count(User.id),
+        func.coalesce(func.sum(SavingsAccount.balance), 0),
+        func.count(case((last_deposit_date >= now - timedelta(days=30), 1))),
+        func.count(case((last_deposit_date >= now - timedelta(days=7), 1)))
+    ).outerjoin(SavingsAccount, SavingsAccount.user_id == User.id).one()
+
+    return {
+        'total_accounts': total_accounts,
+        'total_amount': float(total_amount),
+        'active_accounts': active_accounts,
+        'recent_deposits': recent_deposits
+    }
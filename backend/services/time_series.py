@@ -0,0 +1,170 @@
+"""
+Time-bucketed loan and payment series for dashboard and report charts.
+
+Loan applications, disbursed principal and collections are bucketed by day,
+week, month or quarter with a single grouped UNION ALL query. Bucket
+boundaries are calendar-correct (weeks start on Monday, as in PostgreSQL's
+date_trunc) and missing buckets are zero-filled in Python.
+"""
+
+from datetime import datetime, date, timedelta
+from sqlalchemy import select, func, literal, cast, union_all, Integer, Float
+from extensions import db
+from models import Loan, Payment
+
+GRANULARITIES = ('day', 'week', 'month', 'quarter')
+MAX_BUCKETS = 1000
+
+
+def truncate(value, granularity):
+    """Start of the bucket that contains `value` (a date or datetime)"""
+    day = value.date() if isinstance(value, datetime) else value
+    if granularity == 'day':
+        return day
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    if granularity == 'quarter':
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    raise ValueError(f'Invalid granularity: {granularity}')
+
+
+def next_bucket(bucket, granularity):
+    """Start of the bucket following `bucket`"""
+    if granularity == 'day':
+        return bucket + timedelta(days=1)
+    if granularity == 'week':
+        return bucket + timedelta(days=7)
+    months = 1 if granularity == 'month' else 3
+    month = bucket.month - 1 + months
+    return bucket.replace(year=bucket.year + month // 12, month=month % 12 + 1, day=1)
+
+
+def bucket_starts(start, end, granularity):
+    """Every bucket start from the bucket containing `start` to the one containing `end`"""
+    buckets = []
+    bucket = truncate(start, granularity)
+    last = truncate(end, granularity)
+    while bucket <= last:
+        buckets.append(bucket)
+        bucket = next_bucket(bucket, granularity)
+    return buckets
+
+
+def _bucket_expression(column, granularity, dialect):
+    """SQL expression truncating `column` to its bucket start"""
+    if dialect == 'postgresql':
+        return func.date_trunc(granularity, column)
+
+    # SQLite: date modifiers produce 'YYYY-MM-DD' strings
+    if granularity == 'day':
+        return func.date(column)
+    if granularity == 'week':
+        return func.date(column, 'weekday 0', '-6 days')
+    if granularity == 'month':
+        return func.date(column, 'start of month')
+    month_offset = (cast(func.strftime('%m', column), Integer) - 1) % 3
+    return func.date(column, 'start of month', func.printf('-%d months', month_offset))
+
+
+def _as_date(bucket):
+    if isinstance(bucket, datetime):
+        return bucket.date()
+    if isinstance(bucket, date):
+        return bucket
+    return date.fromisoformat(bucket)
+
+
+def label(bucket, granularity):
+    if granularity == 'month':
+        return bucket.strftime('%b')
+    if granularity == 'quarter':
+        return f"Q{(bucket.month - 1) // 3 + 1} {bucket.year}"
+    return bucket.isoformat()
+
+
+def loan_payment_series(start, end, granularity='month', user_id=None):
+    """
+    Zero-filled buckets of loan applications, disbursed principal and
+    collections between `start` and `end` (both inclusive dates).
+
+    Restricted to one member when `user_id` is given.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'Invalid granularity: {granularity}')
+
+    start = truncate(start, 'day')
+    end = truncate(end, 'day')
+    buckets = bucket_starts(start, end, granularity)
+    if len(buckets) > MAX_BUCKETS:
+        raise ValueError(f'Range too large: more than {MAX_BUCKETS} {granularity} buckets')
+
+    range_start = datetime.combine(start, datetime.min.time())
+    range_end = datetime.combine(end + timedelta(days=1), datetime.min.time())
+    dialect = db.session.get_bind().dialect.name
+
+    def bucket(column):
+        return _bucket_expression(column, granularity, dialect).label('bucket')
+
+    applications = select(
+        bucket(Loan.created_at),
+        literal(1).label('loans'),
+        cast(literal(0), Float).label('disbursed'),
+        cast(literal(0), Float).label('collected')
+    ).where(Loan.created_at >= range_start, Loan.created_at < range_end)
+
+    disbursements = select(
+        bucket(Loan.approved_at),
+        literal(0),
+        Loan.principal_amount,
+        cast(literal(0), Float)
+    ).where(Loan.approved_at >= range_start, Loan.approved_at < range_end)
+
+    collections = select(
+        bucket(Payment.payment_date),
+        literal(0),
+        cast(literal(0), Float),
+        Payment.amount
+    ).where(
+        Payment.payment_date >= range_start,
+        Payment.payment_date < range_end,
+        Payment.status == 'completed'
+    )
+
+    if user_id is not None:
+        applications = applications.where(Loan.user_id == user_id)
+        disbursements = disbursements.where(Loan.user_id == user_id)
+        collections = collections.where(Payment.user_id == user_id)
+
+    events = union_all(applications, disbursements, collections).subquery('events')
+    rows = db.session.execute(
+        select(
+            events.c.bucket,
+            func.sum(events.c.loans),
+            func.sum(events.c.disbursed),
+            func.sum(events.c.collected)
+        ).group_by(events.c.bucket)
+    ).all()
+
+    totals = {_as_date(row[0]): row[1:] for row in rows if row[0] is not None}
+    series = []
+    for bucket_start in buckets:
+        loans, disbursed, collected = totals.get(bucket_start, (0, 0, 0))
+        series.append({
+            'period': bucket_start.isoformat(),
+            'label': label(bucket_start, granularity),
+            'loans': int(loans or 0),
+            'disbursed': float(disbursed or 0),
+            'collected': float(collected or 0)
+        })
+    return series
+
+
+def last_months(count, today=None):
+    """(start, end) covering the last `count` calendar months including this one"""
+    today = today or datetime.utcnow().date()
+    start = truncate(today, 'month')
+    for _ in range(count - 1):
+        start = truncate(start - timedelta(days=1), 'month')
+    return start, today
@@ -0,0 +1,239 @@
+"""
+Member transaction timeline.
+
+Transactions, loan payments, savings movements, loan disbursements,
+penalties and the account registration are merged with one UNION ALL query
+per page. Ordering, type/date filtering and the keyset cursor on
+(date, source, source id) all run in the database, and the summary counts
+come from a single grouped count over the same feed.
+"""
+
+from datetime import datetime
+from sqlalchemy import select, literal, cast, case, func, null, and_, or_
+from sqlalchemy import String, Integer, Float
+from extensions import db
+from models import Transaction, Payment, Saving, Loan, Penalty, User, LoanStatus, LoanType
+
+SOURCES = ('txn', 'payment', 'saving', 'loan', 'penalty', 'account')
+
+# Entries per page unless the caller asks for more (up to MAX_LIMIT)
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+# Timeline types each source can produce, used to skip branches a type filter excludes
+SOURCE_TYPES = {
+    'txn': {'loan', 'savings', 'withdrawal', 'penalty', 'payment'},
+    'payment': {'loan_payment'},
+    'saving': {'savings_deposit', 'savings_withdrawal'},
+    'loan': {'loan_disbursement'},
+    'penalty': {'penalty'},
+    'account': {'account_creation'}
+}
+
+PAYMENT_METHODS = {
+    'gcash': 'GCash',
+    'card': 'Card',
+    'manual': 'Manual'
+}
+
+
+def _or_null(value, type_):
+    return value if value is not None else cast(null(), type_)
+
+
+def _row(source, source_id, date, type_, amount, status, reference=None, description=None,
+         loan_id=None, payment_method=None, days_overdue=None, balance=None,
+         loan_status=None, remaining_balance=None, loan_type=None):
+    """Column list shared by every branch of the union"""
+    return [
+        literal(source).label('source'),
+        source_id.label('source_id'),
+        date.label('date'),
+        type_.label('type'),
+        cast(amount, Float).label('amount'),
+        cast(status, String).label('status'),
+        _or_null(reference, String).label('reference'),
+        _or_null(description, String).label('description'),
+        _or_null(loan_id, Integer).label('loan_id'),
+        _or_null(payment_method, String).label('payment_method'),
+        _or_null(days_overdue, Integer).label('days_overdue'),
+        _or_null(balance, Float).label('balance'),
+        _or_null(loan_status, String).label('loan_status'),
+        _or_null(remaining_balance, Float).label('remaining_balance'),
+        _or_null(loan_type, String).label('loan_type')
+    ]
+
+
+def _branches(user_id):
+    """(source, select, date column) for each timeline source"""
+    return [
+        ('txn', select(*_row(
+            'txn', Transaction.id, Transaction.created_at,
+            func.lower(cast(Transaction.transaction_type, String)),
+            Transaction.amount, literal('completed'),
+            reference=Transaction.transaction_id,
+            description=Transaction.description
+        )).where(Transaction.user_id == user_id), Transaction.created_at),
+
+        ('payment', select(*_row(
+            'payment', Payment.id, Payment.payment_date, literal('loan_payment'),
+            Payment.amount, Payment.status,
+            reference=Payment.payment_id,
+            loan_id=Payment.loan_id,
+            payment_method=Payment.payment_method
+        )).where(Payment.user_id == user_id), Payment.payment_date),
+
+        ('saving', select(*_row(
+            'saving', Saving.id, Saving.created_at,
+            case((Saving.amount > 0, 'savings_deposit'), else_='savings_withdrawal'),
+            func.abs(Saving.amount), literal('completed'),
+            balance=Saving.balance
+        )).where(Saving.user_id == user_id), Saving.created_at),
+
+        ('loan', select(*_row(
+            'loan', Loan.id, Loan.approved_at, literal('loan_disbursement'),
+            Loan.principal_amount, literal('completed'),
+            reference=Loan.loan_id,
+            loan_status=cast(Loan.status, String),
+            remaining_balance=Loan.remaining_balance,
+            loan_type=cast(Loan.loan_type, String)
+        )).where(Loan.user_id == user_id, Loan.approved_at.isnot(None)), Loan.approved_at),
+
+        ('penalty', select(*_row(
+            'penalty', Penalty.id, Penalty.penalty_date, literal('penalty'),
+            Penalty.amount, Penalty.status,
+            reference=Penalty.penalty_id,
+            loan_id=Penalty.loan_id,
+            days_overdue=Penalty.days_overdue
+        )).where(Penalty.user_id == user_id), Penalty.penalty_date),
+
+        ('account', select(*_row(
+            'account', User.id, User.created_at, literal('account_creation'),
+            func.coalesce(User.capital_share, 0), literal('completed')
+        )).where(User.id == user_id, User.created_at.isnot(None)), User.created_at)
+    ]
+
+
+def _feed(user_id, types=None, start_date=None, end_date=None):
+    """The filtered union of all sources as a subquery, or None if nothing can match"""
+    selects = []
+    for source, branch, date_column in _branches(user_id):
+        if types and not SOURCE_TYPES[source] & set(types):
+            continue
+        if start_date:
+            branch = branch.where(date_column >= start_date)
+        if end_date:
+            branch = branch.where(date_column <= end_date)
+        selects.append(branch)
+
+    if not selects:
+        return None
+
+    feed = selects[0] if len(selects) == 1 else selects[0].union_all(*selects[1:])
+    return feed.subquery('timeline')
+
+
+def encode_cursor(row):
+    return f"{row.date.isoformat()}|{row.source}|{row.source_id}"
+
+
+def decode_cursor(cursor):
+    """Parse a cursor produced by encode_cursor(); raises ValueError if malformed"""
+    date, source, source_id = cursor.split('|')
+    if source not in SOURCES:
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return datetime.fromisoformat(date), source, int(source_id)
+
+
+def _loan_info(loan_id):
+    return f"Loan #{loan_id}" if loan_id else "Unknown Loan"
+
+
+def _serialize(row):
+    entry = {
+        'id': f"{row.source}_{row.source_id}",
+        'date': row.date.isoformat(),
+        'transaction_id': row.reference,
+        'type': row.type,
+        'amount': row.amount,
+        'status': row.status
+    }
+
+    if row.source == 'txn':
+        entry['description'] = row.description or f"{row.type.title()} Transaction"
+    elif row.source == 'payment':
+        method = PAYMENT_METHODS.get(row.payment_method, 'Manual')
+        entry['description'] = f"Loan Payment - {_loan_info(row.loan_id)} (via {method})"
+        entry['loan_id'] = row.loan_id
+        entry['payment_method'] = row.payment_method
+    elif row.source == 'saving':
+        kind = 'Deposit' if row.type == 'savings_deposit' else 'Withdrawal'
+        entry['transaction_id'] = f"SAV-{row.source_id}"
+        entry['description'] = f"Savings {kind} - Balance: ₱{row.balance:,.2f}"
+        entry['balance'] = row.balance
+    elif row.source == 'loan':
+        loan_type = LoanType[row.loan_type].value if row.loan_type else LoanType.PERSONAL.value
+        entry['description'] = f"Loan Disbursement - {loan_type.title()} Loan"
+        entry['loan_status'] = LoanStatus[row.loan_status].value
+        entry['remaining_balance'] = row.remaining_balance
+    elif row.source == 'penalty':
+        entry['description'] = f"Overdue Penalty - {_loan_info(row.loan_id)} ({row.days_overdue} days late)"
+        entry['days_overdue'] = row.days_overdue
+        entry['loan_id'] = row.loan_id
+    elif row.source == 'account':
+        entry['transaction_id'] = f"ACC-{row.source_id}"
+        entry['description'] = (
+            f"Account Registration - Capital Share: ₱{row.amount:,.2f}" if row.amount else "Account Registration"
+        )
+
+    return entry
+
+
+def get_timeline(user_id, limit=DEFAULT_LIMIT, cursor=None, types=None, start_date=None, end_date=None):
+    """
+    Return (entries, next_cursor) for a member, newest first, `limit`
+    entries at a time. next_cursor is None on the last page.
+    """
+    feed = _feed(user_id, types, start_date, end_date)
+    if feed is None:
+        return [], None
+
+    query = select(feed)
+    if types:
+        query = query.where(feed.c.type.in_(types))
+    if cursor:
+        date, source, source_id = decode_cursor(cursor)
+        query = query.where(or_(
+            feed.c.date < date,
+            and_(feed.c.date == date, feed.c.source < source),
+            and_(feed.c.date == date, feed.c.source == source, feed.c.source_id < source_id)
+        ))
+    limit = max(1, min(limit, MAX_LIMIT))
+    query = query.order_by(feed.c.date.desc(), feed.c.source.desc(), feed.c.source_id.desc()).limit(limit + 1)
+
+    rows = db.session.execute(query).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1])
+    return [_serialize(row) for row in rows], next_cursor
+
+
+def get_timeline_summary(user_id, types=None, start_date=None, end_date=None):
+    """Per-type entry counts for the member's timeline, from one grouped count query"""
+    feed = _feed(user_id, types, start_date, end_date)
+    counts = {}
+    if feed is not None:
+        query = select(feed.c.type, func.count()).group_by(feed.c.type)
+        if types:
+            query = query.where(feed.c.type.in_(types))
+        counts = dict(db.session.execute(query).all())
+
+    return {
+        'total_transactions': sum(counts.values()),
+        'total_payments': counts.get('loan_payment', 0),
+        'total_savings': counts.get('savings_deposit', 0),
+        'total_withdrawals': counts.get('savings_withdrawal', 0),
+        'total_penalties': counts.get('penalty', 0),
+        'total_loans': counts.get('loan_disbursement', 0)
+    }
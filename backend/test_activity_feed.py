@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQL activity feed behind /api/admin/reports/activities
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import Payment, Saving
+from conftest import make_member, make_loan, count_queries
+
+
+@pytest.fixture
+def history(app):
+    member = make_member(1)
+    db.session.flush()
+    start = datetime(2025, 1, 1)
+    for day in range(10):
+        loan = make_loan(member, principal=1000 + day)
+        loan.created_at = start + timedelta(days=day)
+        db.session.flush()
+        db.session.add(Payment(user_id=member.id, loan_id=loan.id, amount=100 + day,
+                               payment_date=start + timedelta(days=day, hours=1)))
+        db.session.add(Saving(user_id=member.id, amount=-50 if day % 2 else 50,
+                              balance=0, created_at=start + timedelta(days=day, hours=2)))
+    db.session.commit()
+
+
+def test_feed_is_merged_and_ordered_in_one_query(client, admin_headers, history):
+    with count_queries() as statements:
+        response = client.get('/api/admin/reports/activities?limit=5', headers=admin_headers)
+    data = response.get_json()
+
+    assert len(statements) == 1
+    assert [a['id'] for a in data['activities']] == [
+        'saving_10', 'payment_10', 'loan_10', 'saving_9', 'payment_9'
+    ]
+    assert data['activities'][0]['description'] == 'Made a savings withdrawal of ₱50.00'
+    assert data['activities'][2]['description'] == 'Applied for personal loan of ₱1,009.00'
+    assert data['activities'][2]['status'] == 'approved'
+    assert data['activities'][0]['user'] == 'Member1 Test'
+
+
+def test_keyset_pagination_walks_the_whole_feed(client, admin_headers, history):
+    seen = []
+    cursor = None
+    while True:
+        url = '/api/admin/reports/activities?limit=7'
+        if cursor:
+            url += f'&cursor={cursor}'
+        data = client.get(url, headers=admin_headers).get_json()
+        seen.extend(a['id'] for a in data['activities'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+
+    assert len(seen) == 30
+    assert len(set(seen)) == 30
+
+
+def test_feed_filters_by_type(client, admin_headers, history):
+    data = client.get('/api/admin/reports/activities?type=payment,savings&limit=100',
+                      headers=admin_headers).get_json()
+    assert len(data['activities']) == 20
+    assert {a['type'] for a in data['activities']} == {'payment', 'savings'}
+
+
+def test_malformed_cursor_is_rejected(client, admin_headers, history):
+    response = client.get('/api/admin/reports/activities?cursor=garbage', headers=admin_headers)
+    assert response.status_code == 400
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for keyset pagination of the admin activity log (/api/admin/activities)
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from admin_models import AdminActivity
+from conftest import count_queries
+
+
+@pytest.fixture
+def log(app, admin):
+    now = datetime.utcnow()
+    for i in range(25):
+        db.session.add(AdminActivity(
+            admin_id=admin.id,
+            action='LOGIN' if i % 5 == 0 else 'VIEW_SAVINGS',
+            description=f'activity {i}',
+            # every third pair shares a timestamp to exercise the id tie-break
+            created_at=now - timedelta(days=i // 2)
+        ))
+    db.session.commit()
+
+
+def fetch_all(client, headers, query=''):
+    seen, cursor, pages = [], None, 0
+    while True:
+        url = f'/api/admin/activities?per_page=4{query}' + (f'&cursor={cursor}' if cursor else '')
+        data = client.get(url, headers=headers).get_json()
+        seen.extend(a['id'] for a in data['activities'])
+        pages += 1
+        cursor = data['next_cursor']
+        if not cursor:
+            return seen, pages
+
+
+def test_keyset_pages_cover_the_log_once(client, admin_headers, log):
+    seen, pages = fetch_all(client, admin_headers)
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+    assert pages == 7
+
+
+def test_admin_name_selected_in_same_statement(client, admin_headers, log):
+    with count_queries() as statements:
+        data = client.get('/api/admin/activities?per_page=20', headers=admin_headers).get_json()
+    assert len(statements) == 1
+    assert data['activities'][0]['admin_name'] == 'Test Admin'
+
+
+def test_filters_and_total(client, admin_headers, log):
+    seen, _ = fetch_all(client, admin_headers, '&action=LOGIN')
+    assert len(seen) == 5
+
+    data = client.get('/api/admin/activities?date_filter=today&include_total=true',
+                      headers=admin_headers).get_json()
+    assert data['total'] == 2
+
+
+def test_legacy_page_numbers_still_work(client, admin_headers, log):
+    data = client.get('/api/admin/activities?page=2&per_page=10', headers=admin_headers).get_json()
+    assert len(data['activities']) == 10
+    assert data['total'] == 25
+    assert data['pages'] == 3
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for claims-based admin authorization (@admin_required)
+"""
+
+import pytest
+from flask_jwt_extended import create_access_token, decode_token
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from admin_models import Admin, AdminRole
+from services.admin_auth import admin_claims
+from conftest import make_member, auth_headers, count_queries
+
+
+def make_admin(username, role=AdminRole.ADMIN):
+    admin = Admin(
+        username=username,
+        email=f'{username}@example.com',
+        password_hash=generate_password_hash('admin123'),
+        first_name=username.title(),
+        last_name='Admin',
+        role=role,
+        is_active=True
+    )
+    db.session.add(admin)
+    db.session.commit()
+    return admin
+
+
+def headers_for(admin):
+    token = create_access_token(identity=str(admin.id), additional_claims=admin_claims(admin))
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_login_token_carries_claims(client, admin):
+    response = client.post('/api/admin/login', json={'username': 'testadmin', 'password': 'admin123'})
+    claims = decode_token(response.get_json()['access_token'])
+    assert claims['type'] == 'admin'
+    assert claims['role'] == 'admin'
+    assert claims['active'] is True
+    assert claims['username'] == 'testadmin'
+
+
+def test_authorization_runs_no_admin_query(client, admin_headers):
+    with count_queries() as statements:
+        response = client.get('/api/admin/cache/stats', headers=admin_headers)
+    assert response.status_code == 200
+    assert statements == []
+
+
+def test_member_tokens_are_rejected(client, admin):
+    member = make_member(1)
+    db.session.commit()
+    response = client.get('/api/admin/dashboard/stats', headers=auth_headers(member))
+    assert response.status_code == 403
+
+
+def test_deleted_admin_is_revoked_immediately(client, admin, admin_headers):
+    other = make_admin('other')
+    other_headers = headers_for(other)
+    assert client.get('/api/admin/cache/stats', headers=other_headers).status_code == 200
+
+    response = client.delete(f'/api/admin/settings/admin/{other.id}', headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get('/api/admin/cache/stats', headers=other_headers).status_code == 401
+
+
+def test_revocations_are_picked_up_on_refresh(app, client, admin):
+    other = make_admin('other')
+    other_headers = headers_for(other)
+    app.extensions['admin_revocations'].refresh()
+
+    other.is_active = False
+    db.session.commit()
+    assert client.get('/api/admin/cache/stats', headers=other_headers).status_code == 200
+
+    app.extensions['admin_revocations'].refresh_interval = 0
+    assert client.get('/api/admin/cache/stats', headers=other_headers).status_code == 401
+
+
+def test_role_is_enforced(client, admin):
+    manager = make_admin('manager', role=AdminRole.MANAGER)
+    response = client.post('/api/admin/settings/create-admin', headers=headers_for(manager), json={
+        'name': 'New Admin', 'username': 'newadmin', 'email': 'new@example.com', 'password': 'secret'
+    })
+    assert response.status_code == 403
+    assert client.get('/api/admin/dashboard/stats', headers=headers_for(manager)).status_code == 200
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Query budget tests for the admin loan listings.
+
+The listings must cost the same number of queries for 5 loans as for 50,
+otherwise an N+1 lookup has crept back in.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import LoanStatus
+from services.installments import generate_schedule
+from conftest import make_member, make_loan, count_queries
+
+
+def seed_loans(admin_id, count, start=0, status=LoanStatus.APPROVED, approved_at=None):
+    members = [make_member(start + i, admin_id=admin_id) for i in range(count)]
+    db.session.flush()
+    for member in members:
+        loan = make_loan(member, status=status, approved_at=approved_at)
+        if approved_at:
+            generate_schedule(loan)
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def queries_for(client, headers, url):
+    with count_queries() as statements:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return len(statements), response.get_json()
+
+
+@pytest.mark.parametrize('url', [
+    '/api/admin/loans?per_page=100',
+    '/api/admin/dashboard/recent-loans?per_page=100',
+])
+def test_paginated_loan_listings_have_fixed_query_budget(app, client, admin, admin_headers, url):
+    admin_id = admin.id
+    seed_loans(admin_id, 5)
+    small_count, small = queries_for(client, admin_headers, url)
+
+    seed_loans(admin_id, 45, start=100)
+    large_count, large = queries_for(client, admin_headers, url)
+
+    assert len(small['loans']) == 5
+    assert len(large['loans']) == 50
+    assert large_count == small_count
+    assert large_count <= 3
+
+
+def test_loan_listing_includes_borrower_and_creator(app, client, admin, admin_headers):
+    admin_id = admin.id
+    seed_loans(admin_id, 2)
+    response = client.get('/api/admin/loans', headers=admin_headers)
+    loan = response.get_json()['loans'][0]
+    assert loan['user']['email'].endswith('@example.com')
+    assert loan['user']['created_by']['username'] == 'testadmin'
+
+
+def test_overdue_listing_has_fixed_query_budget(app, client, admin, admin_headers):
+    admin_id = admin.id
+    # First installment fell due about ten days ago
+    approved_at = datetime.utcnow() - timedelta(days=40)
+    seed_loans(admin_id, 3, status=LoanStatus.ACTIVE, approved_at=approved_at)
+    small_count, small = queries_for(client, admin_headers, '/api/admin/loans/overdue')
+
+    seed_loans(admin_id, 30, start=100, status=LoanStatus.ACTIVE, approved_at=approved_at)
+    large_count, large = queries_for(client, admin_headers, '/api/admin/loans/overdue')
+
+    assert small['count'] == 3
+    assert large['count'] == 33
+    assert large['overdue_loans'][0]['days_overdue'] >= 9
+    assert large['overdue_loans'][0]['amount_overdue'] == round(10000.0 / 12, 2)
+    assert large_count == small_count
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for the event-invalidated dashboard aggregate cache
+"""
+
+import pytest
+
+from extensions import db
+from models import Loan, LoanStatus
+from services.aggregate_cache import AggregateCache, LRUBackend, get_cache
+from conftest import make_member, make_loan, count_queries
+
+
+@pytest.fixture
+def member(app, admin):
+    member = make_member(1)
+    db.session.flush()
+    make_loan(member, status=LoanStatus.ACTIVE, principal=5000)
+    db.session.commit()
+    return member
+
+
+def get(client, headers, url):
+    with count_queries() as statements:
+        data = client.get(url, headers=headers).get_json()
+    return data, len(statements)
+
+
+def test_second_load_is_served_from_cache(client, admin_headers, member):
+    for url in ('/api/admin/dashboard/stats', '/api/admin/recovery-rates',
+                '/api/admin/dashboard/monthly-loans'):
+        first, _ = get(client, admin_headers, url)
+        second, queries = get(client, admin_headers, url)
+        assert second == first
+        assert queries == 0
+
+    stats = client.get('/api/admin/cache/stats', headers=admin_headers).get_json()
+    assert stats['backend'] == 'lru'
+    assert stats['misses'] == 3
+    assert stats['hits'] == 3
+
+
+def test_committed_writes_invalidate(client, admin_headers, member):
+    assert get(client, admin_headers, '/api/admin/dashboard/stats')[0]['total_loans'] == 1
+
+    make_loan(member, status=LoanStatus.APPROVED)
+    db.session.commit()
+    assert get(client, admin_headers, '/api/admin/dashboard/stats')[0]['total_loans'] == 2
+
+    # Bulk updates skip the flush but still invalidate on commit
+    Loan.query.update({Loan.status: LoanStatus.COMPLETED})
+    db.session.commit()
+    data, _ = get(client, admin_headers, '/api/admin/dashboard/stats')
+    assert data['total_loans'] == 0
+    assert data['repaid_loans'] == 2
+
+
+def test_rollback_and_untracked_commits_keep_entries(client, admin_headers, member):
+    get(client, admin_headers, '/api/admin/dashboard/stats')
+    invalidations = get_cache().invalidations
+
+    make_loan(member, status=LoanStatus.APPROVED)
+    db.session.flush()
+    db.session.rollback()
+    db.session.commit()
+
+    assert get(client, admin_headers, '/api/admin/dashboard/stats')[1] == 0
+    assert get_cache().invalidations == invalidations
+
+
+def test_lru_backend_evicts_least_recently_used():
+    backend = LRUBackend(maxsize=2)
+    backend.set('a', 1)
+    backend.set('b', 2)
+    backend.get('a')
+    backend.set('c', 3)
+    assert backend.get('b') is None
+    assert backend.get('a') == 1
+    assert len(backend) == 2
+
+
+
+def test_value_computed_before_an_invalidation_is_not_stored():
+    cache = AggregateCache(LRUBackend())
+
+    def compute_during_write():
+        # A write commits and invalidates while this request is computing
+        cache.invalidate()
+        return 'stale'
+
+    assert cache.get_or_compute('stats', compute_during_write) == 'stale'
+    assert cache.backend.get('stats') is None
+    assert cache.get_or_compute('stats', lambda: 'fresh') == 'fresh'
+    assert cache.backend.get('stats') == 'fresh'
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
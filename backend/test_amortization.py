@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the amortization engine, the loan schedule endpoint and the admin export
+"""
+
+import csv
+import io
+from datetime import datetime
+
+import pytest
+
+from extensions import db
+from models import LoanStatus
+from services.amortization import amortize, monthly_payment
+from services.installments import generate_schedule
+from conftest import make_member, make_loan, auth_headers
+
+LOANS = ([10000, 25000, 1200, 50000], [5.0, 12.0, 0.0, 7.5], [12, 24, 6, 60])
+
+
+@pytest.fixture
+def member(app, admin):
+    member = make_member(1)
+    db.session.commit()
+    return member
+
+
+def test_monthly_payment():
+    assert round(monthly_payment(10000, 5.0, 12), 2) == 856.07
+    assert monthly_payment(1200, 0.0, 6) == 200
+    with pytest.raises(ValueError):
+        monthly_payment(1000, 5.0, 0)
+
+
+def test_schedule_repays_principal():
+    schedules = amortize(*LOANS, use_numpy=False)
+
+    for index, (principal, _, months) in enumerate(zip(*LOANS)):
+        rows = schedules.rows(index)
+        assert [row[0] for row in rows] == list(range(1, months + 1))
+        assert sum(row[2] for row in rows) == pytest.approx(principal)
+        assert rows[-1][4] == 0
+        # Level payments, interest on the remaining balance
+        for number, payment, paid, interest, balance in rows:
+            assert payment == pytest.approx(schedules.monthly_payment[index])
+            assert payment == pytest.approx(paid + interest)
+
+    first = schedules.rows(0)[0]
+    assert round(first[3], 2) == round(10000 * 0.05 / 12, 2)
+    assert schedules.totals(2)['total_interest'] == 0
+
+
+def test_numpy_matches_python():
+    fast = amortize(*LOANS, use_numpy=True)
+    slow = amortize(*LOANS, use_numpy=False)
+
+    for index in range(len(LOANS[0])):
+        for fast_row, slow_row in zip(fast.rows(index), slow.rows(index)):
+            assert fast_row == pytest.approx(slow_row, abs=1e-6)
+        # Months past the term are zero
+        assert fast.payment[index][LOANS[2][index]:].sum() == 0
+
+
+def test_loan_schedule_endpoint(client, member):
+    loan = make_loan(member, status=LoanStatus.PENDING, principal=12000, duration_months=12,
+                     approved_at=datetime(2024, 1, 31))
+    db.session.commit()
+    loan.status = LoanStatus.APPROVED
+    generate_schedule(loan, paid_amount=monthly_payment(12000, 5.0, 12))
+    db.session.commit()
+
+    response = client.get(f'/api/loans/{loan.id}/schedule', headers=auth_headers(member))
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['monthly_payment'] == 1027.29
+    assert data['total_interest'] == pytest.approx(327.48, abs=0.02)
+    assert len(data['schedule']) == 12
+    assert data['schedule'][0]['due_date'].startswith('2024-02-29')
+    assert data['schedule'][0]['interest'] == 50.0
+    assert data['schedule'][-1]['balance'] == 0
+    assert [row['status'] for row in data['schedule'][:2]] == ['paid', 'due']
+
+    other = make_member(2)
+    db.session.commit()
+    response = client.get(f'/api/loans/{loan.id}/schedule', headers=auth_headers(other))
+    assert response.status_code == 404
+
+
+def test_apply_uses_amortized_payment(client, member):
+    response = client.post('/api/loans/apply', headers=auth_headers(member), json={
+        'principal_amount': 10000, 'duration_months': 12, 'purpose': 'Tuition'
+    })
+    assert response.status_code == 201
+    assert round(response.get_json()['loan']['monthly_payment'], 2) == 856.07
+
+
+def test_admin_schedule_export(client, admin_headers, member):
+    make_loan(member, principal=6000, duration_months=6, approved_at=datetime(2024, 3, 15))
+    make_loan(member, status=LoanStatus.ACTIVE, principal=3000, duration_months=3)
+    make_loan(member, status=LoanStatus.PENDING, principal=9000)
+    db.session.commit()
+
+    response = client.get('/api/admin/loans/schedules', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 9
+    assert rows[0]['due_date'] == '2024-04-15'
+    assert sum(float(row['principal']) for row in rows[:6]) == pytest.approx(6000, abs=0.05)
+
+    response = client.get('/api/admin/loans/schedules?status=pending', headers=admin_headers)
+    assert len(response.get_data(as_text=True).splitlines()) == 13
+
+    response = client.get('/api/admin/loans/schedules?status=bogus', headers=admin_headers)
+    assert response.status_code == 400
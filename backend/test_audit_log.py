@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the buffered admin activity writer
+"""
+
+import time
+
+import pytest
+
+from extensions import db
+from admin_models import AdminActivity
+from models import LoanStatus
+from services.audit_log import AuditBuffer
+from conftest import make_member, make_loan, count_queries
+
+
+def test_page_views_write_activity_after_the_read(client, admin_headers):
+    with count_queries() as statements:
+        response = client.get('/api/admin/savings', headers=admin_headers)
+    assert response.status_code == 200
+
+    # The read runs first; the queued entry is written once, at teardown
+    assert statements[-1].startswith('INSERT INTO admin_activities')
+    assert sum(s.startswith('INSERT') for s in statements) == 1
+    assert AdminActivity.query.one().action == 'VIEW_SAVINGS'
+
+
+def test_batches_and_back_pressure(app, admin):
+    buffer = AuditBuffer(app, batch_size=2, max_pending=3, background=False)
+    for i in range(3):
+        buffer.record(admin_id=admin.id, action=f'ACTION_{i}')
+    assert AdminActivity.query.count() == 0
+
+    with count_queries() as statements:
+        buffer.record(admin_id=admin.id, action='ACTION_3')
+    # The full queue was written by the recording caller in two multi-row inserts
+    assert len(statements) == 2
+    assert buffer.backpressure_flushes == 1
+    assert len(buffer) == 1
+
+    buffer.close()
+    assert [a.action for a in AdminActivity.query.order_by(AdminActivity.id)] == [
+        'ACTION_0', 'ACTION_1', 'ACTION_2', 'ACTION_3'
+    ]
+
+
+def unavailable(batch):
+    raise RuntimeError('audit database unavailable')
+
+
+def test_failed_writes_stay_queued_and_do_not_raise(app, admin, monkeypatch):
+    buffer = AuditBuffer(app, batch_size=2, max_pending=3, background=False)
+    write = buffer._write
+    monkeypatch.setattr(buffer, '_write', unavailable)
+    for i in range(3):
+        buffer.record(admin_id=admin.id, action=f'ACTION_{i}')
+    buffer.wake()
+    assert buffer.failed_flushes == 1
+    assert len(buffer) == 3
+
+    monkeypatch.setattr(buffer, '_write', write)
+    buffer.close()
+    assert [a.action for a in AdminActivity.query.order_by(AdminActivity.id)] == [
+        'ACTION_0', 'ACTION_1', 'ACTION_2'
+    ]
+
+
+def test_full_queue_drops_records_while_writes_fail(app, admin, monkeypatch):
+    buffer = AuditBuffer(app, batch_size=2, max_pending=2, background=False)
+    monkeypatch.setattr(buffer, '_write', unavailable)
+    for i in range(5):
+        buffer.record(admin_id=admin.id, action=f'ACTION_{i}')
+    assert (len(buffer), buffer.dropped, buffer.failed_flushes) == (2, 3, 3)
+
+    monkeypatch.undo()
+    buffer.close()
+    assert [a.action for a in AdminActivity.query.order_by(AdminActivity.id)] == ['ACTION_0', 'ACTION_1']
+
+
+def test_committed_action_succeeds_when_audit_write_fails(app, client, admin_headers, monkeypatch):
+    member = make_member(1)
+    db.session.flush()
+    loan = make_loan(member, status=LoanStatus.PENDING)
+    db.session.commit()
+
+    buffer = app.extensions['audit_log']
+    monkeypatch.setattr(buffer, '_write', unavailable)
+    response = client.post(f'/api/admin/loans/{loan.id}/approve', headers=admin_headers)
+    assert response.status_code == 200
+    assert len(buffer) == 1
+
+    # Reading the log tries the write first, but a failure does not fail the read
+    response = client.get('/api/admin/activities', headers=admin_headers)
+    assert response.status_code == 200
+    assert len(buffer) == 1
+    monkeypatch.undo()
+    buffer.flush()
+
+
+def test_background_writer_flushes_on_interval(app, admin):
+    buffer = AuditBuffer(app, flush_interval=0.05, background=True)
+    buffer.record(admin_id=admin.id, action='LOGIN')
+
+    deadline = time.monotonic() + 5
+    while buffer.written < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    buffer.close()
+    assert AdminActivity.query.filter_by(action='LOGIN').count() == 1
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
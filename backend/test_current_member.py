@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the request-scoped current member (user_lookup_loader identity map)
+"""
+
+import pytest
+
+from extensions import db
+from services.current_member import TTLCache
+from conftest import make_member, auth_headers, count_queries
+
+
+@pytest.fixture
+def member(app, admin):
+    admin_id = admin.id
+    member = make_member(1, admin_id=admin_id)
+    db.session.commit()
+    return member
+
+
+def get_profile(client, headers, url='/api/users/profile'):
+    with count_queries() as statements:
+        response = client.get(url, headers=headers)
+    return response, statements
+
+
+def test_member_and_admin_loaded_once(client, member):
+    headers = auth_headers(member)
+    for url in ('/api/users/profile', '/api/auth/profile'):
+        db.session.expunge_all()
+        response, statements = get_profile(client, headers, url)
+        assert response.status_code == 200
+        assert response.get_json()['user']['created_by']['username'] == 'testadmin'
+        assert len(statements) == 2
+
+
+def test_profile_update_reuses_the_admin_lookup(client, member):
+    headers = auth_headers(member)
+    db.session.expunge_all()
+    with count_queries() as statements:
+        response = client.put('/api/users/profile', headers=headers, json={'first_name': 'Renamed'})
+    assert response.get_json()['user']['first_name'] == 'Renamed'
+    assert sum('FROM admins' in statement for statement in statements) == 1
+
+
+def test_identity_cache_skips_admin_lookup_across_requests(app, client, member):
+    app.extensions['identity_cache'] = TTLCache(ttl=60)
+    headers = auth_headers(member)
+    get_profile(client, headers)
+
+    db.session.expunge_all()
+    response, statements = get_profile(client, headers)
+    assert response.get_json()['user']['created_by']['username'] == 'testadmin'
+    assert len(statements) == 1
+
+
+def test_deleted_member_gets_404(client, member):
+    headers = auth_headers(member)
+    db.session.delete(member)
+    db.session.commit()
+    assert client.get('/api/users/profile', headers=headers).status_code == 404
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(ttl=-1)
+    cache.set('key', 'value')
+    assert cache.get('key') is None
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-member dashboard snapshot cache
+"""
+
+import pytest
+
+from extensions import db
+from models import LoanStatus
+from conftest import make_member, make_loan, auth_headers, count_queries
+
+
+@pytest.fixture
+def member(app, admin):
+    member = make_member(1)
+    db.session.flush()
+    make_loan(member, status=LoanStatus.ACTIVE, principal=12000, monthly_payment=1000)
+    db.session.commit()
+    return member
+
+
+def dashboard(client, headers):
+    with count_queries() as statements:
+        data = client.get('/api/users/dashboard', headers=headers).get_json()
+    return data, len(statements)
+
+
+def test_repeat_loads_only_check_the_version(client, member):
+    headers = auth_headers(member)
+    first, _ = dashboard(client, headers)
+    second, queries = dashboard(client, headers)
+    assert second == first
+    assert queries == 1
+
+
+def test_member_writes_refresh_the_snapshot(client, member):
+    headers = auth_headers(member)
+    loan_id = dashboard(client, headers)[0]['active_loans'][0]['id']
+
+    response = client.post('/api/payments/make', headers=headers,
+                           json={'loan_id': loan_id, 'amount': 2000})
+    assert response.status_code == 201
+    data, _ = dashboard(client, headers)
+    assert data['total_remaining_balance'] == 10000
+    assert data['recent_transactions'][0]['transaction_type'] == 'loan_payment'
+
+    client.post('/api/savings/deposit', headers=headers, json={'amount': 500})
+    data, _ = dashboard(client, headers)
+    assert data['recent_transactions'][0]['transaction_type'] == 'savings'
+
+
+def test_other_members_snapshots_survive_a_write(client, app, member):
+    other = make_member(2)
+    db.session.commit()
+    dashboard(client, auth_headers(other))
+
+    client.post('/api/savings/deposit', headers=auth_headers(member), json={'amount': 500})
+    assert dashboard(client, auth_headers(other))[1] == 1
+
+
+def test_snapshots_are_capped(client, app, member):
+    snapshots = app.extensions['dashboard_snapshots']
+    snapshots.maxsize = 2
+    others = [make_member(i) for i in range(2, 5)]
+    db.session.commit()
+
+    for user in [member, *others]:
+        dashboard(client, auth_headers(user))
+    assert len(snapshots) == 2
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for the checkpointed delinquency run
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from admin_models import AdminActivity
+from models import Loan, JobCheckpoint, MemberRollup, LoanStatus
+from services import delinquency
+from services.delinquency import run_delinquency
+from services.installments import generate_schedule
+from services.portfolio_snapshots import take_snapshot
+from conftest import make_member, make_loan, auth_headers
+
+
+@pytest.fixture
+def loans(app, admin):
+    now = datetime.utcnow()
+    member = make_member(1)
+    db.session.flush()
+    for days_late, status in ((None, LoanStatus.APPROVED), (10, LoanStatus.APPROVED), (45, LoanStatus.ACTIVE),
+                              (75, LoanStatus.ACTIVE), (120, LoanStatus.APPROVED), (200, LoanStatus.COMPLETED)):
+        make_loan(member, status=status, due_date=now - timedelta(days=days_late) if days_late else None)
+    db.session.commit()
+    return member
+
+
+@pytest.fixture
+def defaulted(loans):
+    """The loan 120 days late, with a schedule, after a run has defaulted it"""
+    late = Loan.query.filter_by(status=LoanStatus.APPROVED).order_by(Loan.id.desc()).first()
+    late.approved_at = datetime.utcnow() - timedelta(days=150)
+    generate_schedule(late)
+    db.session.commit()
+    run_delinquency()
+    return late
+
+
+def buckets():
+    return [(loan.delinquency_bucket, loan.status) for loan in Loan.query.order_by(Loan.id)]
+
+
+def test_run_buckets_and_defaults(loans):
+    stats = run_delinquency(chunk_size=2)
+
+    assert buckets() == [
+        ('current', LoanStatus.APPROVED), ('1-30', LoanStatus.APPROVED), ('31-60', LoanStatus.ACTIVE),
+        ('61-90', LoanStatus.ACTIVE), ('90+', LoanStatus.DEFAULTED), (None, LoanStatus.COMPLETED)
+    ]
+    assert stats['loans'] == 5 and stats['defaulted'] == 1
+    rollup = db.session.get(MemberRollup, loans.id)
+    assert (rollup.approved_loans, rollup.defaulted_loans) == (2, 1)
+
+    activity = AdminActivity.query.filter_by(action='DELINQUENCY_RUN').one()
+    assert 'moved 1 loans over 90 days past due to defaulted' in activity.description
+
+
+def test_interrupted_run_resumes_from_checkpoint(loans, monkeypatch):
+    real_chunk = delinquency._process_chunk
+    calls = []
+
+    def failing_chunk(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError('worker killed')
+        return real_chunk(*args)
+
+    monkeypatch.setattr(delinquency, '_process_chunk', failing_chunk)
+    with pytest.raises(RuntimeError):
+        run_delinquency(chunk_size=2, default_after_days=60)
+    db.session.rollback()
+    monkeypatch.undo()
+
+    checkpoint = db.session.get(JobCheckpoint, 'delinquency')
+    assert checkpoint.completed_at is None
+    assert checkpoint.last_id == Loan.query.order_by(Loan.id).all()[1].id
+
+    # The resumed run keeps the interrupted run's threshold and counters
+    stats = run_delinquency(chunk_size=2)
+    assert stats['loans'] == 5
+    assert stats['defaulted'] == 2
+    assert db.session.get(JobCheckpoint, 'delinquency').completed_at is not None
+
+
+def test_overdue_listing_includes_approved_loans(client, admin_headers, loans):
+    loan = Loan.query.filter_by(status=LoanStatus.APPROVED).order_by(Loan.id).first()
+    loan.approved_at = datetime.utcnow() - timedelta(days=40)
+    generate_schedule(loan)
+    db.session.commit()
+
+    overdue = client.get('/api/admin/loans/overdue', headers=admin_headers).get_json()['overdue_loans']
+    assert [row['id'] for row in overdue] == [loan.id]
+
+
+
+def test_defaulted_loans_stay_in_the_overdue_listing(client, admin_headers, defaulted):
+    overdue = client.get('/api/admin/loans/overdue', headers=admin_headers).get_json()['overdue_loans']
+    assert [(row['id'], row['status'], row['delinquency_bucket']) for row in overdue] == [
+        (defaulted.id, 'defaulted', '90+')
+    ]
+
+
+def test_defaulted_loans_are_still_owed(client, loans, defaulted):
+    # Four open loans and the defaulted one, 10000 each
+    snapshot = take_snapshot()
+    assert (snapshot.outstanding, snapshot.par90, snapshot.defaulted_loans) == (50000, 10000, 1)
+    assert db.session.get(MemberRollup, loans.id).outstanding_balance == 50000
+
+    dashboard = client.get('/api/users/dashboard', headers=auth_headers(loans)).get_json()
+    assert dashboard['total_remaining_balance'] == 50000
+    assert defaulted.id in [loan['id'] for loan in dashboard['active_loans']]
+    assert [loan['loan_id'] for loan in dashboard['overdue_loans']] == [defaulted.id]
+
+
+def test_defaulted_member_cannot_borrow(client, loans, defaulted):
+    headers = auth_headers(loans)
+    eligibility = client.get('/api/loans/eligibility', headers=headers).get_json()
+    assert eligibility['eligible'] is False
+
+    response = client.post('/api/loans/apply', headers=headers, json={
+        'principal_amount': 1000, 'duration_months': 6, 'purpose': 'Repairs'
+    })
+    assert response.status_code == 400
+    assert response.get_json()['message'] == eligibility['message']
+
+    # Paying the defaulted loan off lifts the block
+    client.post('/api/payments/make', headers=headers, json={'loan_id': defaulted.id, 'amount': 10000})
+    assert db.session.get(MemberRollup, loans.id).defaulted_loans == 0
+
+
+def test_settled_loans_lose_their_bucket(loans):
+    run_delinquency()
+    paid, stale = Loan.query.filter_by(status=LoanStatus.ACTIVE).order_by(Loan.id).all()
+
+    paid.status = LoanStatus.COMPLETED
+    db.session.commit()
+    assert paid.delinquency_bucket is None
+
+    # Bulk status changes skip the attribute event; the next run clears them
+    Loan.query.filter_by(id=stale.id).update({Loan.status: LoanStatus.COMPLETED})
+    db.session.commit()
+    run_delinquency()
+    db.session.expire_all()
+    assert db.session.get(Loan, stale.id).delinquency_bucket is None
+    assert db.session.query(Loan.delinquency_bucket).filter(Loan.status == LoanStatus.DEFAULTED).scalar() == '90+'
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
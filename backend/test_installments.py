@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for loan installment schedules, payment allocation and overdue lookups
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import Loan, Installment, LoanStatus
+from services.installments import add_months, generate_schedule, backfill_schedules, overdue_by_loan
+from conftest import make_member, make_loan, auth_headers
+
+
+@pytest.fixture
+def member(app, admin):
+    member = make_member(1)
+    db.session.commit()
+    return member
+
+
+def schedule(loan_id):
+    return Installment.query.filter_by(loan_id=loan_id).order_by(Installment.number).all()
+
+
+def test_approval_generates_schedule(client, admin_headers, member):
+    loan = make_loan(member, status=LoanStatus.PENDING, principal=1000, duration_months=3,
+                     monthly_payment=333.337)
+    db.session.commit()
+
+    response = client.post(f'/api/admin/loans/{loan.id}/approve', headers=admin_headers)
+    assert response.status_code == 200
+
+    loan = db.session.get(Loan, loan.id)
+    installments = schedule(loan.id)
+    assert [i.number for i in installments] == [1, 2, 3]
+    assert [i.amount_due for i in installments] == [333.34, 333.34, 333.33]
+    assert installments[0].due_date == add_months(loan.approved_at, 1)
+    assert loan.due_date == installments[0].due_date
+
+
+def test_payments_are_allocated_oldest_first(client, member):
+    loan = make_loan(member, principal=3000, duration_months=3, monthly_payment=1000,
+                     approved_at=datetime.utcnow() - timedelta(days=70))
+    generate_schedule(loan)
+    db.session.commit()
+    headers = auth_headers(member)
+
+    overdue = client.get('/api/users/dashboard', headers=headers).get_json()['overdue_loans']
+    assert overdue[0]['amount_overdue'] == 2000
+    assert overdue[0]['days_overdue'] >= 39
+
+    client.post('/api/payments/make', headers=headers, json={'loan_id': loan.id, 'amount': 1500})
+    installments = schedule(loan.id)
+    assert [(i.status, i.amount_paid) for i in installments] == [('paid', 1000), ('due', 500), ('due', 0)]
+    assert db.session.get(Loan, loan.id).due_date == installments[1].due_date
+
+    overdue = client.get('/api/users/dashboard', headers=headers).get_json()['overdue_loans']
+    assert overdue[0]['amount_overdue'] == 500
+
+    client.post('/api/payments/make', headers=headers, json={'loan_id': loan.id, 'amount': 1500})
+    assert [(i.status, i.amount_paid) for i in schedule(loan.id)] == [('paid', 1000), ('paid', 1000), ('paid', 1000)]
+    assert overdue_by_loan(datetime.utcnow(), user_id=member.id) == {}
+
+
+def test_payoff_credits_installments_before_closing(client, member):
+    loan = make_loan(member, principal=3000, duration_months=3, monthly_payment=1000,
+                     remaining_balance=1200, approved_at=datetime.utcnow() - timedelta(days=10))
+    generate_schedule(loan)
+    db.session.commit()
+    headers = auth_headers(member)
+
+    client.post('/api/payments/make', headers=headers, json={'loan_id': loan.id, 'amount': 1200})
+    assert [(i.status, i.amount_paid) for i in schedule(loan.id)] == [('paid', 1000), ('closed', 200), ('closed', 0)]
+    loan = db.session.get(Loan, loan.id)
+    assert (loan.status, loan.due_date) == (LoanStatus.COMPLETED, None)
+
+    rows = client.get(f'/api/loans/{loan.id}/schedule', headers=headers).get_json()['schedule']
+    assert [row['status'] for row in rows] == ['paid', 'closed', 'closed']
+
+
+def test_backfill_allocates_repaid_principal(member):
+    loan = make_loan(member, principal=1200, duration_months=12, monthly_payment=100,
+                     remaining_balance=950, approved_at=datetime(2024, 1, 31))
+    db.session.commit()
+
+    assert backfill_schedules() == 1
+    installments = schedule(loan.id)
+    assert installments[0].due_date == datetime(2024, 2, 29)
+    assert [i.amount_paid for i in installments[:4]] == [100, 100, 50, 0]
+    assert loan.due_date == installments[2].due_date
+    assert backfill_schedules() == 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the chunked, resumable `flask jobs` runner
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import User, JobCheckpoint, Installment
+from services.jobs import JOBS, run_job
+from conftest import make_member, make_loan
+
+
+@pytest.fixture
+def members(app):
+    members = [make_member(i, capital_share=share) for i, share in enumerate((5000, 25000, 19999, 20000, 100))]
+    for member in members:
+        # Stale statuses, as left behind by direct capital share edits
+        member.member_status, member.loan_eligibility = 'REGULAR MEMBER', True
+    db.session.commit()
+    return members
+
+
+def statuses():
+    return [user.member_status for user in User.query.order_by(User.id)]
+
+
+def test_membership_job_commits_in_chunks(app, members):
+    stats = run_job('membership', chunk_size=2)
+    assert stats == {'rows': 5, 'changed': 3}
+    assert statuses() == ['MEMBER', 'REGULAR MEMBER', 'MEMBER', 'REGULAR MEMBER', 'MEMBER']
+
+    checkpoint = db.session.get(JobCheckpoint, 'job:membership')
+    assert checkpoint.last_id == members[-1].id
+    assert checkpoint.completed_at is not None
+
+
+def test_interrupted_job_resumes_after_last_chunk(app, members, monkeypatch):
+    job = JOBS['membership']
+    real_process = job.process
+    calls = []
+
+    def failing_process(ids):
+        calls.append(ids)
+        if len(calls) == 2:
+            raise RuntimeError('worker killed')
+        return real_process(ids)
+
+    monkeypatch.setattr(job, 'process', failing_process)
+    with pytest.raises(RuntimeError):
+        run_job('membership', chunk_size=2)
+    db.session.rollback()
+    monkeypatch.undo()
+
+    assert db.session.get(JobCheckpoint, 'job:membership').last_id == members[1].id
+    assert statuses()[2:] == ['REGULAR MEMBER'] * 3
+
+    assert run_job('membership', chunk_size=2) == {'rows': 5, 'changed': 3}
+    assert statuses()[2:] == ['MEMBER', 'REGULAR MEMBER', 'MEMBER']
+
+
+def test_cli_runs_loan_schedule_backfill(app, members):
+    loan = make_loan(members[0], approved_at=datetime.utcnow() - timedelta(days=40))
+    make_loan(members[1])
+    db.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['jobs', 'run', 'loan-schedules'])
+    assert 'processed 1 rows' in result.output
+    assert Installment.query.filter_by(loan_id=loan.id).count() == 12
+
+    assert 'completed' in runner.invoke(args=['jobs', 'list']).output
+    assert runner.invoke(args=['jobs', 'run', 'bogus']).exit_code != 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
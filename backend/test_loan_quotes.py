@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the loan quote grid endpoint and its rate table memoization
+"""
+
+import pytest
+
+from extensions import db
+from services.amortization import monthly_payment
+from conftest import make_member, make_loan, auth_headers
+
+
+@pytest.fixture
+def member(app, admin):
+    member = make_member(1)
+    db.session.commit()
+    return member
+
+
+def quote(client, member, **grid):
+    return client.post('/api/loans/quote', headers=auth_headers(member), json=grid)
+
+
+def test_quote_grid(client, member):
+    response = quote(client, member, principals=[10000, 20000], durations=[6, 12, 24],
+                     loan_types=['personal', 'business'])
+    assert response.status_code == 200
+    data = response.get_json()
+
+    quotes = data['quotes']
+    assert len(quotes) == 12
+    assert all(cell['eligible'] for cell in quotes)
+    cell = next(cell for cell in quotes
+                if (cell['principal_amount'], cell['duration_months'], cell['loan_type']) == (10000, 12, 'business'))
+    assert cell['monthly_payment'] == 856.07
+    assert cell['total_payment'] == pytest.approx(10272.9, abs=0.01)
+    assert cell['total_interest'] == pytest.approx(272.9, abs=0.01)
+
+
+def test_repeated_grid_is_memoized(app, client, member, monkeypatch):
+    grid = {'principals': [5000, 15000], 'durations': [12]}
+    first = quote(client, member, **grid).get_json()
+    second = quote(client, member, **grid).get_json()
+    assert (first['cached'], second['cached']) == (False, True)
+    assert first['quotes'] == second['quotes']
+
+    # A new rate table version prices the grid again
+    monkeypatch.setitem(app.config, 'LOAN_RATES', 'personal=12')
+    third = quote(client, member, **grid).get_json()
+    assert third['cached'] is False
+    assert third['rate_table_version'] != first['rate_table_version']
+    assert third['quotes'][0]['monthly_payment'] == round(monthly_payment(5000, 12.0, 12), 2)
+
+
+def test_quote_eligibility_verdicts(client, member):
+    make_loan(member, principal=10000, remaining_balance=8000)
+    db.session.commit()
+    quotes = quote(client, member, principals=[1000], durations=[6, 12]).get_json()['quotes']
+    assert [cell['eligible'] for cell in quotes] == [False, False]
+    assert 'Current payment: 20.0%' in quotes[0]['reason']
+
+    poor = make_member(2, capital_share=1000.0)
+    db.session.commit()
+    quotes = quote(client, poor, principals=[1000], durations=[6]).get_json()['quotes']
+    assert quotes[0]['eligible'] is False
+    assert 'Minimum capital share' in quotes[0]['reason']
+
+
+def test_invalid_quote_requests(client, member):
+    assert quote(client, member, principals=[1000], durations=[0]).status_code == 400
+    assert quote(client, member, principals=[-5], durations=[12]).status_code == 400
+    assert quote(client, member, principals=[1000], durations=[12], loan_types=['yacht']).status_code == 400
+    assert quote(client, member, principals=[], durations=[12]).status_code == 400
+    assert quote(client, member, principals=list(range(1, 101)), durations=list(range(1, 12))).status_code == 400
+
+
+def test_apply_uses_rate_table(app, client, member, monkeypatch):
+    monkeypatch.setitem(app.config, 'LOAN_RATES', 'emergency=3')
+    response = client.post('/api/loans/apply', headers=auth_headers(member), json={
+        'principal_amount': 6000, 'duration_months': 6, 'purpose': 'Hospital', 'loan_type': 'emergency'
+    })
+    loan = response.get_json()['loan']
+    assert loan['interest_rate'] == 3.0
+    assert loan['monthly_payment'] == pytest.approx(monthly_payment(6000, 3.0, 6))
+
+
+def test_apply_and_quote_share_eligibility(app, client, member, monkeypatch):
+    monkeypatch.setitem(app.config, 'MEMBERSHIP_REGULAR_THRESHOLD', 50000.0)
+    poor = make_member(2, capital_share=30000.0)
+    poor.loan_eligibility = False
+    db.session.commit()
+    application = {'principal_amount': 1000, 'duration_months': 6, 'purpose': 'Repairs'}
+
+    response = client.post('/api/loans/apply', headers=auth_headers(poor), json=application)
+    assert response.status_code == 400
+    assert response.get_json()['message'].endswith('Minimum capital share of 50,000 PHP required.')
+    quoted = quote(client, poor, principals=[1000], durations=[6]).get_json()['quotes'][0]
+    assert quoted['reason'] == response.get_json()['message']
+
+    make_loan(member, principal=10000, remaining_balance=8000)
+    db.session.commit()
+    response = client.post('/api/loans/apply', headers=auth_headers(member), json=application)
+    assert response.status_code == 400
+    quoted = quote(client, member, principals=[1000], durations=[6]).get_json()['quotes'][0]
+    assert quoted['reason'] == response.get_json()['message']
+
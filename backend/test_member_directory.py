@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the aggregated admin member directory (/api/admin/users)
+"""
+
+import pytest
+
+from extensions import db
+from models import LoanStatus
+from conftest import make_member, make_loan, count_queries
+
+
+@pytest.fixture
+def members(app, admin):
+    small, big, none = make_member(1, admin_id=admin.id), make_member(2), make_member(3, capital_share=500)
+    db.session.flush()
+    make_loan(small, principal=5000)
+    make_loan(big, principal=50000, status=LoanStatus.ACTIVE)
+    make_loan(big, principal=20000, status=LoanStatus.COMPLETED)
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def test_totals_are_aggregated_per_member(client, admin_headers, members):
+    users = client.get('/api/admin/users?sort_by=total_borrowed', headers=admin_headers).get_json()['users']
+
+    assert [u['email'] for u in users] == [
+        'member2@example.com', 'member1@example.com', 'member3@example.com'
+    ]
+    assert users[0]['loan_count'] == 2
+    assert users[0]['active_loans'] == 1
+    assert users[0]['total_borrowed'] == 70000
+    assert users[2]['loan_count'] == 0
+    assert users[2]['total_borrowed'] == 0
+    assert users[1]['created_by']['username'] == 'testadmin'
+
+
+def test_filters_on_aggregates(client, admin_headers, members):
+    response = client.get('/api/admin/users?min_borrowed=10000', headers=admin_headers).get_json()
+    assert response['total'] == 1
+    assert response['users'][0]['email'] == 'member2@example.com'
+
+    response = client.get('/api/admin/users?has_active_loans=false&min_loans=1', headers=admin_headers).get_json()
+    assert [u['email'] for u in response['users']] == ['member1@example.com']
+
+    response = client.get('/api/admin/users?search=member3', headers=admin_headers).get_json()
+    assert response['total'] == 1
+
+
+def test_invalid_sort_field_is_rejected(client, admin_headers, members):
+    response = client.get('/api/admin/users?sort_by=password_hash', headers=admin_headers)
+    assert response.status_code == 400
+
+
+def test_member_directory_has_fixed_query_budget(client, admin_headers, members):
+    with count_queries() as statements:
+        response = client.get('/api/admin/users?per_page=100', headers=admin_headers)
+    assert response.status_code == 200
+    # count + page + created_by admins
+    assert len(statements) == 3
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
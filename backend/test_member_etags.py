@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for conditional GETs (ETag / 304) on member read endpoints
+"""
+
+import pytest
+
+from extensions import db
+from models import Loan, Saving, Payment, LoanStatus
+from conftest import make_member, make_loan, auth_headers, count_queries
+
+ENDPOINTS = ['/api/loans/', '/api/payments/', '/api/payments/history',
+             '/api/savings/', '/api/users/dashboard']
+
+
+@pytest.fixture
+def members(app, admin):
+    alice, bob = make_member(1), make_member(2)
+    db.session.flush()
+    make_loan(alice, status=LoanStatus.ACTIVE)
+    db.session.commit()
+    return alice, bob
+
+
+def etags(client, headers):
+    return {url: client.get(url, headers=headers).headers['ETag'] for url in ENDPOINTS}
+
+
+def test_unchanged_data_answers_304_with_one_query(client, members):
+    alice, _ = members
+    headers = auth_headers(alice)
+
+    for url, etag in etags(client, headers).items():
+        with count_queries() as statements:
+            response = client.get(url, headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert len(statements) == 1
+
+
+def test_member_writes_change_only_that_members_etag(client, members):
+    alice, bob = members
+    alice_before = etags(client, auth_headers(alice))
+    bob_before = etags(client, auth_headers(bob))
+
+    db.session.add(Saving(user_id=alice.id, amount=500, balance=500))
+    db.session.commit()
+
+    alice_after = etags(client, auth_headers(alice))
+    assert all(alice_after[url] != alice_before[url] for url in ENDPOINTS)
+    assert etags(client, auth_headers(bob)) == bob_before
+
+    loan = Loan.query.filter_by(user_id=alice.id).one()
+    db.session.add(Payment(user_id=alice.id, loan_id=loan.id, amount=100))
+    db.session.commit()
+    assert etags(client, auth_headers(alice)) != alice_after
+
+
+def test_bulk_updates_change_every_etag(client, members):
+    alice, bob = members
+    alice_before = etags(client, auth_headers(alice))
+    bob_before = etags(client, auth_headers(bob))
+
+    Loan.query.update({Loan.remaining_balance: 0})
+    db.session.commit()
+
+    assert etags(client, auth_headers(alice))['/api/loans/'] != alice_before['/api/loans/']
+    assert etags(client, auth_headers(bob))['/api/loans/'] != bob_before['/api/loans/']
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the maintained per-member rollups and their readers
+"""
+
+from datetime import datetime
+
+import pytest
+
+from extensions import db
+from models import MemberRollup, Penalty, LoanStatus
+from services import member_rollups as rollups_module
+from services.member_rollups import get_rollup, rebuild_rollups
+from services.savings_accounts import record_movement
+from conftest import make_member, make_loan, auth_headers
+
+
+@pytest.fixture
+def member(app, admin):
+    member = make_member(1)
+    db.session.commit()
+    return member
+
+
+def test_rollup_follows_each_write(client, member):
+    loan = make_loan(member, principal=10000, remaining_balance=10000)
+    make_loan(member, status=LoanStatus.ACTIVE, principal=4000)
+    record_movement(member.id, 1500)
+    db.session.commit()
+
+    rollup = get_rollup(member.id)
+    assert (rollup.loan_count, rollup.active_loans, rollup.approved_loans) == (2, 1, 1)
+    assert rollup.total_borrowed == 14000
+    assert rollup.savings_balance == 1500
+    assert rollup.least_repaid_percentage == 0
+
+    response = client.post('/api/payments/make', json={'loan_id': loan.id, 'amount': 6000},
+                           headers=auth_headers(member))
+    assert response.status_code == 201
+    db.session.add(Penalty(user_id=member.id, loan_id=loan.id, amount=120, penalty_date=datetime.utcnow(),
+                           due_date=datetime.utcnow(), days_overdue=5))
+    db.session.commit()
+
+    rollup = get_rollup(member.id)
+    db.session.refresh(rollup)
+    assert rollup.total_paid == 6000
+    assert rollup.outstanding_balance == 8000
+    assert rollup.least_repaid_percentage == 60
+    assert rollup.unpaid_penalties == 120
+
+
+def test_bulk_writes_and_rebuild(app, member):
+    make_loan(member, principal=5000)
+    db.session.commit()
+    from models import Loan
+    Loan.query.filter_by(user_id=member.id).update({Loan.status: LoanStatus.COMPLETED})
+    db.session.commit()
+    assert db.session.get(MemberRollup, member.id).approved_loans == 0
+
+    db.session.get(MemberRollup, member.id).total_borrowed = 1
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=['rollups', 'rebuild'])
+    assert 'Rebuilt' in result.output
+    db.session.expire_all()
+    assert db.session.get(MemberRollup, member.id).total_borrowed == 5000
+
+
+def test_bulk_write_refreshes_only_its_members(app, member, monkeypatch):
+    from models import Loan, Saving
+    other = make_member(2)
+    db.session.commit()
+    loan = make_loan(member, principal=5000)
+    make_loan(other, principal=7000)
+    db.session.commit()
+
+    refreshed = []
+    refresh = rollups_module.refresh_rollups
+
+    def spy(connection, user_ids=None):
+        refreshed.append(None if user_ids is None else set(user_ids))
+        return refresh(connection, user_ids)
+
+    monkeypatch.setattr(rollups_module, 'refresh_rollups', spy)
+    Saving.query.filter_by(user_id=member.id).delete()
+    Loan.query.filter_by(id=loan.id).update({Loan.user_id: other.id})
+    db.session.commit()
+
+    assert None not in refreshed
+    assert set().union(*refreshed) == {member.id, other.id}
+    assert db.session.get(MemberRollup, member.id).loan_count == 0
+    assert db.session.get(MemberRollup, other.id).total_borrowed == 12000
+
+
+def test_deleting_a_member_refreshes_only_them(client, admin_headers, member, monkeypatch):
+    other = make_member(2)
+    record_movement(member.id, 800)
+    db.session.commit()
+
+    refreshed = []
+    refresh = rollups_module.refresh_rollups
+    monkeypatch.setattr(rollups_module, 'refresh_rollups',
+                        lambda connection, user_ids=None: refreshed.append(user_ids) or refresh(connection, user_ids))
+    response = client.delete(f'/api/admin/users/{member.id}', json={'reason': 'left'}, headers=admin_headers)
+    assert response.status_code == 200
+
+    assert None not in refreshed
+    assert db.session.get(MemberRollup, member.id) is None
+    assert db.session.get(MemberRollup, other.id) is not None
+
+
+def test_eligibility_reads_the_rollup(client, member):
+    headers = auth_headers(member)
+    assert client.get('/api/loans/eligibility', headers=headers).get_json()['eligible'] is True
+
+    make_loan(member, principal=10000, remaining_balance=7000)
+    db.session.commit()
+    data = client.get('/api/loans/eligibility', headers=headers).get_json()
+    assert data['eligible'] is False
+    assert data['payment_percentage'] == 30
+
+
+def test_member_directory_exposes_rollup_totals(client, admin_headers, member):
+    record_movement(member.id, 800)
+    db.session.commit()
+    users = client.get('/api/admin/users?sort_by=savings_balance', headers=admin_headers).get_json()['users']
+    assert users[0]['savings_balance'] == 800
+    assert users[0]['total_paid'] == 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests for the set-based membership recomputation
+"""
+
+import pytest
+
+from extensions import db
+from models import User
+from services.membership import recompute_membership
+from conftest import make_member, count_queries
+
+
+@pytest.fixture
+def members(app):
+    members = [make_member(i, capital_share=share) for i, share in enumerate((5000, 25000, 30000))]
+    db.session.commit()
+    return members
+
+
+def test_threshold_change_is_one_update(app, members):
+    assert recompute_membership() == {'changed': 0, 'regular_members': 0, 'members': 0}
+
+    app.config['MEMBERSHIP_REGULAR_THRESHOLD'] = 28000
+    with count_queries() as statements:
+        result = recompute_membership()
+    db.session.commit()
+
+    assert result == {'changed': 1, 'regular_members': 0, 'members': 1}
+    assert sum(s.startswith('UPDATE users') for s in statements) == 1
+    assert [(u.member_status, u.loan_eligibility) for u in User.query.order_by(User.id)] == [
+        ('MEMBER', False), ('MEMBER', False), ('REGULAR MEMBER', True)
+    ]
+
+
+def test_admin_capital_share_edit_uses_the_same_rule(client, admin_headers, members):
+    response = client.put(f'/api/admin/users/{members[0].id}', headers=admin_headers,
+                          json={'capital_share': 21000})
+    assert response.status_code == 200
+    user = response.get_json()['user']
+    assert (user['member_status'], user['loan_eligibility']) == ('REGULAR MEMBER', True)
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the scheduled penalty accrual engine
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import Penalty, MemberRollup, LoanStatus
+from services.penalties import accrue_penalties, periods_due
+from conftest import make_member, make_loan, auth_headers
+
+
+@pytest.fixture
+def loans(app, admin):
+    now = datetime.utcnow()
+    member, other = make_member(1), make_member(2)
+    db.session.flush()
+    late = make_loan(member, status=LoanStatus.ACTIVE, monthly_payment=1000, due_date=now - timedelta(days=65))
+    make_loan(other, monthly_payment=2000, due_date=now - timedelta(days=3))
+    make_loan(other, monthly_payment=2000, due_date=now + timedelta(days=3))
+    make_loan(other, status=LoanStatus.COMPLETED, due_date=now - timedelta(days=90))
+    db.session.commit()
+    return member, other, late
+
+
+def test_periods_due(loans):
+    member, other, late = loans
+    now = datetime.utcnow()
+    assert periods_due(late.due_date, now) == 3
+    assert periods_due(now - timedelta(days=1), now) == 1
+    assert periods_due(now, now) == 0
+
+
+def test_accrual_is_idempotent_across_chunks(loans):
+    member, other, late = loans
+    totals = accrue_penalties(chunk_size=1)
+    assert totals == {'loans': 2, 'penalties': 4}
+
+    rows = Penalty.query.filter_by(loan_id=late.id).order_by(Penalty.period).all()
+    assert [(p.period, p.days_overdue, p.amount) for p in rows] == [(1, 1, 50), (2, 30, 50), (3, 60, 50)]
+    assert db.session.get(MemberRollup, other.id).unpaid_penalties == 100
+
+    assert accrue_penalties()['penalties'] == 0
+    assert Penalty.query.count() == 4
+
+
+def test_defaulted_loans_keep_accruing(loans):
+    member, other, late = loans
+    accrue_penalties(as_of=datetime.utcnow() - timedelta(days=31))
+    assert Penalty.query.filter_by(loan_id=late.id).count() == 2
+    late.status = LoanStatus.DEFAULTED
+    db.session.commit()
+
+    accrue_penalties()
+    assert Penalty.query.filter_by(loan_id=late.id).count() == 3
+
+
+def test_dashboard_reads_accrued_penalties(client, loans):
+    member, other, late = loans
+    headers = auth_headers(member)
+    assert client.get('/api/users/dashboard', headers=headers).get_json()['total_penalties'] == 0
+
+    result = client.application.test_cli_runner().invoke(args=['penalties', 'accrue'])
+    assert 'Accrued 4 penalties across 2 overdue loans' in result.output
+
+    data = client.get('/api/users/dashboard', headers=headers).get_json()
+    assert data['total_penalties'] == 150
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the daily portfolio snapshot job and the trend endpoints
+"""
+
+from datetime import datetime, timedelta, date
+
+import pytest
+
+from extensions import db
+from models import PortfolioSnapshot, Payment, LoanStatus
+from services.installments import generate_schedule
+from services.portfolio_snapshots import take_snapshot
+from conftest import make_member, make_loan, count_queries
+
+
+@pytest.fixture
+def portfolio(app, admin):
+    now = datetime.utcnow()
+    members = [make_member(i) for i in range(4)]
+    db.session.flush()
+    # Oldest open installment about 10, 45 and 100 days late, plus one loan that is current
+    for member, days_late, balance in zip(members, (10, 45, 100, -20), (1000, 2000, 4000, 8000)):
+        loan = make_loan(member, status=LoanStatus.ACTIVE, principal=balance, remaining_balance=balance,
+                         approved_at=now - timedelta(days=30 + days_late))
+        generate_schedule(loan)
+    make_loan(members[0], status=LoanStatus.PENDING)
+    db.session.flush()
+    db.session.add(Payment(user_id=members[3].id, loan_id=loan.id, amount=500))
+    db.session.commit()
+
+
+def test_snapshot_totals_and_par(portfolio):
+    snapshot = take_snapshot()
+    db.session.commit()
+
+    assert snapshot.outstanding == 15000
+    assert snapshot.collected == 500
+    assert (snapshot.par30, snapshot.par60, snapshot.par90) == (6000, 4000, 4000)
+    assert snapshot.to_dict()['par30_ratio'] == 40
+    assert snapshot.active_loans == 4
+    assert snapshot.pending_loans == 1
+
+
+def test_snapshot_is_replaced_for_the_same_day(portfolio):
+    take_snapshot()
+    db.session.commit()
+    take_snapshot()
+    db.session.commit()
+    assert PortfolioSnapshot.query.count() == 1
+
+
+def test_trends_read_only_the_snapshot_table(client, admin_headers, portfolio):
+    today = datetime.utcnow().date()
+    for days_ago in (2, 1):
+        db.session.add(PortfolioSnapshot(snapshot_date=today - timedelta(days=days_ago),
+                                         outstanding=10000 + days_ago, par30=1000))
+    db.session.commit()
+    result = client.application.test_cli_runner().invoke(args=['reports', 'snapshot'])
+    assert 'Portfolio snapshot stored' in result.output
+
+    with count_queries() as statements:
+        data = client.get('/api/admin/reports/trends?metrics=outstanding,par30', headers=admin_headers).get_json()
+    assert len(statements) == 1
+    assert data['dates'][-1] == today.isoformat()
+    assert data['series']['outstanding'] == [10002, 10001, 15000]
+    assert data['series']['par30'] == [1000, 1000, 6000]
+
+    response = client.get('/api/admin/reports/trends?metrics=bogus', headers=admin_headers)
+    assert response.status_code == 400
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
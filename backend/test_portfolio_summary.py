@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared portfolio summary behind the dashboard and report stats
+"""
+
+import pytest
+
+from extensions import db
+from models import Payment, LoanStatus
+from services.savings_accounts import record_movement
+from conftest import make_member, make_loan, count_queries
+
+
+@pytest.fixture
+def portfolio(app, admin):
+    alice, bob, carol = make_member(1), make_member(2), make_member(3)
+    db.session.flush()
+    make_loan(alice, status=LoanStatus.PENDING, principal=1000)
+    approved = make_loan(alice, status=LoanStatus.APPROVED, principal=10000, remaining_balance=8000)
+    make_loan(bob, status=LoanStatus.ACTIVE, principal=5000, remaining_balance=5000)
+    make_loan(bob, status=LoanStatus.COMPLETED, principal=3000, remaining_balance=0)
+    make_loan(bob, status=LoanStatus.REJECTED, principal=7000)
+    db.session.flush()
+    db.session.add(Payment(user_id=alice.id, loan_id=approved.id, amount=2000))
+    record_movement(carol.id, 500)
+    db.session.commit()
+
+
+def get(client, headers, url):
+    with count_queries() as statements:
+        data = client.get(url, headers=headers).get_json()
+    return data, len(statements)
+
+
+def test_dashboard_stats(client, admin_headers, portfolio):
+    data, queries = get(client, admin_headers, '/api/admin/dashboard/stats')
+    assert queries == 2
+    assert data == {
+        'active_users': 3,
+        'borrowers': 2,
+        'cash_disbursed': 18000,
+        'cash_received': 2000,
+        'total_savings': 500,
+        'repaid_loans': 1,
+        'other_accounts': 1,
+        'total_loans': 2
+    }
+
+
+def test_recovery_rates(client, admin_headers, portfolio):
+    data, queries = get(client, admin_headers, '/api/admin/recovery-rates')
+    assert queries == 2
+    assert data['total_loans'] == 5
+    assert data['completed_loans'] == 1
+    assert data['active_loans'] == 1
+    assert data['open_fully_paid_default'] == 40.0
+
+
+def test_report_stats_and_charts(client, admin_headers, portfolio):
+    stats, queries = get(client, admin_headers, '/api/admin/reports/stats')
+    assert queries == 2
+    assert stats['active_loans'] == 2
+    assert stats['pending_loans'] == 1
+    assert stats['total_disbursed'] == 18000
+
+    charts, queries = get(client, admin_headers, '/api/admin/reports/charts')
+    assert queries == 2
+    assert charts['loan_status']['data'] == [1, 2, 1, 1]
+    assert charts['financial_overview']['data'] == [500, 18000, 2000, 13000]
+    assert charts['user_engagement']['data'] == [3, 2, 1, 1]
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the maintained savings balance table and its verifier
+"""
+
+import pytest
+
+from extensions import db
+from models import Saving, SavingsAccount
+from services.savings_accounts import verify_accounts
+from conftest import make_member, auth_headers, count_queries
+
+
+@pytest.fixture
+def member(app, admin):
+    member = make_member(1)
+    db.session.commit()
+    return member
+
+
+def test_deposits_and_withdrawals_keep_a_running_balance(client, member):
+    headers = auth_headers(member)
+    client.post('/api/savings/deposit', headers=headers, json={'amount': 1000})
+    client.post('/api/savings/deposit', headers=headers, json={'amount': 500})
+    response = client.post('/api/savings/withdraw', headers=headers, json={'amount': 300})
+    assert response.get_json()['new_balance'] == 1200
+
+    response = client.post('/api/savings/withdraw', headers=headers, json={'amount': 5000})
+    assert response.status_code == 400
+    assert 'Available balance: ₱1,200.00' in response.get_json()['message']
+
+    history = client.get('/api/savings/', headers=headers).get_json()
+    assert history['total_savings'] == 1200
+    assert [s['balance'] for s in history['savings']] == [1200, 1500, 1000]
+    assert verify_accounts() == []
+
+
+def test_summary_reads_one_row(client, member):
+    headers = auth_headers(member)
+    for amount in (100, 200, 300):
+        client.post('/api/savings/deposit', headers=headers, json={'amount': amount})
+
+    with count_queries() as statements:
+        summary = client.get('/api/savings/summary', headers=headers).get_json()
+    assert len(statements) == 1
+    assert summary['total_balance'] == 600
+    assert summary['total_deposits'] == 3
+
+
+def test_verifier_reports_and_repairs_drift(client, member):
+    client.post('/api/savings/deposit', headers=auth_headers(member), json={'amount': 1000})
+    other = make_member(2)
+    db.session.flush()
+    # History written before the accounts table existed
+    db.session.add(Saving(user_id=other.id, amount=700, balance=700))
+    db.session.add(Saving(user_id=other.id, amount=-200, balance=500))
+    db.session.get(SavingsAccount, member.id).balance = 1
+    db.session.commit()
+
+    mismatches = verify_accounts()
+    assert sorted((m['user_id'], m['expected'], m['actual']) for m in mismatches) == [
+        (member.id, 1000, 1), (other.id, 500, None)
+    ]
+
+    verify_accounts(repair=True)
+    db.session.commit()
+    assert verify_accounts() == []
+    assert db.session.get(SavingsAccount, other.id).last_movement_amount == -200
+
+
+def test_verify_command(app, member):
+    db.session.add(Saving(user_id=member.id, amount=250, balance=250))
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['savings', 'verify', '--repair'])
+    assert 'Repaired 1 savings accounts' in result.output
+    assert db.session.get(SavingsAccount, member.id).balance == 250
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the admin savings overview (/api/admin/savings)
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from services.savings_accounts import record_movement
+from conftest import make_member, count_queries
+
+
+@pytest.fixture
+def accounts(app, admin):
+    now = datetime.utcnow()
+    members = [make_member(i) for i in range(6)]
+    db.session.flush()
+    for i, member in enumerate(members[:5]):
+        for n in range(3):
+            record_movement(member.id, 100 * (i + 1) + n - 1, created_at=now - timedelta(days=40 - n - i * 8))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def test_accounts_sorted_by_balance_with_last_deposit(client, admin_headers, accounts):
+    data = client.get('/api/admin/savings', headers=admin_headers).get_json()
+    accounts = data['savings_accounts']
+
+    assert [a['total_balance'] for a in accounts] == [1500, 1200, 900, 600, 300, 0]
+    assert accounts[0]['last_deposit_amount'] == 501
+    assert accounts[-1]['last_deposit_date'] is None
+    assert data['summary']['total_accounts'] == 6
+    assert data['summary']['total_amount'] == 4500
+    assert data['summary']['active_accounts'] == 3
+    assert data['summary']['recent_deposits'] == 1
+
+
+def test_paging_and_ascending_sort(client, admin_headers, accounts):
+    data = client.get('/api/admin/savings?per_page=2&page=2&order=asc', headers=admin_headers).get_json()
+    assert [a['total_balance'] for a in data['savings_accounts']] == [600, 900]
+    assert data['total'] == 6
+    assert data['pages'] == 3
+
+
+def test_query_count_does_not_grow_with_members(client, admin_headers, accounts):
+    with count_queries() as statements:
+        client.get('/api/admin/savings', headers=admin_headers)
+    small = len(statements)
+
+    for i in range(20):
+        member = make_member(100 + i)
+        db.session.flush()
+        record_movement(member.id, 10)
+    db.session.commit()
+
+    with count_queries() as statements:
+        client.get('/api/admin/savings', headers=admin_headers)
+    assert len(statements) == small
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the time-bucketed loan and payment series
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+from extensions import db
+from models import Payment, LoanStatus
+from services.time_series import loan_payment_series, bucket_starts, last_months
+from conftest import make_member, make_loan, auth_headers, count_queries
+
+
+@pytest.fixture
+def activity(app):
+    member = make_member(1)
+    db.session.flush()
+    # Sunday 2025-03-30, Monday 2025-03-31, Tuesday 2025-04-01
+    for created in (datetime(2025, 3, 30, 23), datetime(2025, 3, 31, 8), datetime(2025, 4, 1, 12)):
+        make_loan(member, principal=1000, created_at=created, approved_at=created)
+    loan = make_loan(member, principal=5000, created_at=datetime(2025, 7, 15), approved_at=datetime(2025, 7, 16))
+    db.session.flush()
+    db.session.add(Payment(user_id=member.id, loan_id=loan.id, amount=250, payment_date=datetime(2025, 8, 1)))
+    db.session.add(Payment(user_id=member.id, loan_id=loan.id, amount=99, payment_date=datetime(2025, 8, 2),
+                           status='pending'))
+    db.session.commit()
+    return member
+
+
+def test_bucket_starts_are_calendar_correct():
+    assert bucket_starts(date(2024, 11, 15), date(2025, 2, 1), 'month') == [
+        date(2024, 11, 1), date(2024, 12, 1), date(2025, 1, 1), date(2025, 2, 1)
+    ]
+    assert bucket_starts(date(2025, 3, 30), date(2025, 4, 1), 'week') == [date(2025, 3, 24), date(2025, 3, 31)]
+    assert bucket_starts(date(2024, 12, 31), date(2025, 4, 1), 'quarter') == [
+        date(2024, 10, 1), date(2025, 1, 1), date(2025, 4, 1)
+    ]
+    assert last_months(12, today=date(2025, 1, 20)) == (date(2024, 2, 1), date(2025, 1, 20))
+
+
+def test_weekly_series_is_zero_filled_in_one_query(activity):
+    with count_queries() as statements:
+        series = loan_payment_series(date(2025, 3, 24), date(2025, 4, 20), 'week')
+    assert len(statements) == 1
+    assert [b['period'] for b in series] == ['2025-03-24', '2025-03-31', '2025-04-07', '2025-04-14']
+    assert [b['loans'] for b in series] == [1, 2, 0, 0]
+    assert series[1]['disbursed'] == 2000
+
+
+def test_quarterly_and_monthly_series(activity):
+    quarters = loan_payment_series(date(2025, 1, 1), date(2025, 12, 31), 'quarter')
+    assert [b['label'] for b in quarters] == ['Q1 2025', 'Q2 2025', 'Q3 2025', 'Q4 2025']
+    assert [b['loans'] for b in quarters] == [2, 1, 1, 0]
+    assert [b['collected'] for b in quarters] == [0, 0, 250, 0]
+
+    months = loan_payment_series(date(2025, 7, 1), date(2025, 8, 31), 'month')
+    assert [(b['label'], b['disbursed'], b['collected']) for b in months] == [('Jul', 5000, 0), ('Aug', 0, 250)]
+
+
+def test_series_endpoint_validates_input(client, admin_headers, activity):
+    response = client.get('/api/admin/reports/series?start=2025-01-01&end=2025-12-31&granularity=quarter',
+                          headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.get_json()['series']) == 4
+
+    response = client.get('/api/admin/reports/series?granularity=fortnight', headers=admin_headers)
+    assert response.status_code == 400
+    response = client.get('/api/admin/reports/series?start=2000-01-01&end=2025-01-01&granularity=day',
+                          headers=admin_headers)
+    assert response.status_code == 400
+
+
+def test_dashboards_use_twelve_calendar_months(client, admin_headers, activity):
+    data = client.get('/api/admin/dashboard/monthly-loans', headers=admin_headers).get_json()
+    assert len(data['months']) == 12
+    assert data['months'][-1] == datetime.utcnow().strftime('%b')
+
+    member_data = client.get('/api/users/dashboard', headers=auth_headers(activity)).get_json()
+    assert len(member_data['payment_history']) == 12
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQL-merged member transaction timeline (/api/transactions/)
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import Transaction, TransactionType, Payment, Saving, Penalty, LoanStatus
+from services.transaction_timeline import DEFAULT_LIMIT
+from conftest import make_member, make_loan, auth_headers, count_queries
+
+
+@pytest.fixture
+def member(app):
+    member = make_member(1)
+    other = make_member(2)
+    db.session.flush()
+    member.created_at = datetime(2024, 12, 1)
+    start = datetime(2025, 1, 1)
+
+    loan = make_loan(member, approved_at=start)
+    make_loan(other, approved_at=start)
+    db.session.flush()
+    for day in range(1, 6):
+        at = start + timedelta(days=day)
+        db.session.add(Payment(user_id=member.id, loan_id=loan.id, amount=500, payment_date=at,
+                               payment_method='gcash'))
+        db.session.add(Saving(user_id=member.id, amount=100, balance=100 * day, created_at=at))
+        db.session.add(Transaction(transaction_id=f'TXN-{day}', user_id=member.id,
+                                   transaction_type=TransactionType.SAVINGS, amount=100,
+                                   description='Savings deposit', created_at=at))
+    db.session.add(Saving(user_id=member.id, amount=-50, balance=450, created_at=start + timedelta(days=10)))
+    db.session.add(Penalty(user_id=member.id, loan_id=loan.id, amount=41.67,
+                           penalty_date=start + timedelta(days=20), due_date=start,
+                           days_overdue=20))
+    db.session.commit()
+    return member
+
+
+def test_full_timeline_matches_previous_shape(client, member):
+    headers = auth_headers(member)
+    with count_queries() as statements:
+        data = client.get('/api/transactions/', headers=headers).get_json()
+
+    # one query for the page, one grouped count for the summary
+    assert len(statements) == 2
+    transactions = data['transactions']
+    assert len(transactions) == 19
+    assert transactions[0]['type'] == 'penalty'
+    assert transactions[0]['description'] == 'Overdue Penalty - Loan #1 (20 days late)'
+    assert transactions[1]['type'] == 'savings_withdrawal'
+    assert transactions[1]['amount'] == 50
+    assert transactions[-1]['type'] == 'account_creation'
+    assert transactions[-2]['type'] == 'loan_disbursement'
+    assert transactions[-2]['loan_status'] == 'approved'
+
+    payment = next(t for t in transactions if t['type'] == 'loan_payment')
+    assert payment['description'] == 'Loan Payment - Loan #1 (via GCash)'
+
+    assert data['summary'] == {
+        'total_transactions': 19,
+        'total_payments': 5,
+        'total_savings': 5,
+        'total_withdrawals': 1,
+        'total_penalties': 1,
+        'total_loans': 1
+    }
+    assert data['next_cursor'] is None
+
+
+def test_cursor_pagination(client, member):
+    headers = auth_headers(member)
+    seen, cursor = [], None
+    while True:
+        url = '/api/transactions/?limit=4' + (f'&cursor={cursor}' if cursor else '')
+        data = client.get(url, headers=headers).get_json()
+        assert len(data['transactions']) <= 4
+        seen.extend(t['id'] for t in data['transactions'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+
+    assert len(seen) == 19
+    assert len(set(seen)) == 19
+
+
+def test_timeline_is_paged_by_default(client, member):
+    start = datetime(2025, 2, 1)
+    db.session.add_all([
+        Saving(user_id=member.id, amount=10, balance=10, created_at=start + timedelta(hours=hour))
+        for hour in range(60)
+    ])
+    db.session.commit()
+
+    data = client.get('/api/transactions/', headers=auth_headers(member)).get_json()
+    assert len(data['transactions']) == DEFAULT_LIMIT
+    assert data['next_cursor'] is not None
+    assert data['summary']['total_transactions'] == 79
+
+
+def test_type_and_date_filters(client, member):
+    headers = auth_headers(member)
+    data = client.get('/api/transactions/?type=savings_deposit,savings_withdrawal', headers=headers).get_json()
+    assert {t['type'] for t in data['transactions']} == {'savings_deposit', 'savings_withdrawal'}
+    assert data['summary']['total_transactions'] == 6
+
+    data = client.get('/api/transactions/?start_date=2025-01-02&end_date=2025-01-03', headers=headers).get_json()
+    assert len(data['transactions']) == 6
+
+    response = client.get('/api/transactions/?start_date=yesterday', headers=headers)
+    assert response.status_code == 400
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
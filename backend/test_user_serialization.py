@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for bulk User serialization (created_by admin resolution)
+"""
+
+import pytest
+
+from extensions import db
+from models import User
+from admin_models import Admin
+from conftest import make_member, count_queries
+
+
+def test_bulk_to_dict_resolves_admins_in_one_query(app, admin):
+    other = Admin(username='other', email='other@example.com', password_hash='x',
+                  first_name='Other', last_name='Admin')
+    db.session.add(other)
+    db.session.flush()
+    admin_ids = [admin.id, other.id, None]
+    for i in range(30):
+        make_member(i, admin_id=admin_ids[i % 3])
+    db.session.commit()
+    users = User.query.order_by(User.id).all()
+
+    with count_queries() as statements:
+        users_data = User.bulk_to_dict(users)
+
+    assert len(statements) == 1
+    assert users_data[0]['created_by']['username'] == 'testadmin'
+    assert users_data[1]['created_by']['username'] == 'other'
+    assert users_data[2]['created_by'] is None
+
+
+def test_to_dict_still_serializes_single_user(app, admin):
+    make_member(1, admin_id=admin.id)
+    db.session.commit()
+    user = User.query.first()
+
+    assert user.to_dict()['created_by'] == {
+        'id': admin.id,
+        'username': 'testadmin',
+        'email': 'testadmin@example.com'
+    }
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__, '-q']))
@@ -1,46 +1,30 @@
 #!/usr/bin/env python3
 """
 Script to update existing users' membership status based on capital share
+
+Same as `flask jobs run membership`: users are updated with one
+UPDATE ... CASE per committed chunk, and an interrupted run resumes where
+it stopped. The threshold is MEMBERSHIP_REGULAR_THRESHOLD.
 """
 
 from app import create_app
-from extensions import db
-from models import User
+from services.jobs import run_job
+from services.membership import regular_threshold
 
 def update_all_users_membership():
     app = create_app()
     
     with app.app_context():
         try:
-            # Get all users
-            users = User.query.all()
-            
-            print(f"Found {len(users)} users to update...")
-            
-            updated_count = 0
-            for user in users:
-                old_status = user.member_status
-                old_eligibility = user.loan_eligibility
-                
-                # Update membership status based on capital share
-                user.update_membership_status()
-                
-                if old_status != user.member_status or old_eligibility != user.loan_eligibility:
-                    print(f"Updated user {user.first_name} {user.last_name}:")
-                    print(f"  Capital Share: {user.capital_share}")
-                    print(f"  Status: {old_status} -> {user.member_status}")
-                    print(f"  Loan Eligible: {old_eligibility} -> {user.loan_eligibility}")
-                    updated_count += 1
-            
-            db.session.commit()
-            print(f"\nSuccessfully updated {updated_count} users!")
+            stats = run_job('membership')
+            print(f"\nSuccessfully updated {stats['changed']} of {stats['rows']} users!")
             print("\nMembership Rules:")
-            print("- Capital Share >= 20,000 PHP: REGULAR MEMBER (Loan Eligible)")
-            print("- Capital Share < 20,000 PHP: MEMBER (Not Loan Eligible)")
+            threshold = regular_threshold()
+            print(f"- Capital Share >= {threshold:,.0f} PHP: REGULAR MEMBER (Loan Eligible)")
+            print(f"- Capital Share < {threshold:,.0f} PHP: MEMBER (Not Loan Eligible)")
             
         except Exception as e:
-            db.session.rollback()
             print(f"Error updating users: {e}")
 
 if __name__ == "__main__":
-    update_all_users_membership()
\ No newline at end of file
+    update_all_users_membership()
@@ -270,6 +270,37 @@ const LoadingSpinner = styled.div`
   color: #666;
 `;
 
+const Pagination = styled.div`
+  display: flex;
+  justify-content: center;
+  align-items: center;
+  gap: 10px;
+  padding: 20px;
+  background: white;
+`;
+
+const PageButton = styled.button`
+  padding: 8px 12px;
+  border: 1px solid #ddd;
+  background: white;
+  border-radius: 4px;
+  cursor: pointer;
+  
+  &:hover {
+    background: #f8f9fa;
+  }
+  
+  &:disabled {
+    opacity: 0.5;
+    cursor: not-allowed;
+  }
+`;
+
+const PageInfo = styled.span`
+  color: #666;
+  font-size: 14px;
+`;
+
 const AdminSavings = () => {
   const { getAuthHeaders } = useAdminAuth();
   const [savingsAccounts, setSavingsAccounts] = useState([]);
@@ -281,32 +312,41 @@ const AdminSavings = () => {
   const [userTransactions, setUserTransactions] = useState([]);
   const [showModal, setShowModal] = useState(false);
   const [transactionLoading, setTransactionLoading] = useState(false);
+  const [currentPage, setCurrentPage] = useState(1);
+  const [totalPages, setTotalPages] = useState(1);
+  const [perPage, setPerPage] = useState(50);
+  const [sortBy, setSortBy] = useState('balance');
+  const [sortOrder, setSortOrder] = useState('desc');
 
   useEffect(() => {
     fetchSavingsData();
-  }, []);
+  }, [currentPage, perPage, sortBy, sortOrder]);
 
   const fetchSavingsData = async () => {
     try {
       setLoading(true);
       const headers = getAuthHeaders();
       
-      const response = await fetch('/api/admin/savings', { headers });
+      // The endpoint is paged; sorting happens server-side across every account
+      const params = new URLSearchParams({
+        page: currentPage,
+        per_page: perPage,
+        sort_by: sortBy,
+        order: sortOrder
+      });
+      const response = await fetch(`/api/admin/savings?${params}`, { headers });
       const data = await response.json();
       
       setSavingsAccounts(data.savings_accounts || []);
+      setTotalPages(data.pages || 1);
       
-      // Calculate stats
-      const totalAccounts = data.savings_accounts?.length || 0;
-      const totalAmount = data.savings_accounts?.reduce((sum, account) => sum + account.total_balance, 0) || 0;
-      const activeAccounts = data.savings_accounts?.filter(account => account.days_since_last_deposit <= 30).length || 0;
-      const recentDeposits = data.savings_accounts?.filter(account => account.days_since_last_deposit <= 7).length || 0;
-      
+      // Stats cover every account, not just the current page
+      const summary = data.summary || {};
       setStats({
-        totalAccounts,
-        totalAmount,
-        activeAccounts,
-        recentDeposits
+        totalAccounts: summary.total_accounts || 0,
+        totalAmount: summary.total_amount || 0,
+        activeAccounts: summary.active_accounts || 0,
+        recentDeposits: summary.recent_deposits || 0
       });
       
       setLoading(false);
@@ -404,7 +444,7 @@ const AdminSavings = () => {
       <FilterContainer>
         <SearchInput
           type="text"
-          placeholder="Search users by name or email..."
+          placeholder="Search this page by name or email..."
           value={searchTerm}
           onChange={(e) => setSearchTerm(e.target.value)}
         />
@@ -415,6 +455,33 @@ const AdminSavings = () => {
           <option value="moderate">Moderate (31-90 days)</option>
           <option value="inactive">Inactive (&gt;90 days)</option>
         </FilterSelect>
+        
+        <FilterSelect
+          value={`${sortBy}:${sortOrder}`}
+          onChange={(e) => {
+            const [field, order] = e.target.value.split(':');
+            setSortBy(field);
+            setSortOrder(order);
+            setCurrentPage(1);
+          }}
+        >
+          <option value="balance:desc">Balance (high to low)</option>
+          <option value="balance:asc">Balance (low to high)</option>
+          <option value="name:asc">Name (A-Z)</option>
+          <option value="last_deposit_date:desc">Latest deposit</option>
+        </FilterSelect>
+        
+        <FilterSelect
+          value={perPage}
+          onChange={(e) => {
+            setPerPage(Number(e.target.value));
+            setCurrentPage(1);
+          }}
+        >
+          <option value={25}>25 per page</option>
+          <option value={50}>50 per page</option>
+          <option value={100}>100 per page</option>
+        </FilterSelect>
       </FilterContainer>
 
       <StatsCards>
@@ -488,6 +555,26 @@ const AdminSavings = () => {
         })}
       </SavingsTable>
 
+      {totalPages > 1 && (
+        <Pagination>
+          <PageButton 
+            onClick={() => setCurrentPage(prev => Math.max(1, prev - 1))}
+            disabled={currentPage === 1}
+          >
+            Previous
+          </PageButton>
+          
+          <PageInfo>Page {currentPage} of {totalPages}</PageInfo>
+          
+          <PageButton 
+            onClick={() => setCurrentPage(prev => Math.min(totalPages, prev + 1))}
+            disabled={currentPage === totalPages}
+          >
+            Next
+          </PageButton>
+        </Pagination>
+      )}
+
       {showModal && (
         <Modal>
           <ModalContent>
@@ -200,6 +200,11 @@ const AdminTransactions = () => {
   const [endDate, setEndDate] = useState('');
   const [currentPage, setCurrentPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
+  // Keyset cursors: pageCursors[i] fetches page i + 1
+  const [pageCursors, setPageCursors] = useState([null]);
+  const [nextCursor, setNextCursor] = useState(null);
+  // Counted once per filter set (null until then); paging with cursors needs no count
+  const [total, setTotal] = useState(null);
 
   useEffect(() => {
     fetchActivities();
@@ -210,7 +215,17 @@ const AdminTransactions = () => {
       setLoading(true);
       const headers = getAuthHeaders();
       
-      let url = `/api/admin/activities?page=${currentPage}&per_page=20`;
+      let url = `/api/admin/activities?per_page=20`;
+      
+      const needTotal = total === null;
+      if (needTotal) {
+        url += '&include_total=true';
+      }
+      
+      const cursor = pageCursors[currentPage - 1];
+      if (cursor) {
+        url += `&cursor=${encodeURIComponent(cursor)}`;
+      }
       
       if (actionFilter !== 'all') {
         url += `&action=${actionFilter}`;
@@ -232,7 +247,12 @@ const AdminTransactions = () => {
       const data = await response.json();
       
       setActivities(data.activities || []);
-      setTotalPages(data.pages || 1);
+      setNextCursor(data.next_cursor || null);
+      const activityTotal = needTotal ? (data.total || 0) : total;
+      if (needTotal) {
+        setTotal(activityTotal);
+        setTotalPages(Math.max(1, Math.ceil(activityTotal / 20)));
+      }
       
       // Calculate stats
       const today = new Date().toISOString().split('T')[0];
@@ -253,7 +273,7 @@ const AdminTransactions = () => {
       ).length;
       
       setStats({
-        total: data.total || 0,
+        total: activityTotal,
         today: todayActivities,
         userActions,
         loanActions,
@@ -267,6 +287,20 @@ const AdminTransactions = () => {
     }
   };
 
+  // Changing a filter invalidates the cursors collected so far
+  const changeFilter = (setter) => (value) => {
+    setter(value);
+    setCurrentPage(1);
+    setPageCursors([null]);
+    setTotal(null);
+  };
+
+  const goToNextPage = () => {
+    if (!nextCursor) return;
+    setPageCursors(prev => [...prev.slice(0, currentPage), nextCursor]);
+    setCurrentPage(prev => prev + 1);
+  };
+
   const formatDate = (dateString) => {
     return new Date(dateString).toLocaleDateString('en-US', {
       year: 'numeric',
@@ -318,7 +352,7 @@ const AdminTransactions = () => {
       </Header>
 
       <FilterContainer>
-        <FilterSelect value={actionFilter} onChange={(e) => setActionFilter(e.target.value)}>
+        <FilterSelect value={actionFilter} onChange={(e) => changeFilter(setActionFilter)(e.target.value)}>
           <option value="all">All Actions</option>
           <option value="CREATE_USER">User Creation</option>
           <option value="UPDATE_USER">User Updates</option>
@@ -328,7 +362,7 @@ const AdminTransactions = () => {
           <option value="LOGIN">Admin Logins</option>
         </FilterSelect>
         
-        <FilterSelect value={dateFilter} onChange={(e) => setDateFilter(e.target.value)}>
+        <FilterSelect value={dateFilter} onChange={(e) => changeFilter(setDateFilter)(e.target.value)}>
           <option value="all">All Time</option>
           <option value="today">Today</option>
           <option value="week">This Week</option>
@@ -342,13 +376,13 @@ const AdminTransactions = () => {
             <DateInput
               type="date"
               value={startDate}
-              onChange={(e) => setStartDate(e.target.value)}
+              onChange={(e) => changeFilter(setStartDate)(e.target.value)}
               placeholder="Start Date"
             />
             <DateInput
               type="date"
               value={endDate}
-              onChange={(e) => setEndDate(e.target.value)}
+              onChange={(e) => changeFilter(setEndDate)(e.target.value)}
               placeholder="End Date"
             />
           </>
@@ -436,19 +470,13 @@ const AdminTransactions = () => {
             Previous
           </PageButton>
           
-          {[...Array(totalPages)].map((_, i) => (
-            <PageButton
-              key={i + 1}
-              className={currentPage === i + 1 ? 'active' : ''}
-              onClick={() => setCurrentPage(i + 1)}
-            >
-              {i + 1}
-            </PageButton>
-          ))}
+          <PageButton className="active" disabled>
+            {currentPage} / {totalPages}
+          </PageButton>
           
           <PageButton 
-            onClick={() => setCurrentPage(prev => Math.min(totalPages, prev + 1))}
-            disabled={currentPage === totalPages}
+            onClick={goToNextPage}
+            disabled={!nextCursor}
           >
             Next
           </PageButton>
@@ -242,24 +242,66 @@ const LoadingMessage = styled.div`
   font-size: 16px;
 `;
 
+const LoadMoreButton = styled.button`
+  display: block;
+  margin: 20px auto 0;
+  padding: 10px 24px;
+  border: 2px solid #667eea;
+  border-radius: 25px;
+  background: white;
+  color: #667eea;
+  font-weight: 600;
+  cursor: pointer;
+  
+  &:disabled {
+    opacity: 0.6;
+    cursor: not-allowed;
+  }
+`;
+
+// Entries per request; older ones are fetched with the returned cursor
+const PAGE_SIZE = 50;
+
+// Server-side type filter for each filter button
+const FILTER_TYPES = {
+  savings: 'savings_deposit,savings_withdrawal'
+};
+
 const Transactions = () => {
   const { user, getAuthHeaders } = useAuth();
   const [transactions, setTransactions] = useState([]);
-  const [filteredTransactions, setFilteredTransactions] = useState([]);
   const [summary, setSummary] = useState({});
+  const [filteredTotal, setFilteredTotal] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [activeFilter, setActiveFilter] = useState('all');
 
+  const fetchPage = async (filter, cursor) => {
+    const headers = getAuthHeaders();
+    const params = { limit: PAGE_SIZE };
+    if (filter !== 'all') {
+      params.type = FILTER_TYPES[filter] || filter;
+    }
+    if (cursor) {
+      params.cursor = cursor;
+    }
+    const response = await axios.get('http://localhost:5000/api/transactions/', { headers, params });
+    return response.data;
+  };
+
   useEffect(() => {
     const fetchTransactions = async () => {
       try {
-        const headers = getAuthHeaders();
-        console.log('Fetching transactions with headers:', headers);
-        const response = await axios.get('http://localhost:5000/api/transactions/', { headers });
-        console.log('Transactions response:', response.data);
-        setTransactions(response.data.transactions || []);
-        setFilteredTransactions(response.data.transactions || []);
-        setSummary(response.data.summary || {});
+        setLoading(true);
+        const data = await fetchPage(activeFilter, null);
+        setTransactions(data.transactions || []);
+        setNextCursor(data.next_cursor || null);
+        // The summary is filtered by type too; keep the unfiltered one for the cards
+        setFilteredTotal(data.summary?.total_transactions || 0);
+        if (activeFilter === 'all') {
+          setSummary(data.summary || {});
+        }
       } catch (error) {
         console.error('Error fetching transactions:', error);
         console.error('Error details:', error.response?.data);
@@ -271,26 +313,23 @@ const Transactions = () => {
     if (user) {
       fetchTransactions();
     }
-  }, [user]); // eslint-disable-line react-hooks/exhaustive-deps
+  }, [user, activeFilter]); // eslint-disable-line react-hooks/exhaustive-deps
+
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const data = await fetchPage(activeFilter, nextCursor);
+      setTransactions(prev => [...prev, ...(data.transactions || [])]);
+      setNextCursor(data.next_cursor || null);
+    } catch (error) {
+      console.error('Error fetching more transactions:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   const filterTransactions = (type) => {
     setActiveFilter(type);
-    if (type === 'all') {
-      setFilteredTransactions(transactions);
-    } else if (type === 'savings') {
-      // Show both deposits and withdrawals
-      const filtered = transactions.filter(transaction => 
-        transaction.type === 'savings_deposit' || transaction.type === 'savings_withdrawal'
-      );
-      setFilteredTransactions(filtered);
-    } else {
-      const filtered = transactions.filter(transaction => 
-        transaction.type === type || 
-        (type === 'loan_payment' && transaction.type === 'loan_payment') ||
-        (type === 'loan_disbursement' && transaction.type === 'loan_disbursement')
-      );
-      setFilteredTransactions(filtered);
-    }
   };
 
   const getTransactionIcon = (type) => {
@@ -322,7 +361,7 @@ const Transactions = () => {
     return `${firstName?.charAt(0) || ''}${lastName?.charAt(0) || ''}`.toUpperCase();
   };
 
-  const displayTransactions = filteredTransactions.length > 0 ? filteredTransactions : [];
+  const displayTransactions = transactions;
 
   if (loading) {
     return (
@@ -442,7 +481,7 @@ const Transactions = () => {
         <CardTitle>
           {activeFilter === 'all' ? 'All Transactions' : `${formatTransactionType(activeFilter)} History`}
           <span style={{ fontSize: '14px', fontWeight: 'normal', color: '#718096' }}>
-            ({filteredTransactions.length} {filteredTransactions.length === 1 ? 'transaction' : 'transactions'})
+            ({filteredTotal} {filteredTotal === 1 ? 'transaction' : 'transactions'})
           </span>
         </CardTitle>
         
@@ -515,6 +554,12 @@ const Transactions = () => {
             }
           </NoTransactionsMessage>
         )}
+        
+        {nextCursor && (
+          <LoadMoreButton onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load older transactions'}
+          </LoadMoreButton>
+        )}
       </TransactionsCard>
     </TransactionsContainer>
   );